@@ -0,0 +1,122 @@
+"""
+Benchmark suite of the repositories, services and validators.
+
+    python -m benchmarks run --sizes 10000 100000 1000000 --output results.json
+    python -m benchmarks compare baseline.json results.json --threshold 0.1
+"""
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import sqlalchemy
+
+from benchmarks import data
+from benchmarks.cases import CASES, Context
+from benchmarks.compare import compare
+from benchmarks.harness import measure
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    cases = [case for case in CASES if not args.filter or any(pattern in case.name for pattern in args.filter)]
+    results = []
+    loop = asyncio.new_event_loop()
+
+    for case in cases:
+        if case.uses_database:
+            continue
+        result = measure(case.setup(), args.iterations * 10, args.warmup)
+        results.append({"name": case.name, "size": None, **result})
+        print(f"{case.name:45} {'-':>8}  p50 {result['p50_us']:>9.1f} us  p99 {result['p99_us']:>9.1f} us", file=sys.stderr)
+
+    for size in args.sizes:
+        if not any(case.uses_database for case in cases):
+            break
+        print(f"seeding {size} users...", file=sys.stderr)
+        seeded = data.seed(size)
+        # Write cases add rows: run on a copy, so every run starts from the same data
+        working_copy = seeded.with_name(f"work_{size}.db")
+        shutil.copyfile(seeded, working_copy)
+
+        for case in cases:
+            if not case.uses_database:
+                continue
+            ctx = Context(working_copy, size, loop)
+            try:
+                result = measure(case.setup(ctx), args.iterations, args.warmup)
+            finally:
+                ctx.close()
+            results.append({"name": case.name, "size": size, **result})
+            print(f"{case.name:45} {size:>8}  p50 {result['p50_us']:>9.1f} us  p99 {result['p99_us']:>9.1f} us", file=sys.stderr)
+        working_copy.unlink()
+
+    loop.close()
+    output = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    lines, regressions = compare(args.baseline, args.candidate, args.threshold, args.memory_threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above the thresholds")
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    run_parser.add_argument("--iterations", type=int, default=1000, help="timed calls per database case (x10 for validators)")
+    run_parser.add_argument("--warmup", type=int, default=50)
+    run_parser.add_argument("--filter", nargs="*", help="only cases whose name contains one of these")
+    run_parser.add_argument("--output", help="result file, stdout by default")
+    run_parser.set_defaults(handler=cmd_run)
+
+    compare_parser = commands.add_parser("compare", help="diff two result files against regression thresholds")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed latency increase, 0.1 = 10%%")
+    compare_parser.add_argument("--memory-threshold", type=float, default=0.20, help="allowed memory peak increase")
+    compare_parser.set_defaults(handler=cmd_compare)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
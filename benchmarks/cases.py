@@ -0,0 +1,181 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+from starlette.responses import JSONResponse
+
+from benchmarks import data
+from src.api.responses import DomainJSONResponse
+from src.core.config import configs
+from src.domain.passport import Passport
+from src.domain.users import User
+from src.infrastructure.database import create_async_sqlite_engine, create_sqlite_engine
+from src.infrastructure.repository.async_passport_repo import AsyncPassportRepository
+from src.infrastructure.repository.passport_repo import PassportRepository
+from src.infrastructure.repository.user_repo import UserRepository
+from src.schemas.user_schema import UsersOut
+from src.services.passport_service import PassportService
+from src.utils import validators
+
+
+@dataclass
+class Context:
+    """
+    Database of one benchmark size and the open resources of the running case.
+    """
+    path: Path
+    size: int
+    loop: asyncio.AbstractEventLoop
+
+    def __post_init__(self):
+        self.engine = create_sqlite_engine(f"sqlite:///{self.path}", configs.database.performance)
+        self.session = sessionmaker(bind=self.engine)()
+        self.random = random.Random(self.size)
+        self._cleanups: list[Callable[[], object]] = []
+
+    def random_index(self) -> int:
+        return self.random.randrange(self.size)
+
+    def on_close(self, cleanup: Callable[[], object]) -> None:
+        self._cleanups.append(cleanup)
+
+    def close(self) -> None:
+        for cleanup in reversed(self._cleanups):
+            cleanup()
+        self.session.close()
+        self.engine.dispose()
+
+
+@dataclass
+class Case:
+    name: str
+    # builds the timed operation, from the Context for database cases and from nothing otherwise
+    setup: Callable[[Context], Callable[[int], object]] | Callable[[], Callable[[int], object]]
+    uses_database: bool = True
+
+
+def _get_user(ctx: Context):
+    repo = UserRepository(ctx.session)
+    return lambda i: repo.get_user(data.user_id(ctx.random_index()))
+
+
+def _get_user_by_full_name(ctx: Context):
+    repo = UserRepository(ctx.session)
+    return lambda i: repo.get_user_by_full_name(*data.full_name(ctx.random_index()))
+
+
+def _get_user_by_phone(ctx: Context):
+    repo = UserRepository(ctx.session)
+    return lambda i: repo.get_user_by_phone(data.phone_number(ctx.random_index()))
+
+
+def _create_user(ctx: Context):
+    repo = UserRepository(ctx.session)
+
+    def create(i: int):
+        # indexes above the seeded range are still free
+        index = ctx.size + i
+        first_name, last_name, patronymic = data.full_name(index)
+        return repo.create_user(User(id=None, first_name=first_name, last_name=last_name,
+                                     patronymic=patronymic, phone_number=data.phone_number(index)))
+    return create
+
+
+def _create_passport(ctx: Context):
+    repo = PassportRepository(ctx.session)
+    first_free = data.passport_count(ctx.size)
+
+    def create(i: int):
+        index = ctx.random_index()
+        born = data.birth_date(index)
+        return repo.create_passport(Passport(
+            id=None, birth_date=born, passport_series=data.passport_series(first_free + i),
+            passport_number=data.passport_number(first_free + i), receipt_date=born + timedelta(days=7000),
+            user_id=data.user_id(index),
+        ))
+    return create
+
+
+def _update_passport(ctx: Context):
+    # Through the service and the async repository, as the routes call it
+    if configs.database.mode == "async":
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        async_engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{ctx.path}", configs.database.performance)
+        session = AsyncSession(async_engine)
+        # aiosqlite connections run on their own threads, which would keep the process alive
+        ctx.on_close(lambda: ctx.loop.run_until_complete(async_engine.dispose()))
+        ctx.on_close(lambda: ctx.loop.run_until_complete(session.close()))
+    else:
+        session = ctx.session
+    service = PassportService(AsyncPassportRepository(session, PassportRepository))
+    passports = data.passport_count(ctx.size)
+
+    def update(i: int):
+        sequence = ctx.random.randrange(passports)
+        passport = Passport(id=UUID(int=(1 << 64) + sequence), birth_date=None, passport_series=None,
+                            passport_number=None, receipt_date=data.birth_date(i) + timedelta(days=20000),
+                            user_id=None)
+        return ctx.loop.run_until_complete(service.update_passport(passport))
+    return update
+
+
+# Users of one list response, as a /users/find with limit=1000 returns them
+_RESPONSE_USERS = 1000
+
+
+def _response_users() -> list[User]:
+    users = []
+    for index in range(_RESPONSE_USERS):
+        first_name, last_name, patronymic = data.full_name(index)
+        born = data.birth_date(index)
+        passports = [Passport(id=UUID(int=(1 << 64) + index), birth_date=born, passport_series=data.passport_series(index),
+                              passport_number=data.passport_number(index), receipt_date=born + timedelta(days=7000),
+                              user_id=data.user_id(index))] if data.has_passport(index) else []
+        users.append(User(id=data.user_id(index), first_name=first_name, last_name=last_name, patronymic=patronymic,
+                          phone_number=data.phone_number(index), passports=passports))
+    return users
+
+
+def _validated_response():
+    # What FastAPI does with response_model: validate, dump in JSON mode, then json.dumps
+    adapter = TypeAdapter(list[UsersOut])
+    users = _response_users()
+    return lambda i: JSONResponse(adapter.dump_python(adapter.validate_python(users), mode="json")).body
+
+
+def _domain_response():
+    users = _response_users()
+    return lambda i: DomainJSONResponse(users).body
+
+
+def _validator(function, *args):
+    def setup():
+        return lambda i: function(*args)
+    return setup
+
+
+CASES = [
+    Case("UserRepository.get_user", _get_user),
+    Case("UserRepository.get_user_by_full_name", _get_user_by_full_name),
+    Case("UserRepository.get_user_by_phone", _get_user_by_phone),
+    Case("UserRepository.create_user", _create_user),
+    Case("PassportRepository.create_passport", _create_passport),
+    Case("PassportService.update_passport", _update_passport),
+    Case("responses.users_out_1k_validated", _validated_response, False),
+    Case("responses.users_out_1k_domain_json", _domain_response, False),
+    Case("validators.validate_first_name", _validator(validators.validate_first_name, "Ivan"), False),
+    Case("validators.validate_last_name", _validator(validators.validate_last_name, "Ivanov"), False),
+    Case("validators.validate_patronymic", _validator(validators.validate_patronymic, "Petrovich"), False),
+    Case("validators.validate_phone_number", _validator(validators.validate_phone_number, "+79991234567"), False),
+    Case("validators.validate_passport_series", _validator(validators.validate_passport_series, "1234"), False),
+    Case("validators.validate_passport_number", _validator(validators.validate_passport_number, "123456"), False),
+    Case("validators.parse_date", _validator(validators.parse_date, "15.03.1990", "birth_date"), False),
+    Case("validators.validate_user_id", _validator(validators.validate_user_id, str(uuid4())), False),
+]
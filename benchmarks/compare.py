@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+# Metrics compared between two result files; a higher value is always worse
+COMPARED_METRICS = ("p50_us", "p95_us", "p99_us", "peak_memory_kib")
+
+
+def _index(results: dict) -> dict[tuple[str, int | None], dict]:
+    return {(result["name"], result["size"]): result for result in results["results"]}
+
+
+def compare(baseline_path: Path, candidate_path: Path, latency_threshold: float, memory_threshold: float) -> tuple[list[str], list[str]]:
+    """
+    Diff two result files. Returns the report lines and the regressions:
+    a latency percentile slower by more than `latency_threshold` (a share, 0.1 = 10%)
+    or a memory peak higher by more than `memory_threshold`.
+    """
+    baseline = _index(json.loads(Path(baseline_path).read_text()))
+    candidate = _index(json.loads(Path(candidate_path).read_text()))
+
+    lines = [f"{'benchmark':45} {'size':>8} {'metric':>16} {'baseline':>12} {'candidate':>12} {'change':>8}"]
+    regressions = []
+    for key in sorted(baseline.keys() & candidate.keys(), key=lambda k: (k[0], k[1] or 0)):
+        name, size = key
+        for metric in COMPARED_METRICS:
+            old, new = baseline[key].get(metric), candidate[key].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            threshold = memory_threshold if metric == "peak_memory_kib" else latency_threshold
+            flag = " REGRESSION" if change > threshold else ""
+            line = f"{name:45} {size or '-':>8} {metric:>16} {old:>12.1f} {new:>12.1f} {change:>+8.1%}{flag}"
+            lines.append(line)
+            if flag:
+                regressions.append(line)
+
+    for key in sorted(baseline.keys() ^ candidate.keys(), key=lambda k: (k[0], k[1] or 0)):
+        side = "baseline" if key in baseline else "candidate"
+        lines.append(f"{key[0]:45} {key[1] or '-':>8} only in {side}")
+    return lines, regressions
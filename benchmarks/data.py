@@ -0,0 +1,148 @@
+"""
+Deterministic benchmark databases of users with passports.
+
+Every value is a pure function of the row index, so a case can compute
+which rows exist (and which values are still free) without querying.
+"""
+import itertools
+from datetime import date, timedelta
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy import create_engine
+
+from src.infrastructure.migrations import MIGRATIONS, current_version, migrate
+from src.infrastructure.models.passport import PassportModel
+from src.infrastructure.models.users import UserModel, phone_columns
+
+DATA_DIR = Path(__file__).parent / ".data"
+
+# Cyrillic-free syllables keep every name inside validate_first_name's alphabet
+_SYLLABLES = ["ka", "le", "mi", "no", "ru", "sa", "ti", "va", "zo", "be", "da", "go", "ly", "pe", "xo"]
+FIRST_NAMES = ["".join(pair).title() for pair in itertools.product(_SYLLABLES[:10], repeat=2)]  # 100
+LAST_NAMES = ["".join(triple).title() + "ov" for triple in itertools.product(_SYLLABLES, repeat=3)][:300]
+PATRONYMICS = [name + "ovich" for name in FIRST_NAMES]  # 100
+
+# (first, last, patronymic) combinations, so at most this many unique full names
+MAX_USERS = len(FIRST_NAMES) * len(LAST_NAMES) * len(PATRONYMICS)
+
+# Passport numbers are unique over 6 digits: one in PASSPORT_EVERY users has none,
+# which leaves numbers free for the create benchmarks even at a million users
+PASSPORT_EVERY = 10
+_NUMBER_SPACE = 1_000_000
+_NUMBER_STEP = 7919  # coprime with the number space, so the mapping below is a permutation
+
+_EPOCH = date(1950, 1, 1)
+
+
+def user_id(index: int) -> UUID:
+    return UUID(int=index + 1)
+
+
+def full_name(index: int) -> tuple[str, str, str]:
+    """
+    (first_name, last_name, patronymic) of the user at `index`, unique below MAX_USERS.
+    """
+    return (
+        FIRST_NAMES[index % len(FIRST_NAMES)],
+        LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)],
+        PATRONYMICS[(index // (len(FIRST_NAMES) * len(LAST_NAMES))) % len(PATRONYMICS)],
+    )
+
+
+def phone_number(index: int) -> str:
+    return f"+7{9_000_000_000 + index}"
+
+
+def has_passport(index: int) -> bool:
+    return index % PASSPORT_EVERY != 0
+
+
+def passport_count(users: int) -> int:
+    return sum(1 for index in range(users) if has_passport(index))
+
+
+def passport_number(sequence: int) -> str:
+    """
+    Number of the `sequence`-th passport; distinct for every sequence below a million.
+    """
+    return f"{sequence * _NUMBER_STEP % _NUMBER_SPACE:06d}"
+
+
+def passport_series(sequence: int) -> str:
+    return str(1000 + sequence % 9000)
+
+
+def birth_date(index: int) -> date:
+    return _EPOCH + timedelta(days=index % 18000)
+
+
+def database_path(size: int) -> Path:
+    return DATA_DIR / f"users_{size}.db"
+
+
+def _user_rows(start: int, stop: int) -> list[dict]:
+    rows = []
+    for index in range(start, stop):
+        first_name, last_name, patronymic = full_name(index)
+        rows.append({
+            "id": user_id(index),
+            "first_name": first_name,
+            "last_name": last_name,
+            "patronymic": patronymic,
+            "phone_number": phone_number(index),
+            **phone_columns(phone_number(index)),
+        })
+    return rows
+
+
+def _passport_rows(start: int, stop: int, sequence: int) -> tuple[list[dict], int]:
+    rows = []
+    for index in range(start, stop):
+        if not has_passport(index):
+            continue
+        born = birth_date(index)
+        rows.append({
+            "id": UUID(int=(1 << 64) + sequence),
+            "birth_date": born,
+            "passport_series": passport_series(sequence),
+            "passport_number": passport_number(sequence),
+            "receipt_date": born + timedelta(days=14 * 365),
+            "user_id": user_id(index),
+        })
+        sequence += 1
+    return rows, sequence
+
+
+def seed(size: int, batch_size: int = 50_000, force: bool = False) -> Path:
+    """
+    Create (or reuse) the benchmark database with `size` users.
+    """
+    if size > MAX_USERS:
+        raise ValueError(f"At most {MAX_USERS} users have unique names")
+
+    path = database_path(size)
+    if path.exists() and not force:
+        engine = create_engine(f"sqlite:///{path}")
+        try:
+            if current_version(engine) == MIGRATIONS[-1].version:
+                return path
+        finally:
+            engine.dispose()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine, MIGRATIONS)
+    sequence = 0
+    with engine.begin() as connection:
+        for start in range(0, size, batch_size):
+            stop = min(start + batch_size, size)
+            connection.execute(UserModel.__table__.insert(), _user_rows(start, stop))
+            passports, sequence = _passport_rows(start, stop, sequence)
+            if passports:
+                connection.execute(PassportModel.__table__.insert(), passports)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return path
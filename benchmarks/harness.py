@@ -0,0 +1,70 @@
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+# Share of the timed iterations repeated under tracemalloc to measure the memory peak;
+# tracing slows every allocation down, so it never runs during the timed pass
+MEMORY_SAMPLE_SHARE = 0.1
+
+
+def percentile(sorted_values: list[float], share: float) -> float:
+    """
+    Percentile by linear interpolation between the closest ranks.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * share
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(durations_ns: list[int]) -> dict[str, float]:
+    values = sorted(duration / 1000 for duration in durations_ns)
+    return {
+        "mean_us": round(sum(values) / len(values), 3),
+        "min_us": round(values[0], 3),
+        "p50_us": round(percentile(values, 0.50), 3),
+        "p90_us": round(percentile(values, 0.90), 3),
+        "p95_us": round(percentile(values, 0.95), 3),
+        "p99_us": round(percentile(values, 0.99), 3),
+        "max_us": round(values[-1], 3),
+    }
+
+
+def measure(operation: Callable[[int], object], iterations: int, warmup: int) -> dict[str, float]:
+    """
+    Time `operation(i)` for `iterations` calls after `warmup` untimed ones, then
+    repeat a sample of calls under tracemalloc for the peak of newly allocated memory.
+    Each call gets a distinct index, so write operations can generate unique rows.
+    """
+    index = 0
+    for _ in range(warmup):
+        operation(index)
+        index += 1
+
+    durations = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            started = time.perf_counter_ns()
+            operation(index)
+            durations.append(time.perf_counter_ns() - started)
+            index += 1
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(max(1, int(iterations * MEMORY_SAMPLE_SHARE))):
+            operation(index)
+            index += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"iterations": iterations, **summarize(durations), "peak_memory_kib": round((peak - baseline) / 1024, 1)}
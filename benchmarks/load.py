@@ -0,0 +1,248 @@
+"""
+End-to-end HTTP load test of src.main:app.
+
+Starts uvicorn on a copy of a seeded benchmark database (or targets --url),
+drives it with concurrent httpx clients and reports throughput, latency
+percentiles and error rates per endpoint.
+
+    python -m benchmarks.load --workload read --concurrency 32 --duration 30
+    python -m benchmarks.load --workload write --workers 4 --output load.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import UUID
+
+import httpx
+import yaml
+
+from benchmarks import data
+from benchmarks.harness import percentile
+
+USERS = "/users/users"
+PASSPORTS = "/passports/passports"
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed: float) -> list[dict]:
+        rows = []
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            rows.append({
+                "endpoint": endpoint,
+                "requests": len(values),
+                "throughput_rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "error_rate": round(self.errors[endpoint] / len(values), 4),
+            })
+        return rows
+
+
+class Workload:
+    """
+    Request generators over the seeded data. Every generator returns
+    (endpoint label, request coroutine); labels use route templates.
+    """
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.random = random.Random(seed)
+        # indexes above the seeded range are free for creates; the seed offsets them per run
+        self._new_users = itertools.count(size + (seed * 1_000_000) % (data.MAX_USERS - size))
+        self._new_passports = itertools.count(data.passport_count(size) + seed * 10_000)
+
+    def _index(self) -> int:
+        return self.random.randrange(self.size)
+
+    def get_user(self, client: httpx.AsyncClient):
+        return "GET /users/id/{user_id}", client.get(f"{USERS}/id/{data.user_id(self._index())}")
+
+    def list_users(self, client: httpx.AsyncClient):
+        return "GET /users/", client.get(f"{USERS}/", params={"limit": 50})
+
+    def find_by_name(self, client: httpx.AsyncClient):
+        first_name, last_name, patronymic = data.full_name(self._index())
+        return "GET /users/find", client.get(f"{USERS}/find", params={"first_name": first_name, "last_name": last_name})
+
+    def find_by_last_name(self, client: httpx.AsyncClient):
+        return "GET /users/find?last_name", client.get(f"{USERS}/find", params={"last_name": data.full_name(self._index())[1], "limit": 20})
+
+    def create_user(self, client: httpx.AsyncClient):
+        index = next(self._new_users)
+        first_name, last_name, patronymic = data.full_name(index)
+        payload = {"first_name": first_name, "last_name": last_name, "patronymic": patronymic,
+                   "phone_number": data.phone_number(index)}
+        return "POST /users/", client.post(f"{USERS}/", json=payload)
+
+    def update_user(self, client: httpx.AsyncClient):
+        index = self._index()
+        first_name, last_name, patronymic = data.full_name(index)
+        payload = {"first_name": first_name, "last_name": last_name, "patronymic": patronymic,
+                   "phone_number": data.phone_number(index)}
+        return "PUT /users/{user_id}", client.put(f"{USERS}/{data.user_id(index)}", json=payload)
+
+    def create_passport(self, client: httpx.AsyncClient):
+        sequence = next(self._new_passports)
+        index = self._index()
+        payload = {"birth_date": "1990-01-01", "receipt_date": "2010-01-01",
+                   "passport_series": data.passport_series(sequence), "passport_number": data.passport_number(sequence),
+                   "user_id": str(data.user_id(index))}
+        return "POST /passports/", client.post(f"{PASSPORTS}/", json=payload)
+
+    def get_passport(self, client: httpx.AsyncClient):
+        # seeded passport ids follow the passport sequence, see benchmarks.data
+        sequence = self.random.randrange(data.passport_count(self.size))
+        return "GET /passports/{passport_id}", client.get(f"{PASSPORTS}/{UUID(int=(1 << 64) + sequence)}")
+
+
+# Weighted request mixes
+WORKLOADS: dict[str, list[tuple[str, int]]] = {
+    "read": [("get_user", 60), ("get_passport", 15), ("list_users", 10), ("find_by_name", 10), ("create_user", 5)],
+    "write": [("create_user", 40), ("create_passport", 25), ("update_user", 20), ("get_user", 15)],
+    "search": [("find_by_name", 50), ("find_by_last_name", 30), ("list_users", 20)],
+}
+
+
+async def _worker(client: httpx.AsyncClient, workload: Workload, mix: list[str], weights: list[int],
+                  stats: Stats, deadline: float, remaining: list[int]) -> None:
+    while time.perf_counter() < deadline and remaining[0] > 0:
+        remaining[0] -= 1
+        operation = workload.random.choices(mix, weights)[0]
+        endpoint, request = getattr(workload, operation)(client)
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        stats.record(endpoint, time.perf_counter() - started, ok)
+
+
+async def run_load(url: str, size: int, workload_name: str, concurrency: int, duration: float,
+                   max_requests: int, seed: int) -> tuple[list[dict], float]:
+    mix, weights = zip(*WORKLOADS[workload_name])
+    workload = Workload(size, seed)
+    stats = Stats()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+        remaining = [max_requests]
+        await asyncio.gather(*(
+            _worker(client, workload, list(mix), list(weights), stats, started + duration, remaining)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+    return stats.report(elapsed), elapsed
+
+
+def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/metrics", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn did not become ready in time")
+
+
+def start_server(size: int, port: int, workers: int, workdir: Path) -> subprocess.Popen:
+    """
+    Launch uvicorn with a config pointing at a fresh copy of the seeded database.
+    """
+    database = workdir / f"load_{size}.db"
+    shutil.copyfile(data.seed(size), database)
+
+    with open("config.yaml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    # DatabaseConfig.path joins the name to ./src/database; an absolute name replaces it
+    config["database"]["name"] = str(database.resolve())
+    config["logging"]["file_name"] = str(workdir / "app.log")
+    config_path = workdir / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+    log = open(workdir / "uvicorn.log", "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env={**os.environ, "APP_CONFIG": str(config_path)}, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def print_report(rows: list[dict], elapsed: float) -> None:
+    print(f"{'endpoint':32} {'requests':>9} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for row in rows:
+        print(f"{row['endpoint']:32} {row['requests']:>9} {row['throughput_rps']:>8} {row['p50_ms']:>8} "
+              f"{row['p95_ms']:>8} {row['p99_ms']:>8} {row['error_rate']:>7.2%}")
+    total = sum(row["requests"] for row in rows)
+    print(f"{'total':32} {total:>9} {total / elapsed:>8.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="read")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent in-flight requests")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=sys.maxsize, help="stop after this many requests")
+    parser.add_argument("--size", type=int, default=100_000, help="users in the seeded database")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="target a running server instead of launching one; must serve the seeded data")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = None
+        url = args.url
+        if url is None:
+            url = f"http://127.0.0.1:{args.port}"
+            server = start_server(args.size, args.port, args.workers, Path(workdir))
+        try:
+            if server is not None:
+                _wait_until_ready(url, server)
+            rows, elapsed = asyncio.run(run_load(
+                url, args.size, args.workload, args.concurrency, args.duration, args.requests, args.seed,
+            ))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    print_report(rows, elapsed)
+    if args.output:
+        report = {"workload": args.workload, "concurrency": args.concurrency, "workers": args.workers,
+                  "size": args.size, "elapsed_s": round(elapsed, 2), "endpoints": rows}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(row["error_rate"] > 0 for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Per-request logging overhead: the previous synchronous pipeline against the queue-based one.
+
+A simulated request logs what GET /users/id/{id} logs: one INFO line in the
+route and one DEBUG line in the repository. Both pipelines are measured with
+DEBUG written to the file and with the file handler at INFO.
+
+    python -m benchmarks.logging_overhead [--requests 20000]
+"""
+import argparse
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+from pathlib import Path
+from uuid import uuid4
+
+from src.core.logger import ContextFormatter, ContextQueueHandler, get_logger
+
+FORMAT = "%(asctime)s [%(levelname)s] %(name)s: [%(context)s] %(message)s"
+
+
+class _LegacyAdapter(logging.LoggerAdapter):
+    # src.core.logger.LoggerAdapter before the queue-based pipeline
+    def process(self, msg, kwargs):
+        context = " ".join(f"{k}={v}" for k, v in self.extra.items())
+        return f"[{context}] {msg}", kwargs
+
+
+def _legacy_get_logger(logger: logging.Logger, **kwargs) -> logging.LoggerAdapter:
+    clean_kwargs = {k: (v if v is not None else "anon") for k, v in kwargs.items()}
+    return _LegacyAdapter(logger, clean_kwargs)
+
+
+def legacy_request(logger: logging.Logger, user_id) -> None:
+    route_logger = _legacy_get_logger(logger, user_id=user_id)
+    route_logger.info(f"[get_user] GET /users/id/{user_id} - fetched user: {user_id}")
+    str_id = str(user_id)
+    repo_logger = _legacy_get_logger(logger)
+    repo_logger.debug(f"[UserRepository.get_user] DB: fetching user with id={str_id}")
+
+
+def queued_request(logger: logging.Logger, user_id) -> None:
+    route_logger = get_logger(user_id=user_id)
+    route_logger.info("[get_user] GET /users/id/%s - fetched user: %s", user_id, user_id)
+    repo_logger = get_logger()
+    repo_logger.debug("[UserRepository.get_user] DB: fetching user with id=%s", user_id)
+
+
+def _configure(logger: logging.Logger, handler: logging.Handler, file_level: int) -> None:
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(file_level)
+
+
+def run(requests: int, file_level: int, directory: Path) -> dict[str, float]:
+    # The app logger is reused so queued_request goes through get_logger()
+    logger = logging.getLogger("app")
+    user_id = uuid4()
+    results = {}
+
+    # Previous pipeline: the file write happens on the request thread
+    file_handler = logging.FileHandler(directory / "legacy.log", mode="w")
+    file_handler.setLevel(file_level)
+    file_handler.setFormatter(logging.Formatter(FORMAT.replace("[%(context)s] ", "")))
+    _configure(logger, file_handler, logging.DEBUG)
+    started = time.perf_counter()
+    for _ in range(requests):
+        legacy_request(logger, user_id)
+    results["legacy"] = (time.perf_counter() - started) / requests * 1e6
+    file_handler.close()
+
+    # Queue-based pipeline: only the enqueue is timed on the request thread
+    file_handler = logging.FileHandler(directory / "queued.log", mode="w")
+    file_handler.setLevel(file_level)
+    file_handler.setFormatter(ContextFormatter(FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    _configure(logger, ContextQueueHandler(log_queue), file_level)
+    started = time.perf_counter()
+    for _ in range(requests):
+        queued_request(logger, user_id)
+    results["queued"] = (time.perf_counter() - started) / requests * 1e6
+    listener.stop()
+    file_handler.close()
+
+    logger.handlers.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, level in (("DEBUG", logging.DEBUG), ("INFO", logging.INFO)):
+            results = run(args.requests, level, Path(directory))
+            print(
+                f"file level {name:5}: legacy {results['legacy']:6.2f} us/request, "
+                f"queued {results['queued']:6.2f} us/request "
+                f"({results['legacy'] / results['queued']:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
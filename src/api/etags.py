@@ -0,0 +1,39 @@
+"""
+Strong ETags derived from the row version columns, and the parts of
+If-None-Match / If-Match handling the routes need.
+"""
+from fastapi import HTTPException
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(header: str, version: int) -> bool:
+    """
+    Whether If-None-Match lets the request through, i.e. the client's copy is
+    not the current one. The comparison is weak, as RFC 9110 requires for it.
+    """
+    current = etag(version)
+    for tag in _tags(header):
+        if tag == "*" or tag.removeprefix("W/") == current:
+            return False
+    return True
+
+
+def expected_version(header: str | None) -> int | None:
+    """
+    Version an If-Match header requires, None when any version will do.
+    Weak, malformed or several tags can't be checked in one conditional
+    UPDATE and fail the precondition right away.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    tags = _tags(header)
+    if len(tags) == 1 and len(tags[0]) > 2 and tags[0][0] == tags[0][-1] == '"' and tags[0][1:-1].isdigit():
+        return int(tags[0][1:-1])
+    raise HTTPException(status_code=412, detail="If-Match must be a single strong ETag or *")
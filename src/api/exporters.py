@@ -0,0 +1,77 @@
+import csv
+import io
+from typing import AsyncIterable, AsyncIterator
+
+from src.api.responses import dumps
+from src.domain.users import User
+
+# Rows are buffered into chunks of roughly this size before being sent,
+# so each chunk costs one write instead of one per row
+FLUSH_SIZE = 64 * 1024
+
+CSV_COLUMNS = [
+    "id", "first_name", "last_name", "patronymic", "phone_number",
+    "passport_id", "passport_series", "passport_number", "birth_date", "receipt_date",
+]
+
+
+async def _buffered(lines: AsyncIterable[str]) -> AsyncIterator[str]:
+    """
+    Group lines into chunks of about FLUSH_SIZE characters.
+    The first line is flushed on its own so the client gets the first byte immediately.
+    """
+    buffer: list[str] = []
+    size = 0
+    first = True
+    async for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if first or size >= FLUSH_SIZE:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+            first = False
+    if buffer:
+        yield "".join(buffer)
+
+
+def users_to_ndjson(users: AsyncIterable[User]) -> AsyncIterator[str]:
+    """
+    Serialize users as newline-delimited JSON, one user (with passports) per line.
+    """
+    return _buffered(dumps(user).decode() + "\n" async for user in users)
+
+
+async def _csv_lines(users: AsyncIterable[User]) -> AsyncIterator[str]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    def flush() -> str:
+        line = output.getvalue()
+        output.seek(0)
+        output.truncate()
+        return line
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+
+    async for user in users:
+        user_columns = [user.id, user.first_name, user.last_name, user.patronymic, user.phone_number]
+        # One row per passport; users without passports get a single row with empty passport columns
+        for passport in user.passports or [None]:
+            if passport is None:
+                writer.writerow(user_columns + [None] * 5)
+            else:
+                writer.writerow(user_columns + [
+                    passport.id, passport.passport_series, passport.passport_number,
+                    passport.birth_date.isoformat() if passport.birth_date else None,
+                    passport.receipt_date.isoformat() if passport.receipt_date else None,
+                ])
+        yield flush()
+
+
+def users_to_csv(users: AsyncIterable[User]) -> AsyncIterator[str]:
+    """
+    Serialize users as CSV with a header row, one row per passport.
+    """
+    return _buffered(_csv_lines(users))
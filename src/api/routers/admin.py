@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Query
+
+from src.infrastructure.cache import repository_cache
+from src.infrastructure.database import slow_query_log
+from src.infrastructure.query_budget import query_budget
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/cache")
+@query_budget(0)
+async def get_cache_stats():
+    """
+    Hit/miss/eviction counters of the repository cache.
+    """
+    if repository_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **repository_cache.stats()}
+
+
+@router.get("/slow-queries")
+@query_budget(0)
+async def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Most recent statements above the slow-query threshold, newest first,
+    with redacted parameters and the query plan of SELECTs.
+    """
+    if slow_query_log is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.entries(limit),
+    }
@@ -0,0 +1,32 @@
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics import registry
+from src.infrastructure.query_budget import query_budget
+
+router = APIRouter(tags=["metrics"])
+
+
+def _threadpool_stats() -> dict[tuple[str], float]:
+    # run_in_threadpool and sync endpoints share anyio's default limiter;
+    # borrowed == total means new blocking calls queue up as waiting tasks.
+    # Only readable on the event loop, which is where /metrics renders
+    limiter = current_default_thread_limiter()
+    return {
+        ("total",): limiter.total_tokens,
+        ("borrowed",): limiter.borrowed_tokens,
+        ("waiting",): limiter.statistics().tasks_waiting,
+    }
+
+
+registry.gauge("threadpool_tokens", "Worker threads of the request threadpool by state", ("state",), _threadpool_stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+@query_budget(0)
+async def get_metrics():
+    """
+    Application metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
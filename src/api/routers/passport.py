@@ -1,93 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 
+from src.api.etags import etag, expected_version, none_match
 from src.infrastructure.database import get_db
 from src.domain.passport import Passport
 from src.schemas.passport_schema import PassportCreate, PassportUpdate, PassportOut
-from src.infrastructure.repository.passport_repo import PassportRepository
+from src.infrastructure.repository.async_passport_repo import AsyncPassportRepository
+from src.infrastructure.repository.factory import passport_repository_factory
 from src.services.passport_service import PassportService
-from src.utils.exceptions import NotFoundError, DuplicateError, DomainValidationError
+from src.utils.exceptions import NotFoundError, DuplicateError, DomainValidationError, VersionConflictError
 from src.core.logger import get_logger
+from src.infrastructure.query_budget import query_budget
 
 
 router = APIRouter(prefix="/passports", tags=["passports"])
 
-def get_service(db: Session = Depends(get_db)) -> PassportService:
-    repo = PassportRepository(db)
+def get_service(db: AsyncSession | Session = Depends(get_db)) -> PassportService:
+    repo = AsyncPassportRepository(db, passport_repository_factory)
     return PassportService(repo)
 
 
 @router.post("/", response_model=PassportOut)
-def create_passport(passport_in: PassportCreate, service: PassportService = Depends(get_service)):
+# the insert, the owner's version bump and the refresh
+@query_budget(3)
+async def create_passport(passport_in: PassportCreate, service: PassportService = Depends(get_service)):
     logger = get_logger(user_id=passport_in.user_id)
-    logger.info(f"[create_passport] payload={passport_in.model_dump()}")
+    logger.info("[create_passport] payload=%s", passport_in.model_dump())
 
     try:
-        passport = service.create_passport(passport_in)
+        passport = await service.create_passport(passport_in)
     except NotFoundError:
-        logger.warning(f"[create_passport] user not found id={passport_in.user_id}")
+        logger.warning("[create_passport] user not found id=%s", passport_in.user_id)
         raise HTTPException(status_code=404, detail="User not found")
     except DuplicateError as e:
-        logger.warning(f"[create_passport] duplicate: {e}")
+        logger.warning("[create_passport] duplicate: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except DomainValidationError as e:
-        logger.error(f"[create_passport] validation error: {e}")
+        logger.error("[create_passport] validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
-    logger.info(f"[create_passport] created id={passport.id}")
+    logger.info("[create_passport] created id=%s", passport.id)
     return passport
 
 @router.get("/{passport_id}", response_model=PassportOut)
-def get_passport(passport_id: UUID, service: PassportService = Depends(get_service)):
+# the version lookup of a conditional request, then the passport if the client's copy is stale
+@query_budget(2)
+async def get_passport(passport_id: UUID, response: Response, if_none_match: str | None = Header(None),
+    service: PassportService = Depends(get_service)):
     logger = get_logger(passport_id=passport_id)
-    logger.info(f"[get_passport] id={passport_id}")
+    logger.info("[get_passport] id=%s", passport_id)
 
     try:
-        return service.get_passport(passport_id)
+        if if_none_match is not None:
+            version = await service.get_passport_version(passport_id)
+            if not none_match(if_none_match, version):
+                logger.info("[get_passport] not modified id=%s, version=%s", passport_id, version)
+                return Response(status_code=304, headers={"ETag": etag(version)})
+
+        passport = await service.get_passport(passport_id)
+        response.headers["ETag"] = etag(passport.version)
+        return passport
     except NotFoundError:
-        logger.warning(f"[get_passport] not found id={passport_id}")
+        logger.warning("[get_passport] not found id=%s", passport_id)
         raise HTTPException(status_code=404, detail="Passport not found")
     
 @router.put("/{passport_id}", response_model=PassportOut)
-def update_passport(passport_id: UUID, passport_in: PassportUpdate, service: PassportService = Depends(get_service)):
+# the single UPDATE ... RETURNING, after a read of the stored dates when only one date changes
+@query_budget(2)
+async def update_passport(passport_id: UUID, passport_in: PassportUpdate, response: Response,
+    if_match: str | None = Header(None), service: PassportService = Depends(get_service)):
     logger = get_logger(passport_id=passport_id)
-    logger.info(f"[update_passport] payload={passport_in.model_dump()}")
+    logger.info("[update_passport] payload=%s", passport_in.model_dump())
 
+    version = expected_version(if_match)
     try:
-        existing = service.get_passport(passport_id)
-
+        # Fields left out keep their stored values; the owner is not changed here
         updated_passport = Passport(
             id=passport_id,
-            birth_date=passport_in.birth_date or existing.birth_date,
-            passport_number=passport_in.passport_number or existing.passport_number,
-            passport_series=passport_in.passport_series or existing.passport_series,
-            receipt_date=passport_in.receipt_date or existing.receipt_date,
-            user_id=existing.user_id
+            birth_date=passport_in.birth_date,
+            passport_number=passport_in.passport_number,
+            passport_series=passport_in.passport_series,
+            receipt_date=passport_in.receipt_date,
+            user_id=None
         )
 
-        return service.update_passport(updated_passport)
+        passport = await service.update_passport(updated_passport, version)
     except NotFoundError:
-        logger.warning(f"[update_passport] not found id={passport_id}")
+        logger.warning("[update_passport] not found id=%s", passport_id)
         raise HTTPException(status_code=404, detail="Passport not found")
+    except VersionConflictError as e:
+        logger.warning("[update_passport] precondition failed: %s", e)
+        raise HTTPException(status_code=412, detail=str(e))
     except DuplicateError as e:
-        logger.warning(f"[update_passport] duplicate: {e}")
+        logger.warning("[update_passport] duplicate: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except DomainValidationError as e:
-        logger.error(f"[update_passport] validation error: {e}")
+        logger.error("[update_passport] validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
+    response.headers["ETag"] = etag(passport.version)
+    return passport
+
 
 @router.delete("/{passport_id}")
-def delete_passport(passport_id: UUID, service: PassportService = Depends(get_service)):
+# one DELETE ... RETURNING
+@query_budget(1)
+async def delete_passport(passport_id: UUID, service: PassportService = Depends(get_service)):
     logger = get_logger(passport_id=passport_id)
-    logger.info(f"[delete_passport] attempt to delete id={passport_id}")
+    logger.info("[delete_passport] attempt to delete id=%s", passport_id)
 
     try:
-        service.delete_passport(passport_id)
+        await service.delete_passport(passport_id)
     except NotFoundError:
-        logger.warning(f"[delete_passport] not found id={passport_id}")
+        logger.warning("[delete_passport] not found id=%s", passport_id)
         raise HTTPException(status_code=404, detail="Passport not found")
 
-    logger.info(f"[delete_passport] deleted id={passport_id}")
+    logger.info("[delete_passport] deleted id=%s", passport_id)
     return {"detail": "Passport deleted successfully"}
\ No newline at end of file
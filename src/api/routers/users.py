@@ -1,101 +1,394 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from math import ceil
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Callable, Dict, List
 from uuid import UUID
 
+from src.api.etags import etag, expected_version, none_match
+from src.api.exporters import users_to_csv, users_to_ndjson
+from src.api.responses import DomainJSONResponse, project
 from src.domain.identifiers  import UserId
-from src.schemas.user_schema import UsersCreate, UsersOut, UsersUpdate
+from src.domain.passport import Passport
+from src.domain.users import FULL_USER, USER_FIELDS, User, UserProjection
+from src.schemas.user_schema import UsersBatchGet, UsersBulkCreate, UsersBulkResult, UsersCreate, UsersOut, UsersPage, UsersUpdate
 from src.infrastructure.database import get_db
-from src.infrastructure.repository.user_repo import UserRepository
-from src.infrastructure.repository.passport_repo import PassportRepository  
-from src.services.user_service import UserService
-from src.utils.exceptions import DomainValidationError, DuplicateError, NotFoundError
+from src.infrastructure.repository.async_user_repo import AsyncUserRepository
+from src.infrastructure.repository.async_passport_repo import AsyncPassportRepository
+from src.infrastructure.repository.factory import passport_repository_factory, user_repository_factory
+from src.infrastructure.repository.helpers import IN_CLAUSE_CHUNK_SIZE
+from src.services.user_service import UserService, load_users_by_id
+from src.utils.dataloader import DataLoader
+from src.utils.exceptions import DomainValidationError, DuplicateError, NotFoundError, VersionConflictError
 from src.core.logger import get_logger
+from src.infrastructure.query_budget import query_budget
 
 # creating router
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-def get_service(db: Session = Depends(get_db)) -> UserService:
+# Requests resolve their sync dependencies in the threadpool, so concurrent ones reach
+# the loader a few event-loop iterations apart: collect their lookups for this long
+USER_LOADER_WINDOW = 0.002
+
+def make_user_loader(session_scope: Callable[[], AsyncIterator[AsyncSession | Session]] = get_db,
+    window: float = USER_LOADER_WINDOW) -> DataLoader:
+    """
+    Loader of whole users by id, shared by the requests of the process: concurrent
+    lookups within `window` seconds share one query. A batch serves several requests,
+    so it runs on a session of its own from `session_scope`, a generator like get_db.
+    """
+    # the users and their passports, one IN query each per chunk of ids
+    @query_budget(lambda user_ids: 2 * ceil(len(user_ids) / IN_CLAUSE_CHUNK_SIZE), name="user_loader")
+    async def batch_load(user_ids: list[UserId]) -> dict[UserId, User]:
+        async with asynccontextmanager(session_scope)() as db:
+            return await load_users_by_id(AsyncUserRepository(db, user_repository_factory), user_ids)
+    return DataLoader(batch_load, window)
+
+_user_loader = make_user_loader()
+
+def get_user_loader() -> DataLoader:
+    """
+    Dependency to get the process-wide user loader.
+    """
+    return _user_loader
+
+def get_service(db: AsyncSession | Session = Depends(get_db),
+    user_loader: DataLoader = Depends(get_user_loader)) -> UserService:
     """
     Dependency to get UserService with a database session.
     """
-    user_repo = UserRepository(db)
-    passport_repo = PassportRepository(db)
-    return UserService(user_repo, passport_repo)
+    user_repo = AsyncUserRepository(db, user_repository_factory)
+    passport_repo = AsyncPassportRepository(db, passport_repository_factory)
+    return UserService(user_repo, passport_repo, user_loader)
 
 @router.post("/", response_model=UsersOut)
-def create_user(user_in: UsersCreate, service: UserService = Depends(get_service)):
+@query_budget(4)
+async def create_user(user_in: UsersCreate, service: UserService = Depends(get_service)):
     logger = get_logger(user_id=None)
-    logger.info(f"[create_user] POST /users - payload: {user_in.model_dump()}")
+    logger.info("[create_user] POST /users - payload: %s", user_in.model_dump())
 
     try:
-        user = service.create_user(user_in)
+        user = await service.create_user(user_in)
+    except DuplicateError as e:
+        logger.warning("[create_user] Duplicate error: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
     except DomainValidationError as e:
-        logger.error(f"[create_user] Validation error: {e}")
+        logger.error("[create_user] Validation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
-    logger.info(f"[create_user] User created id={user.id}")
+    logger.info("[create_user] User created id=%s", user.id)
     return user
 
-@router.get("/id/{user_id}", response_model=UsersOut)
-def get_user(user_id: UUID, service: UserService = Depends(get_service)):
+_USER_FIELDS = ("first_name", "last_name", "patronymic", "phone_number")
+_PASSPORT_FIELDS = ("birth_date", "passport_series", "passport_number", "receipt_date")
+
+def _is_plain_row(row: Any) -> bool:
+    """
+    Whether a row has every field as a string, so the columnar validators
+    accept it exactly when UsersBulkCreate would.
+    """
+    if not isinstance(row, dict) or any(type(row.get(name)) is not str for name in _USER_FIELDS):
+        return False
+    passports = row.get("passports", [])
+    return type(passports) is list and all(
+        isinstance(passport, dict) and all(type(passport.get(name)) is str for name in _PASSPORT_FIELDS)
+        for passport in passports
+    )
+
+def _validate_bulk_rows(payload: List[Dict[str, Any]]) -> tuple[list[UsersBulkResult | None], list[User], list[int]]:
+    """
+    Validate bulk import rows and convert the valid ones to domain users.
+    """
+    # numpy and pandas are only imported by the workers that serve a bulk import
+    from src.utils.batch_validators import validate_batch
+
+    results: list[UsersBulkResult | None] = [None] * len(payload)
+    users: list[User | None] = [None] * len(payload)
+
+    # Plain rows are checked column-wise first; only rows that fail there (or that are
+    # not plain) go through pydantic, which also produces their error details
+    plain = [index for index, row in enumerate(payload) if _is_plain_row(row)]
+    owners = [index for index in plain for _ in payload[index].get("passports", [])]
+    user_columns = validate_batch({name: [payload[index][name] for index in plain] for name in _USER_FIELDS})
+    passport_columns = validate_batch({
+        name: [passport[name] for index in plain for passport in payload[index].get("passports", [])]
+        for name in _PASSPORT_FIELDS
+    })
+    rejected = {plain[position] for position in user_columns.invalid_rows()}
+    rejected.update(owners[position] for position in passport_columns.invalid_rows())
+
+    passports: dict[int, list[Passport]] = {}
+    for index, birth_date, series, number, receipt_date in zip(owners, *(passport_columns.values[name] for name in _PASSPORT_FIELDS)):
+        passports.setdefault(index, []).append(Passport(
+            id=None, birth_date=birth_date, passport_series=series, passport_number=number,
+            receipt_date=receipt_date, user_id=None,
+        ))
+    for index, first_name, last_name, patronymic, phone_number in zip(plain, *(user_columns.values[name] for name in _USER_FIELDS)):
+        if index not in rejected:
+            users[index] = User(id=None, first_name=first_name, last_name=last_name, patronymic=patronymic,
+                                phone_number=phone_number, passports=passports.get(index, []))
+
+    # Rows are validated one by one so that a bad row doesn't reject the whole batch
+    for index, row in enumerate(payload):
+        if users[index] is not None:
+            continue
+        try:
+            user_in = UsersBulkCreate.model_validate(row)
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            results[index] = UsersBulkResult(index=index, status="invalid", detail=detail)
+            continue
+
+        users[index] = User(
+            id=None,
+            first_name=user_in.first_name,
+            last_name=user_in.last_name,
+            patronymic=user_in.patronymic,
+            phone_number=user_in.phone_number,
+            passports=[Passport(id=None, user_id=None, **p.model_dump()) for p in user_in.passports],
+        )
+
+    positions = [index for index, user in enumerate(users) if user is not None]
+    return results, [users[index] for index in positions], positions
+
+@router.post("/bulk", response_model=List[UsersBulkResult])
+# set-based lookups run once per IN_CLAUSE_CHUNK_SIZE rows, then one insert per table
+@query_budget(lambda payload, **_: 2 + 3 * ceil(len(payload) / IN_CLAUSE_CHUNK_SIZE))
+async def create_users(payload: List[Dict[str, Any]] = Body(...), service: UserService = Depends(get_service)):
+    logger = get_logger(user_id=None)
+    logger.info("[create_users] POST /users/bulk - rows: %s", len(payload))
+
+    # pydantic validation of a large batch is CPU-bound, keep it off the event loop
+    results, users, positions = await run_in_threadpool(_validate_bulk_rows, payload)
+
+    try:
+        outcomes = await service.create_users(users)
+    except DuplicateError as e:
+        # A concurrent writer inserted a conflicting row after the batch was checked
+        logger.warning("[create_users] Duplicate error: %s", e)
+        raise HTTPException(status_code=409, detail=str(e))
+
+    for index, outcome in zip(positions, outcomes):
+        if isinstance(outcome, DuplicateError):
+            results[index] = UsersBulkResult(index=index, status="duplicate", detail=str(outcome))
+        elif isinstance(outcome, DomainValidationError):
+            results[index] = UsersBulkResult(index=index, status="invalid", detail=str(outcome))
+        else:
+            results[index] = UsersBulkResult(index=index, status="created", id=outcome.id)
+
+    created = sum(1 for result in results if result.status == "created")
+    logger.info("[create_users] created %s of %s users", created, len(payload))
+    return results
+
+def _names(value: str | None) -> set[str]:
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+def get_projection(
+    fields: str | None = Query(None, description="Comma separated user fields to return, the id always comes along"),
+    include: str | None = Query(None, description="passports, to return them along with the fields"),
+) -> UserProjection:
+    """
+    Users come whole unless `fields` or `include` is given. Then only the id, the
+    listed fields (all of them without `fields`) and, with include=passports, the
+    passports are read and returned.
+    """
+    if fields is None and include is None:
+        return FULL_USER
+
+    includes = _names(include)
+    if includes - {"passports"}:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(includes - {'passports'}))}")
+    selected = _names(fields) - {"id"} if fields is not None else set(USER_FIELDS)
+    if selected - set(USER_FIELDS):
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(selected - set(USER_FIELDS)))}")
+    return UserProjection(tuple(field for field in USER_FIELDS if field in selected), "passports" in includes)
+
+# Read routes return DomainJSONResponse: users are written as JSON without a second validation pass.
+# They take the fields/include projection of get_projection
+@router.get("/id/{user_id}", response_model=UsersOut, response_class=DomainJSONResponse)
+# the version lookup of a conditional request, then a projection if the client's copy is stale;
+# whole users come from the user loader, which budgets its batches on its own session
+@query_budget(2)
+async def get_user(user_id: UUID, if_none_match: str | None = Header(None),
+    projection: UserProjection = Depends(get_projection), service: UserService = Depends(get_service)):
     logger = get_logger(user_id=user_id)
-    logger.info(f"[get_user] GET /users/id/{user_id} - fetched user: {user_id}")
+    logger.info("[get_user] GET /users/id/%s - fetched user: %s", user_id, user_id)
 
     try:
-        return service.get_user(UserId(user_id))
+        if if_none_match is not None:
+            version = await service.get_user_version(UserId(user_id))
+            if not none_match(if_none_match, version):
+                logger.info("[get_user] not modified id=%s, version=%s", user_id, version)
+                return Response(status_code=304, headers={"ETag": etag(version)})
+
+        user = await service.get_user(UserId(user_id), projection)
+        return DomainJSONResponse(project(user, projection), headers={"ETag": etag(user.version)})
     except NotFoundError:
-        logger.warning(f"[get_user] not found id={user_id}")
+        logger.warning("[get_user] not found id=%s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
 
-@router.get("/find", response_model=List[UsersOut])
-def get_user_by_full_name(first_name: str | None = Query(None),
+def _parse_ids(values: list[str]) -> list[UserId]:
+    # Both ?ids=a,b and ?ids=a&ids=b
+    try:
+        return [UserId(UUID(value.strip())) for item in values for value in item.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be UUIDs")
+
+@router.get("/", response_model=UsersPage, response_class=DomainJSONResponse)
+# one page, or the users of `ids`: the users and their passports, one IN query each
+@query_budget(2)
+async def list_users(limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
+    ids: List[str] | None = Query(None),
+    projection: UserProjection = Depends(get_projection),
+    service: UserService = Depends(get_service)):
+    logger = get_logger(user_id=None)
+    logger.info("[list_users] GET /users - limit: %s, cursor: %s, ids: %s", limit, cursor, ids)
+
+    try:
+        if ids is not None:
+            # A batch by id is a single page: limit and cursor don't apply
+            users = await service.get_users(_parse_ids(ids), projection)
+            return DomainJSONResponse({"items": project(users, projection), "next_cursor": None})
+        users, next_cursor = await service.list_users(limit, cursor, projection)
+    except DomainValidationError as e:
+        logger.warning("[list_users] invalid request: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return DomainJSONResponse({"items": project(users, projection), "next_cursor": next_cursor})
+
+@router.post("/batch-get", response_model=List[UsersOut], response_class=DomainJSONResponse)
+# the users and their passports, one IN query each
+@query_budget(2)
+async def get_users(payload: UsersBatchGet, projection: UserProjection = Depends(get_projection),
+    service: UserService = Depends(get_service)):
+    logger = get_logger(user_id=None)
+    logger.info("[get_users] POST /users/batch-get - %s ids", len(payload.ids))
+
+    try:
+        users = await service.get_users([UserId(user_id) for user_id in payload.ids], projection)
+    except DomainValidationError as e:
+        logger.warning("[get_users] invalid request: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info("[get_users] found %s of %s users", len(users), len(payload.ids))
+    return DomainJSONResponse(project(users, projection))
+
+@router.get("/find", response_model=List[UsersOut], response_class=DomainJSONResponse)
+@query_budget(2)
+async def get_user_by_full_name(first_name: str | None = Query(None),
     last_name: str | None = Query(None),
     patronymic: str | None = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    projection: UserProjection = Depends(get_projection),
     service: UserService = Depends(get_service)):
 
 
     logger = get_logger(user_id=None)
     log_message = str(first_name) + ", " + str(last_name) + ", " + str(patronymic)
-    logger.info(f"[get_user_by_full_name] GET /users/by_name - fetched user by name: {log_message.strip()}")
+    logger.info("[get_user_by_full_name] GET /users/by_name - fetched user by name: %s", log_message.strip())
 
     try:
-        user = service.get_user_by_full_name(first_name, last_name, patronymic)
-        logger.info(f"[get_user_by_full_name] User retrieved: {log_message.strip()}")
-        return user
+        user = await service.get_user_by_full_name(first_name, last_name, patronymic, limit, projection)
+        logger.info("[get_user_by_full_name] User retrieved: %s", log_message.strip())
+        return DomainJSONResponse(project(user, projection))
     except NotFoundError:
-        logger.warning(f"[get_user_by_full_name] User not found with name: {log_message.strip()}")
+        logger.warning("[get_user_by_full_name] User not found with name: %s", log_message.strip())
         raise HTTPException(status_code=404, detail="User not found")
 
+@router.get("/search", response_model=List[UsersOut], response_class=DomainJSONResponse)
+@query_budget(2)
+async def search_users(q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    projection: UserProjection = Depends(get_projection),
+    service: UserService = Depends(get_service)):
+    logger = get_logger(user_id=None)
+    logger.info("[search_users] GET /users/search - q: %s, limit: %s", q, limit)
+
+    try:
+        return DomainJSONResponse(project(await service.search_users(q, limit, projection), projection))
+    except DomainValidationError as e:
+        logger.warning("[search_users] invalid query: %s", q)
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/search/phone", response_model=List[UsersOut], response_class=DomainJSONResponse)
+@query_budget(2)
+async def search_users_by_phone_suffix(suffix: str = Query(..., min_length=1, max_length=20),
+    limit: int = Query(20, ge=1, le=100),
+    projection: UserProjection = Depends(get_projection),
+    service: UserService = Depends(get_service)):
+    logger = get_logger(user_id=None)
+    logger.info("[search_users_by_phone_suffix] GET /users/search/phone - suffix: %s, limit: %s", suffix, limit)
+
+    try:
+        return DomainJSONResponse(project(await service.search_users_by_phone_suffix(suffix, limit, projection), projection))
+    except DomainValidationError as e:
+        logger.warning("[search_users_by_phone_suffix] invalid suffix: %s", suffix)
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/export")
+# the handler only builds the stream; its batched reads run while the body is sent
+@query_budget(0)
+async def export_users(export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    service: UserService = Depends(get_service)):
+    logger = get_logger(user_id=None)
+    logger.info("[export_users] GET /users/export - format: %s", export_format)
+
+    users = service.export_users()
+    if export_format == "csv":
+        return StreamingResponse(
+            users_to_csv(users),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+        )
+    return StreamingResponse(users_to_ndjson(users), media_type="application/x-ndjson")
+
 @router.put("/{user_id}", response_model=UsersOut)
-def update_user(
-    user_id: UUID, user_in: UsersUpdate, service: UserService = Depends(get_service)
+# the single UPDATE ... RETURNING and the passports of the response
+@query_budget(2)
+async def update_user(
+    user_id: UUID, user_in: UsersUpdate, response: Response, if_match: str | None = Header(None),
+    service: UserService = Depends(get_service)
 ):
     logger = get_logger(user_id=user_id)
-    logger.info(f"[update_user] PUT /users/{user_id} - update payload: {user_in.model_dump()}")
+    logger.info("[update_user] PUT /users/%s - update payload: %s", user_id, user_in.model_dump())
 
     try:
-        return service.update_user(UserId(user_id), user_in)
+        user = await service.update_user(UserId(user_id), user_in, expected_version=expected_version(if_match))
     except NotFoundError:
-        logger.warning(f"[update_user] not found id={user_id}")
+        logger.warning("[update_user] not found id=%s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
+    except VersionConflictError as e:
+        logger.warning("[update_user] precondition failed: %s", e)
+        raise HTTPException(status_code=412, detail=str(e))
     except DuplicateError as e:
-        logger.warning(f"[update_user] Duplicate error: {e}")
+        logger.warning("[update_user] Duplicate error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
+    response.headers["ETag"] = etag(user.version)
+    return user
+
 @router.delete("/{user_id}")
-def delete_user(user_id: UUID, service: UserService = Depends(get_service)):
+# the cache's lookup of the passports to invalidate, and one DELETE ... RETURNING
+@query_budget(2)
+async def delete_user(user_id: UUID, service: UserService = Depends(get_service)):
     logger = get_logger(user_id=user_id)
-    logger.info(f"[delete_user] DELETE /users/{user_id} - attempt to delete user")
+    logger.info("[delete_user] DELETE /users/%s - attempt to delete user", user_id)
 
     try:
         #parsed_id = UserId(UUID(user_id))
         #service.delete_user(parsed_id)
-        service.delete_user(UserId(user_id))
+        await service.delete_user(UserId(user_id))
     except NotFoundError:
-        logger.warning(f"[delete_user] not found id={user_id}")
+        logger.warning("[delete_user] not found id=%s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
 
-    logger.info(f"[delete_user] deleted id={user_id}")
+    logger.info("[delete_user] deleted id=%s", user_id)
     return {"detail": "User deleted successfully"}
\ No newline at end of file
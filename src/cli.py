@@ -0,0 +1,58 @@
+import argparse
+
+from src.core.logger import setup_logging
+from src.infrastructure.database import engine
+from src.infrastructure.migrations import MIGRATIONS, current_version, migrate, pending_migrations
+
+
+def cmd_migrate(args: argparse.Namespace) -> None:
+    applied = migrate(engine, MIGRATIONS, target=args.target)
+    for migration in applied:
+        print(f"applied {migration.version:04d}_{migration.name}")
+    print(f"schema version: {current_version(engine)}")
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    print(f"schema version: {current_version(engine)}")
+    for migration in pending_migrations(engine, MIGRATIONS):
+        print(f"pending {migration.version:04d}_{migration.name}")
+
+
+def cmd_seed(args: argparse.Namespace) -> None:
+    # NumPy is only needed by this command
+    from src.infrastructure.seeding import seed_database
+
+    result = seed_database(engine, args.users, passport_ratio=args.passport_ratio, batch_size=args.batch_size,
+                           drop_indexes=args.drop_indexes, seed=args.seed)
+    print(f"seeded {result.users} users and {result.passports} passports in {result.seconds:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="CRUD application management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="apply pending schema migrations")
+    migrate_parser.add_argument("--target", type=int, default=None, help="stop after this version")
+    migrate_parser.set_defaults(handler=cmd_migrate)
+
+    status_parser = commands.add_parser("status", help="show the schema version and pending migrations")
+    status_parser.set_defaults(handler=cmd_status)
+
+    seed_parser = commands.add_parser("seed", help="insert generated users and passports")
+    seed_parser.add_argument("--users", type=int, required=True, help="number of users to add")
+    seed_parser.add_argument("--passport-ratio", type=float, default=0.9, help="share of the users with a passport")
+    seed_parser.add_argument("--batch-size", type=int, default=200_000, help="rows per transaction")
+    seed_parser.add_argument("--drop-indexes", action="store_true", help="drop secondary indexes during the load")
+    seed_parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible data")
+    seed_parser.set_defaults(handler=cmd_seed)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    setup_logging()
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
+import os
 import yaml
 from src.schemas.config import AppConfig
 
 
-def load_config(path: str = "config.yaml") -> AppConfig:
+def load_config(path: str | None = None) -> AppConfig:
+    # APP_CONFIG points a process at another file, e.g. the load test server
+    path = path or os.environ.get("APP_CONFIG", "config.yaml")
     with open(path, "r", encoding="utf-8") as f:
         cfg_dict = yaml.safe_load(f)
     return AppConfig(**cfg_dict)
@@ -1,61 +1,135 @@
+import atexit
 import logging
-from typing import Optional
+import queue
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler, QueueListener
+from types import MappingProxyType
+from typing import Iterator, Mapping, Optional
 from src.core.config import configs
 
-class LoggerAdapter(logging.LoggerAdapter):
+# Contextual information (user_id, passport_id, ...) of the current request or task.
+# Mappings are replaced, never mutated, so a record can keep a reference to the one it was logged with
+_log_context: ContextVar[Mapping[str, object]] = ContextVar("log_context", default=MappingProxyType({}))
+
+_listener: Optional[QueueListener] = None
+
+
+def bind_log_context(**kwargs) -> Token:
     """
-    Custom logger adapter to add contextual information to log records.
+    Add values to the logging context of the current request or task.
+    If a context value is None, it defaults to 'anon'.
+    Returns:
+        Token: Token to restore the previous context with reset_log_context.
     """
+    context = dict(_log_context.get())
+    context.update({k: (v if v is not None else "anon") for k, v in kwargs.items()})
+    return _log_context.set(MappingProxyType(context))
+
+
+def reset_log_context(token: Token) -> None:
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**kwargs) -> Iterator[None]:
+    """
+    Bind logging context values for the duration of the block.
+    """
+    token = bind_log_context(**kwargs)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class ContextFormatter(logging.Formatter):
+    """
+    Formatter that renders the logging context captured with the record as `%(context)s`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        context = getattr(record, "log_context", None) or {}
+        record.context = " ".join(f"{k}={v}" for k, v in context.items())
+        return super().format(record)
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Queue handler that captures the logging context on the calling thread
+    and leaves all formatting to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record doesn't need to be
+        # made picklable: skip QueueHandler's eager formatting on the request path
+        record.log_context = _log_context.get()
+        return record
 
-    def process(self, msg, kwargs):
-        # Add all extra context information to the log message
-        context = " ".join(f"{k}={v}" for k, v in self.extra.items())
-        return f"[{context}] {msg}", kwargs
-    
 
 def setup_logging() -> logging.Logger:
     """
     Configure logging for the application with file and console output.
-    
+    Records are handed to a queue on the calling thread; a background
+    listener formats them and does the file and console I/O.
+
     Returns:
         logging.Logger: Configured logger with name 'app'.
     """
+    global _listener
+
     logger = logging.getLogger("app")
-    logger.setLevel(logging.DEBUG)
-    
+
     # Avoid adding handlers multiple times
     if not logger.handlers:
-        formatter = logging.Formatter(configs.logging.format)
-        
+        formatter = ContextFormatter(configs.logging.format)
+
         # File handler (DEBUG and above) (mode='w' to overwrite on each run)
         file_handler = logging.FileHandler(configs.logging.file_name, mode='w')
         file_handler.setLevel(configs.logging.file_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+
         # Console handler (INFO and above)
         stream_handler = logging.StreamHandler()
         stream_handler.setLevel(configs.logging.console_level)
         stream_handler.setFormatter(formatter)
-        logger.addHandler(stream_handler)
-    
+
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(ContextQueueHandler(log_queue))
+        _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+        _listener.start()
+        # flush the queue on shutdown
+        atexit.register(_listener.stop)
+
+    # The logger level is the lowest handler level, so disabled calls return
+    # before a record is created or any argument is formatted
+    logger.setLevel(min(
+        logging.getLevelName(configs.logging.file_level),
+        logging.getLevelName(configs.logging.console_level),
+    ))
+
     # Configure third-party loggers
     # logging.getLogger("uvicorn").setLevel(logging.INFO)
     # logging.getLogger("uvicorn.access").setLevel(logging.INFO)
     # logging.getLogger("sqlalchemy.engine").setLevel(logging.DEBUG)
-    
+
     return logger
 
 
-def get_logger(**kwargs) -> LoggerAdapter:
+def get_logger(**kwargs) -> logging.Logger:
     """
-    Factory function to get a logger with arbitrary context.
-    If a context value is None, it defaults to 'anon'.
+    Return the shared application logger.
+    Keyword arguments are bound to the logging context of the current
+    request or task (see bind_log_context), so they also show up in
+    the records of the services and repositories it calls.
     Args:
         **kwargs: Arbitrary keyword arguments for logging context.
     Returns:
-        LoggerAdapter: Logger with provided context.
+        logging.Logger: Logger with name 'app'.
     """
-    main_logger = logging.getLogger("app")
-    clean_kwargs = {k: (v if v is not None else "anon") for k, v in kwargs.items()}
-    return LoggerAdapter(main_logger, clean_kwargs)
\ No newline at end of file
+    if kwargs:
+        bind_log_context(**kwargs)
+    return _app_logger
+
+
+_app_logger = logging.getLogger("app")
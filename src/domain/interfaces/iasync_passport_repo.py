@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from src.domain.passport import Passport
+from src.domain.identifiers  import PassportId
+
+class IAsyncPassportRepository(ABC):
+    @abstractmethod
+    async def create_passport(self, user: Passport) -> Passport:
+        pass
+
+    @abstractmethod
+    async def get_passport(self, user_id: PassportId) -> Optional[Passport]:
+        pass
+
+    @abstractmethod
+    async def get_passport_version(self, passport_id: PassportId) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    async def get_passport_by_series_and_number(self, series: str, number: str) -> Optional[Passport]:
+        pass
+
+    @abstractmethod
+    async def get_passport_by_number(self, number: str) -> Passport | None:
+        pass
+
+    @abstractmethod
+    async def get_passport_by_series(self, series: str) -> Passport | None:
+        pass
+
+    @abstractmethod
+    async def get_existing_passport_numbers(self, numbers: Iterable[str]) -> set[str]:
+        pass
+
+    @abstractmethod
+    async def update_passport(self, user: Passport, expected_version: Optional[int] = None) -> Passport:
+        pass
+
+    @abstractmethod
+    async def delete_passport(self, user_id: PassportId) -> Optional[Passport]:
+        pass
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, Optional
+
+from src.domain.users import FULL_USER, User, UserProjection
+from src.domain.identifiers import UserId
+
+class IAsyncUserRepository(ABC):
+    @abstractmethod
+    async def create_user(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    async def create_users(self, users: list[User]) -> list[User]:
+        pass
+
+    @abstractmethod
+    async def get_user(self, user_id: UserId, projection: UserProjection = FULL_USER) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def get_users(self, user_ids: Iterable[UserId], projection: UserProjection = FULL_USER) -> list[User]:
+        pass
+
+    @abstractmethod
+    async def get_user_version(self, user_id: UserId) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    async def get_user_by_full_name(self, first_name: str | None = None,
+        last_name: str | None = None,
+        patronymic: str | None = None,
+        limit: int | None = None,
+        projection: UserProjection = FULL_USER) -> list[User]:
+        pass
+
+    @abstractmethod
+    async def list_users(self, limit: int, after: tuple[str, str, UserId] | None = None,
+                         projection: UserProjection = FULL_USER) -> list[User]:
+        pass
+
+    @abstractmethod
+    async def search_users(self, terms: list[str], limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        pass
+
+    @abstractmethod
+    async def get_user_by_phone(self, phone_number: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def search_users_by_phone_suffix(self, digits: str, limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        pass
+
+    @abstractmethod
+    def iter_users(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        pass
+
+    @abstractmethod
+    async def get_existing_phone_numbers(self, phone_numbers: Iterable[str]) -> set[str]:
+        pass
+
+    @abstractmethod
+    async def get_existing_full_names(self, full_names: Iterable[tuple[str, str, str | None]]) -> set[tuple[str, str, str | None]]:
+        pass
+
+    @abstractmethod
+    async def update_user(self, user: User, expected_version: Optional[int] = None) -> User:
+        pass
+
+    @abstractmethod
+    async def delete_user(self, user_id: UserId) -> bool:
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Optional
 
 from src.domain.passport import Passport
 from src.domain.identifiers  import PassportId
@@ -13,6 +13,10 @@ class IPassportRepository(ABC):
     def get_passport(self, user_id: PassportId) -> Optional[Passport]:
         pass
 
+    @abstractmethod
+    def get_passport_version(self, passport_id: PassportId) -> Optional[int]:
+        pass
+
     @abstractmethod
     def get_passport_by_series_and_number(self, series: str, number: str) -> Optional[Passport]:
         pass
@@ -26,9 +30,13 @@ class IPassportRepository(ABC):
         pass
 
     @abstractmethod
-    def update_passport(self, user: Passport) -> Passport:
+    def get_existing_passport_numbers(self, numbers: Iterable[str]) -> set[str]:
+        pass
+
+    @abstractmethod
+    def update_passport(self, user: Passport, expected_version: Optional[int] = None) -> Passport:
         pass
 
     @abstractmethod
-    def delete_passport(self, user_id: PassportId) -> bool:
+    def delete_passport(self, user_id: PassportId) -> Optional[Passport]:
         pass
\ No newline at end of file
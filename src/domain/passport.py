@@ -10,4 +10,5 @@ class Passport:
     passport_series: str
     passport_number: str 
     receipt_date: date
-    user_id: UserId
\ No newline at end of file
+    user_id: UserId
+    version: int | None = None
\ No newline at end of file
@@ -15,4 +15,24 @@ class User:
     last_name: str
     patronymic: str | None
     phone_number: str
-    passports: list[Passport] | None = None
\ No newline at end of file
+    passports: list[Passport] | None = None
+    # Row version, changes with every write to the user or one of its passports
+    version: int | None = None
+
+# Scalar fields of a user a read can be limited to; id and version always come along
+USER_FIELDS = ("first_name", "last_name", "patronymic", "phone_number")
+
+@dataclass(frozen=True)
+class UserProjection:
+    """
+    The parts of users a read needs: which scalar fields, and whether the passports
+    come along. Reads may return more than asked for; fields left out are None.
+    """
+    fields: tuple[str, ...] = USER_FIELDS
+    passports: bool = True
+
+    def with_fields(self, *fields: str) -> "UserProjection":
+        return UserProjection(tuple(field for field in USER_FIELDS if field in self.fields or field in fields), self.passports)
+
+# The whole aggregate, as UsersOut has it
+FULL_USER = UserProjection()
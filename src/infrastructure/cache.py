@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from src.core.config import configs
+
+# Returned by LRUCache.get when the key is absent or expired
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with a per-entry time to live.
+    Keeps hit/miss/eviction counters for monitoring.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Process-wide cache shared by the cached repositories, None when disabled for this environment
+repository_cache = (
+    LRUCache(configs.cache.max_size, configs.cache.ttl_seconds)
+    if configs.cache.is_enabled(configs.env)
+    else None
+)
+
+
+# Cache keys. Secondary keys (phone, passport numbers) map to an id, the
+# aggregate itself is only stored once under its primary key
+def user_key(user_id) -> tuple:
+    return ("user", str(user_id))
+
+def user_phone_key(phone_number: str) -> tuple:
+    return ("user_phone", phone_number)
+
+def passport_key(passport_id) -> tuple:
+    return ("passport", str(passport_id))
+
+def passport_series_number_key(series: str, number: str) -> tuple:
+    return ("passport_series_number", series, number)
+
+def passport_number_key(number: str) -> tuple:
+    return ("passport_number", number)
@@ -1,22 +1,148 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import Pool, QueuePool
+from time import perf_counter
 from src.core.config import configs
+from src.core.metrics import db_pool_checkouts, db_statement_duration, db_statements, registry
+from src.infrastructure.query_budget import install_query_budget_hooks
+from src.infrastructure.slow_query import SlowQueryRecorder
+from src.schemas.db_config import PerformanceConfig
+
+
+def apply_pragmas(engine: Engine, performance: PerformanceConfig) -> None:
+    """
+    Apply the SQLite performance PRAGMAs to every new connection of the engine.
+    """
+    pragmas = performance.pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[:1]
+    return keyword[0].upper() if keyword else "UNKNOWN"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Record statement counts and durations and pool checkouts of the engine
+    in the application metrics, labelled with `name`.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        labels = (name, _operation(statement))
+        db_statements.inc(labels)
+        db_statement_duration.observe(labels, perf_counter() - context._metrics_started)
+
+    @event.listens_for(engine, "checkout")
+    def record_checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checkouts.inc((name,))
+
+    if isinstance(engine.pool, QueuePool):
+        _instrumented_pools[name] = engine.pool
+
+
+# Pools reported by the db_pool_connections gauge
+_instrumented_pools: dict[str, Pool] = {}
+
+
+def _pool_stats() -> dict[tuple[str, str], int]:
+    stats = {}
+    for name, pool in _instrumented_pools.items():
+        stats[(name, "size")] = pool.size()
+        stats[(name, "checked_out")] = pool.checkedout()
+        stats[(name, "idle")] = pool.checkedin()
+        # QueuePool counts overflow from -pool_size
+        stats[(name, "overflow")] = max(pool.overflow(), 0)
+    return stats
+
+
+registry.gauge("db_pool_connections", "Pool connections by engine and state", ("engine", "state"), _pool_stats)
+
+
+def _pool_options(performance: PerformanceConfig) -> dict:
+    return {
+        "pool_size": performance.pool_size,
+        "max_overflow": performance.max_overflow,
+        "pool_recycle": performance.pool_recycle,
+    }
+
+
+def create_sqlite_engine(url: str, performance: PerformanceConfig) -> Engine:
+    # SQLAlchemy defaults to NullPool for SQLite files, pool connections explicitly
+    # so the per-connection PRAGMAs and page cache survive between requests
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        **_pool_options(performance),
+    )
+    apply_pragmas(engine, performance)
+    return engine
+
+
+def create_async_sqlite_engine(url: str, performance: PerformanceConfig):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, **_pool_options(performance))
+    apply_pragmas(async_engine.sync_engine, performance)
+    return async_engine
+
+
+# statement counting for @query_budget, registered once for all engines
+install_query_budget_hooks()
 
 # creating an engine for work with SQLAlchemy 
 DATABASE_URL = f"sqlite:///{configs.database.path}"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{configs.database.path}"
+engine = create_sqlite_engine(DATABASE_URL, configs.database.performance)
+instrument_engine(engine, "sync")
+
+# Slow statements of both engines, served by GET /admin/slow-queries; None when disabled
+slow_query_log = SlowQueryRecorder.from_config(configs.database.slow_query)
+if slow_query_log is not None:
+    slow_query_log.install(engine)
 
 # creating a configured "Session" class
 SessionLocal = sessionmaker(autoflush=True, bind=engine)
 
+# async engine is only created when selected, so aiosqlite stays optional for the sync stack
+if configs.database.mode == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async_engine = create_async_sqlite_engine(ASYNC_DATABASE_URL, configs.database.performance)
+    instrument_engine(async_engine.sync_engine, "async")
+    if slow_query_log is not None:
+        slow_query_log.install(async_engine.sync_engine)
+    AsyncSessionLocal = sessionmaker(autoflush=True, bind=async_engine, class_=AsyncSession)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
 # Base class for db models
 Base = declarative_base()
 
-# Dependency to get DB session
-def get_db():
+# Dependency to get DB session: AsyncSession in async mode, Session otherwise
+async def get_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,4 @@
+from src.infrastructure.migrations.runner import Migration, current_version, migrate, pending_migrations
+from src.infrastructure.migrations.versions import MIGRATIONS
+
+__all__ = ["MIGRATIONS", "Migration", "current_version", "migrate", "pending_migrations"]
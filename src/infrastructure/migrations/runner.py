@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Sequence
+
+from sqlalchemy.engine import Connection, Engine
+
+from src.core.logger import get_logger
+
+logger = get_logger()
+
+VERSION_TABLE = "schema_version"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def sql(*statements: str) -> Callable[[Connection], None]:
+    """
+    Build a migration step that executes the given SQL statements in order.
+    """
+    def upgrade(connection: Connection) -> None:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+    return upgrade
+
+
+def _ensure_version_table(engine: Engine) -> None:
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at VARCHAR NOT NULL)"
+        )
+
+
+def current_version(engine: Engine) -> int:
+    """
+    Return the version of the latest applied migration, 0 for an unmigrated database.
+    """
+    _ensure_version_table(engine)
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"SELECT COALESCE(MAX(version), 0) FROM {VERSION_TABLE}").scalar()
+
+
+def pending_migrations(engine: Engine, migrations: Sequence[Migration]) -> list[Migration]:
+    version = current_version(engine)
+    return [migration for migration in sorted(migrations, key=lambda m: m.version) if migration.version > version]
+
+
+def _apply(engine: Engine, migration: Migration) -> None:
+    with engine.begin() as connection:
+        # pysqlite does not open a transaction before DDL on its own, so start it explicitly:
+        # the schema change and its version row are committed or rolled back together.
+        # IMMEDIATE takes the write lock up front; in WAL mode readers keep reading meanwhile
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        migration.upgrade(connection)
+        connection.exec_driver_sql(
+            f"INSERT INTO {VERSION_TABLE} (version, name, applied_at) VALUES (?, ?, ?)",
+            (migration.version, migration.name, datetime.now(timezone.utc).isoformat()),
+        )
+
+
+def migrate(engine: Engine, migrations: Sequence[Migration], target: int | None = None) -> list[Migration]:
+    """
+    Apply pending forward migrations up to `target` (latest by default),
+    each in its own transaction. Returns the applied migrations.
+    """
+    applied = []
+    for migration in pending_migrations(engine, migrations):
+        if target is not None and migration.version > target:
+            break
+
+        logger.info("[migrate] DB: applying migration %04d_%s", migration.version, migration.name)
+        try:
+            _apply(engine, migration)
+        except Exception as e:
+            logger.error("[migrate] DB: migration %04d_%s failed: %s", migration.version, migration.name, e)
+            raise
+        applied.append(migration)
+
+    if applied:
+        # refresh planner statistics for the new indexes
+        with engine.begin() as connection:
+            connection.exec_driver_sql("PRAGMA optimize")
+    return applied
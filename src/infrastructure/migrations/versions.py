@@ -0,0 +1,260 @@
+from uuid import UUID
+
+from sqlalchemy.engine import Connection
+
+from src.infrastructure.migrations.runner import Migration, sql
+from src.utils.validators import canonical_phone_number
+
+
+def _uuid_bytes(value: str | bytes | None) -> bytes | None:
+    if value is None or isinstance(value, bytes):
+        return value
+    return UUID(value).bytes
+
+
+def _binary_uuid_keys(connection: Connection) -> None:
+    # SQLite can't change a column type in place: rebuild both tables with BLOB keys,
+    # converting in a single INSERT ... SELECT per table through a Python SQL function
+    connection.connection.create_function("uuid_bytes", 1, _uuid_bytes, deterministic=True)
+    sql(
+        """
+        CREATE TABLE users_new (
+            id BLOB NOT NULL,
+            first_name VARCHAR,
+            last_name VARCHAR,
+            patronymic VARCHAR,
+            phone_number VARCHAR,
+            PRIMARY KEY (id)
+        )
+        """,
+        """
+        INSERT INTO users_new (id, first_name, last_name, patronymic, phone_number)
+        SELECT uuid_bytes(id), first_name, last_name, patronymic, phone_number FROM users
+        """,
+        """
+        CREATE TABLE passport_new (
+            id BLOB NOT NULL,
+            birth_date DATE,
+            passport_number VARCHAR(6) NOT NULL,
+            passport_series VARCHAR(4) NOT NULL,
+            receipt_date DATE,
+            user_id BLOB NOT NULL,
+            PRIMARY KEY (id),
+            FOREIGN KEY(user_id) REFERENCES users (id)
+        )
+        """,
+        """
+        INSERT INTO passport_new (id, birth_date, passport_number, passport_series, receipt_date, user_id)
+        SELECT uuid_bytes(id), birth_date, passport_number, passport_series, receipt_date, uuid_bytes(user_id) FROM passport
+        """,
+        "DROP TABLE passport",
+        "DROP TABLE users",
+        "ALTER TABLE users_new RENAME TO users",
+        "ALTER TABLE passport_new RENAME TO passport",
+        "CREATE INDEX ix_users_first_name ON users (first_name)",
+        "CREATE INDEX ix_users_last_name ON users (last_name)",
+        "CREATE INDEX ix_users_patronymic ON users (patronymic)",
+        "CREATE UNIQUE INDEX uq_users_phone_number ON users (phone_number)",
+        "CREATE UNIQUE INDEX uq_users_full_name ON users (last_name, first_name, patronymic)",
+        "CREATE INDEX ix_users_last_first_id ON users (last_name, first_name, id)",
+        "CREATE UNIQUE INDEX uq_passport_number ON passport (passport_number)",
+        "CREATE UNIQUE INDEX uq_passport_series_number ON passport (passport_series, passport_number)",
+        "CREATE INDEX ix_passport_user_id ON passport (user_id)",
+    )(connection)
+
+
+def _reversed_phone_number(value: str | None) -> str | None:
+    digits = canonical_phone_number(value)
+    return digits[::-1] if digits is not None else None
+
+
+def _phone_digits_columns(connection: Connection) -> None:
+    # Backfilled with the same function the application writes them with, see models/users.py
+    connection.connection.create_function("canonical_phone", 1, canonical_phone_number, deterministic=True)
+    connection.connection.create_function("reversed_phone", 1, _reversed_phone_number, deterministic=True)
+    sql(
+        "ALTER TABLE users ADD COLUMN phone_digits VARCHAR",
+        "ALTER TABLE users ADD COLUMN phone_digits_reversed VARCHAR",
+        "UPDATE users SET phone_digits = canonical_phone(phone_number), phone_digits_reversed = reversed_phone(phone_number)",
+    )(connection)
+
+
+def _reject_duplicates(connection: Connection, duplicates_sql: str, message: str) -> None:
+    # A unique index over existing duplicates fails with a bare IntegrityError: name the rows instead.
+    # `duplicates_sql` selects one description per group of conflicting rows
+    duplicates = connection.exec_driver_sql(f"{duplicates_sql} LIMIT 10").fetchall()
+    if duplicates:
+        listed = "; ".join(description for description, in duplicates)
+        raise ValueError(f"{message}, resolve them first: {listed}")
+
+
+# Full name of a users row as DuplicateError reports it
+_FULL_NAME_SQL = "last_name || ' ' || first_name || coalesce(' ' || patronymic, '')"
+
+
+def _unique_full_names(connection: Connection) -> None:
+    # Rows with a NULL name column never collide in this index
+    _reject_duplicates(
+        connection,
+        f"SELECT {_FULL_NAME_SQL} FROM users "
+        "WHERE last_name IS NOT NULL AND first_name IS NOT NULL AND patronymic IS NOT NULL "
+        "GROUP BY last_name, first_name, patronymic HAVING count(*) > 1",
+        "Users share a full name",
+    )
+    sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_users_full_name ON users (last_name, first_name, patronymic)",
+    )(connection)
+
+
+def _unique_phone_digits(connection: Connection) -> None:
+    # Numbers stored in different formats collide only now
+    _reject_duplicates(
+        connection,
+        "SELECT group_concat(phone_number, ', ') FROM users "
+        "WHERE phone_digits IS NOT NULL GROUP BY phone_digits HAVING count(*) > 1",
+        "Users share a phone number in different formats",
+    )
+    sql(
+        "CREATE UNIQUE INDEX uq_users_phone_digits ON users (phone_digits)",
+        "DROP INDEX IF EXISTS uq_users_phone_number",
+    )(connection)
+
+
+def _unique_full_names_without_patronymic(connection: Connection) -> None:
+    # Names without a patronymic collide only now
+    _reject_duplicates(
+        connection,
+        f"SELECT {_FULL_NAME_SQL} FROM users WHERE last_name IS NOT NULL AND first_name IS NOT NULL "
+        "GROUP BY last_name, first_name, coalesce(patronymic, '') HAVING count(*) > 1",
+        "Users share a full name",
+    )
+    sql(
+        "DROP INDEX IF EXISTS uq_users_full_name",
+        "CREATE UNIQUE INDEX uq_users_full_name ON users (last_name, first_name, coalesce(patronymic, ''))",
+    )(connection)
+
+
+# Forward-only schema history. Never edit an applied migration, append a new one instead.
+# Index builds get a migration each, so every build holds the write lock for one index only
+MIGRATIONS = [
+    # Schema that create_all produced before migrations existed; a no-op on those databases
+    Migration(1, "baseline", sql(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id VARCHAR NOT NULL,
+            first_name VARCHAR,
+            last_name VARCHAR,
+            patronymic VARCHAR,
+            phone_number VARCHAR,
+            PRIMARY KEY (id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_users_first_name ON users (first_name)",
+        "CREATE INDEX IF NOT EXISTS ix_users_last_name ON users (last_name)",
+        "CREATE INDEX IF NOT EXISTS ix_users_patronymic ON users (patronymic)",
+        "CREATE INDEX IF NOT EXISTS ix_users_phone_number ON users (phone_number)",
+        """
+        CREATE TABLE IF NOT EXISTS passport (
+            id VARCHAR NOT NULL,
+            birth_date DATE,
+            passport_number VARCHAR(6) NOT NULL,
+            passport_series VARCHAR(4) NOT NULL,
+            receipt_date DATE,
+            user_id VARCHAR NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (passport_number),
+            FOREIGN KEY(user_id) REFERENCES users (id)
+        )
+        """,
+    )),
+    # Duplicate detection, see repository/integrity.py. The unique index replaces the plain phone index
+    Migration(2, "users_unique_phone_number", sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_users_phone_number ON users (phone_number)",
+        "DROP INDEX IF EXISTS ix_users_phone_number",
+    )),
+    # Same index as always: only the duplicate check ahead of it was added
+    Migration(3, "users_unique_full_name", _unique_full_names),
+    Migration(4, "passport_unique_number", sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_passport_number ON passport (passport_number)",
+    )),
+    Migration(5, "passport_unique_series_number", sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_passport_series_number ON passport (passport_series, passport_number)",
+    )),
+    # Sort key of the keyset-paginated listing
+    Migration(6, "users_last_first_id_index", sql(
+        "CREATE INDEX IF NOT EXISTS ix_users_last_first_id ON users (last_name, first_name, id)",
+    )),
+    # Foreign key lookups of UserModel.passports
+    Migration(7, "passport_user_id_index", sql(
+        "CREATE INDEX IF NOT EXISTS ix_passport_user_id ON passport (user_id)",
+    )),
+    # 16-byte BLOB keys instead of 36-char strings, see models/types.py
+    Migration(8, "binary_uuid_keys", _binary_uuid_keys),
+    # FTS5 index of the names behind GET /users/search, kept in step by triggers
+    Migration(9, "users_name_search", sql(
+        """
+        CREATE VIRTUAL TABLE users_fts USING fts5(
+            first_name, last_name, patronymic,
+            content='users', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER users_fts_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts (rowid, first_name, last_name, patronymic)
+            VALUES (new.rowid, new.first_name, new.last_name, new.patronymic);
+        END
+        """,
+        """
+        CREATE TRIGGER users_fts_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, first_name, last_name, patronymic)
+            VALUES ('delete', old.rowid, old.first_name, old.last_name, old.patronymic);
+        END
+        """,
+        """
+        CREATE TRIGGER users_fts_update AFTER UPDATE OF first_name, last_name, patronymic ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, first_name, last_name, patronymic)
+            VALUES ('delete', old.rowid, old.first_name, old.last_name, old.patronymic);
+            INSERT INTO users_fts (rowid, first_name, last_name, patronymic)
+            VALUES (new.rowid, new.first_name, new.last_name, new.patronymic);
+        END
+        """,
+        "INSERT INTO users_fts (users_fts, rank) VALUES ('rank', 'bm25(1.0, 2.0, 0.5)')",
+        "INSERT INTO users_fts (users_fts) VALUES ('rebuild')",
+    )),
+    # Canonical digits of phone_number: "+7-900-..." and "8900..." are one number
+    Migration(10, "users_phone_digits", _phone_digits_columns),
+    # Duplicate detection on the canonical digits replaces the raw phone_number index
+    Migration(11, "users_unique_phone_digits", _unique_phone_digits),
+    # Suffix search: the last digits of a number are a prefix of the reversed digits
+    Migration(12, "users_phone_digits_reversed_index", sql(
+        "CREATE INDEX IF NOT EXISTS ix_users_phone_digits_reversed ON users (phone_digits_reversed)",
+    )),
+    # Row versions behind the ETags and If-Match; existing rows start at version 1
+    Migration(13, "row_versions", sql(
+        "ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+        "ALTER TABLE passport ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+    )),
+    # Passport writes bump the owner's version and user deletes take the passports along
+    # in the database, so each update and delete is one statement
+    Migration(14, "passport_write_triggers", sql(
+        """
+        CREATE TRIGGER IF NOT EXISTS passport_update_touch_user AFTER UPDATE ON passport
+        WHEN new.version <> old.version BEGIN
+            UPDATE users SET version = version + 1 WHERE id IN (old.user_id, new.user_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS passport_delete_touch_user AFTER DELETE ON passport BEGIN
+            UPDATE users SET version = version + 1 WHERE id = old.user_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS users_delete_passports AFTER DELETE ON users BEGIN
+            DELETE FROM passport WHERE user_id = old.id;
+        END
+        """,
+    )),
+    # A missing patronymic counts as an empty one: NULLs never collide in a unique index
+    Migration(15, "users_unique_full_name_null_patronymic", _unique_full_names_without_patronymic),
+]
@@ -1,18 +1,58 @@
-from sqlalchemy import  Column, String, Date, ForeignKey
+from sqlalchemy import  Column, DDL, String, Date, ForeignKey, Index, Integer, event
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
 from src.infrastructure.database import Base
+from src.infrastructure.models.types import UUIDType
 
 class PassportModel(Base):
     __tablename__ = "passport"
+    __table_args__ = (
+        # Duplicate detection relies on these, see repository/integrity.py
+        Index("uq_passport_number", "passport_number", unique=True),
+        Index("uq_passport_series_number", "passport_series", "passport_number", unique=True),
+        # Foreign key lookups of UserModel.passports
+        Index("ix_passport_user_id", "user_id"),
+    )
 
-    # Generated ID as a string to store UUID
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    # Generated UUID, stored as 16 bytes
+    id = Column(UUIDType, primary_key=True, default=uuid4)
     birth_date = Column(Date)
-    passport_number = Column(String(6), nullable=False, unique=True)
+    passport_number = Column(String(6), nullable=False)
     passport_series = Column(String(4), nullable=False)
     receipt_date = Column(Date)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUIDType, ForeignKey("users.id"), nullable=False)
+    # Row version behind the ETags, see UserModel.version. A passport update or delete
+    # also bumps the owner's version, through the triggers below
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
-    user = relationship("UserModel", back_populates="passports")
\ No newline at end of file
+    user = relationship("UserModel", back_populates="passports")
+
+    __mapper_args__ = {"version_id_col": version}
+
+# Kept in the database so every passport update and delete stays a single statement
+# (see migration 14); created here as well for create_all databases (the tests).
+# Inserts bump the owner in PassportRepository.create_passport instead: bulk loads write
+# users together with their passports at version 1.
+_PASSPORT_TRIGGER_DDL = [
+    # The user's version covers its passports, which GET /users/id/{id} returns
+    """
+    CREATE TRIGGER IF NOT EXISTS passport_update_touch_user AFTER UPDATE ON passport
+    WHEN new.version <> old.version BEGIN
+        UPDATE users SET version = version + 1 WHERE id IN (old.user_id, new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS passport_delete_touch_user AFTER DELETE ON passport BEGIN
+        UPDATE users SET version = version + 1 WHERE id = old.user_id;
+    END
+    """,
+    # Deleting a user takes its passports along. AFTER, so the touch above finds no user row left
+    """
+    CREATE TRIGGER IF NOT EXISTS users_delete_passports AFTER DELETE ON users BEGIN
+        DELETE FROM passport WHERE user_id = old.id;
+    END
+    """,
+]
+for _statement in _PASSPORT_TRIGGER_DDL:
+    event.listen(PassportModel.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,24 @@
+from uuid import UUID
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+class UUIDType(TypeDecorator):
+    """
+    UUID stored as a 16-byte BLOB and returned as uuid.UUID.
+    Accepts UUID instances or their string form as bind values.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, UUID):
+            value = UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return UUID(bytes=value)
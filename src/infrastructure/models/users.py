@@ -1,17 +1,94 @@
-from sqlalchemy import  Column, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import  Column, DDL, Index, Integer, String, event, func
+from sqlalchemy.orm import relationship, validates
 from uuid import uuid4
 
 from src.infrastructure.database import Base
+from src.infrastructure.models.types import UUIDType
+from src.utils.validators import canonical_phone_number
+
+
+def phone_columns(phone_number: str | None) -> dict[str, str | None]:
+    """
+    Values of the derived phone columns for a stored phone number: the canonical
+    digits, and the same digits reversed for suffix lookups.
+    """
+    digits = canonical_phone_number(phone_number)
+    return {"phone_digits": digits, "phone_digits_reversed": digits[::-1] if digits is not None else None}
+
 
 class UserModel(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Sort key of the keyset-paginated listing
+        Index("ix_users_last_first_id", "last_name", "first_name", "id"),
+        # Duplicate detection relies on these and uq_users_full_name below, see repository/integrity.py
+        Index("uq_users_phone_digits", "phone_digits", unique=True),
+        # "Last N digits" lookups become a prefix range scan
+        Index("ix_users_phone_digits_reversed", "phone_digits_reversed"),
+    )
 
-    # Generated ID as a string to store UUID
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    # Generated UUID, stored as 16 bytes
+    id = Column(UUIDType, primary_key=True, default=uuid4)
     first_name = Column(String, index=True)
     last_name = Column(String, index=True)
     patronymic = Column(String, index=True)
-    phone_number = Column(String, index=True)
+    phone_number = Column(String)
+    # Derived from phone_number, see phone_columns; lookups and duplicate checks use these
+    phone_digits = Column(String)
+    phone_digits_reversed = Column(String)
+    # Row version behind the ETags: bumped by the repositories' UPDATE statements (and by
+    # SQLAlchemy on ORM updates), and whenever a passport of the user changes
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    passports = relationship("PassportModel", back_populates="user", cascade="all, delete-orphan")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @validates("phone_number")
+    def _sync_phone_columns(self, key, phone_number):
+        for column, value in phone_columns(phone_number).items():
+            setattr(self, column, value)
+        return phone_number
+
+# NULLs are distinct in a unique index: without coalesce two "Ivanov Ivan" with no patronymic would both insert
+Index("uq_users_full_name", UserModel.last_name, UserModel.first_name, func.coalesce(UserModel.patronymic, ""), unique=True)
 
-    passports = relationship("PassportModel", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+# Full-text index of the names for /users/search, see migration 9. External content:
+# the index keeps no copy of the names and is addressed by the rowid of users.
+# Created here as well so create_all databases (the tests) can search too.
+USER_SEARCH_TABLE = "users_fts"
+_USER_SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {USER_SEARCH_TABLE} USING fts5(
+        first_name, last_name, patronymic,
+        content='users', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO {USER_SEARCH_TABLE} (rowid, first_name, last_name, patronymic)
+        VALUES (new.rowid, new.first_name, new.last_name, new.patronymic);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO {USER_SEARCH_TABLE} ({USER_SEARCH_TABLE}, rowid, first_name, last_name, patronymic)
+        VALUES ('delete', old.rowid, old.first_name, old.last_name, old.patronymic);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF first_name, last_name, patronymic ON users BEGIN
+        INSERT INTO {USER_SEARCH_TABLE} ({USER_SEARCH_TABLE}, rowid, first_name, last_name, patronymic)
+        VALUES ('delete', old.rowid, old.first_name, old.last_name, old.patronymic);
+        INSERT INTO {USER_SEARCH_TABLE} (rowid, first_name, last_name, patronymic)
+        VALUES (new.rowid, new.first_name, new.last_name, new.patronymic);
+    END
+    """,
+    # matches in last_name rank first, then first_name, then patronymic
+    f"INSERT INTO {USER_SEARCH_TABLE} ({USER_SEARCH_TABLE}, rank) VALUES ('rank', 'bm25(1.0, 2.0, 0.5)')",
+]
+for _statement in _USER_SEARCH_DDL:
+    event.listen(UserModel.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+# the index would otherwise outlive the table and point at rowids of the next one
+event.listen(UserModel.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {USER_SEARCH_TABLE}").execute_if(dialect="sqlite"))
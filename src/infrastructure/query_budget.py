@@ -0,0 +1,139 @@
+import functools
+import inspect
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Callable, Literal
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.config import configs
+from src.core.logger import get_logger
+
+logger = get_logger()
+
+BudgetMode = Literal["off", "warn", "raise"]
+
+# Budgets active in the current request or task, innermost last. A tuple, so that
+# entering a budget never mutates the value seen by other tasks
+_active_budgets: ContextVar[tuple["QueryBudget", ...]] = ContextVar("active_query_budgets", default=())
+
+
+class QueryBudgetExceededError(AssertionError):
+    """Raised when a block issues more statements than its budget or an N+1 pattern."""
+    pass
+
+
+class QueryBudget:
+    """
+    Count the SQL statements issued while the budget is active.
+
+    Works as a context manager and as a decorator of sync and async functions.
+    On exit it reports (log in "warn" mode, QueryBudgetExceededError in "raise" mode):
+    - more than `max_queries` statements;
+    - the same statement run `n_plus_one_threshold` times or more with different
+      parameters, the signature of a lazy load per row (N+1).
+
+    `max_queries` may be a callable receiving the decorated function's arguments,
+    for endpoints whose statement count grows with the payload.
+    """
+
+    def __init__(self, max_queries: int | Callable[..., int], name: str | None = None,
+        mode: BudgetMode | None = None, n_plus_one_threshold: int | None = None):
+        self.max_queries = max_queries
+        self.name = name
+        self.mode = mode or configs.query_budget.mode
+        self.n_plus_one_threshold = n_plus_one_threshold or configs.query_budget.n_plus_one_threshold
+        self.statements: list[tuple[str, Any]] = []
+        self._limit = max_queries if isinstance(max_queries, int) else None
+        self._token = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated_statements(self) -> dict[str, int]:
+        """
+        Statements executed at least `n_plus_one_threshold` times with different parameters.
+        """
+        parameters = defaultdict(set)
+        for statement, params in self.statements:
+            parameters[statement].add(repr(params))
+        return {
+            statement: len(values) for statement, values in parameters.items()
+            if len(values) >= self.n_plus_one_threshold
+        }
+
+    def __enter__(self) -> "QueryBudget":
+        self.statements = []
+        if self.mode != "off":
+            self._token = _active_budgets.set(_active_budgets.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is None:
+            return
+        _active_budgets.reset(self._token)
+        self._token = None
+        # Don't mask the error of the block itself
+        if exc_type is None:
+            self.check()
+
+    def check(self) -> None:
+        problems = []
+        if self._limit is not None and self.count > self._limit:
+            problems.append(f"{self.count} statements, budget is {self._limit}")
+        for statement, times in self.repeated_statements().items():
+            problems.append(f"N+1: {times} executions of {' '.join(statement.split())}")
+        if not problems:
+            return
+
+        message = f"Query budget of {self.name or 'block'} exceeded: " + "; ".join(problems)
+        if self.mode == "raise":
+            raise QueryBudgetExceededError(message)
+        logger.warning("[QueryBudget] %s", message)
+
+    def _for_call(self, func: Callable, args: tuple, kwargs: dict) -> "QueryBudget":
+        # A fresh instance per call: concurrent requests must not share the statement list
+        max_queries = self.max_queries
+        if callable(max_queries):
+            bound = inspect.signature(func).bind(*args, **kwargs)
+            max_queries = max_queries(**bound.arguments)
+        return QueryBudget(max_queries, self.name or func.__qualname__, self.mode, self.n_plus_one_threshold)
+
+    def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self._for_call(func, args, kwargs):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self._for_call(func, args, kwargs):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def query_budget(max_queries: int | Callable[..., int], name: str | None = None,
+    mode: BudgetMode | None = None, n_plus_one_threshold: int | None = None) -> QueryBudget:
+    """
+    Declare a statement budget for a block or a function, see QueryBudget.
+    """
+    return QueryBudget(max_queries, name, mode, n_plus_one_threshold)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    budgets = _active_budgets.get()
+    for budget in budgets:
+        budget.statements.append((statement, parameters))
+
+
+def install_query_budget_hooks() -> None:
+    """
+    Count statements of every engine (the application's and the tests') for the active budgets.
+    Without an active budget a statement costs one context variable lookup.
+    """
+    if not event.contains(Engine, "after_cursor_execute", _record_statement):
+        event.listen(Engine, "after_cursor_execute", _record_statement)
@@ -0,0 +1,33 @@
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+
+class AsyncRepository:
+    """
+    Base class for async repositories that reuse the query code of a sync repository.
+
+    With an AsyncSession the sync repository runs through AsyncSession.run_sync,
+    so statements are awaited on the aiosqlite driver and never block the event loop.
+    With a plain Session (sync stack) each call is moved to the threadpool instead.
+    """
+
+    def __init__(self, db: AsyncSession | Session, repo_factory: Callable[[Session], Any]):
+        self.db = db
+        self.repo_factory = repo_factory
+
+    async def _run(self, method: str, *args, **kwargs):
+        def call(session: Session):
+            return getattr(self.repo_factory(session), method)(*args, **kwargs)
+
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(call)
+        return await run_in_threadpool(call, self.db)
+
+    async def _close(self) -> None:
+        if isinstance(self.db, AsyncSession):
+            await self.db.close()
+        else:
+            await run_in_threadpool(self.db.close)
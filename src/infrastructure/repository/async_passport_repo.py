@@ -0,0 +1,42 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Callable, Iterable
+
+from src.domain.passport import Passport
+from src.domain.identifiers  import PassportId
+from src.domain.interfaces.iasync_passport_repo import IAsyncPassportRepository
+from src.domain.interfaces.ipassport_repo import IPassportRepository
+from src.infrastructure.repository.async_base import AsyncRepository
+from src.infrastructure.repository.passport_repo import PassportRepository
+
+class AsyncPassportRepository(AsyncRepository, IAsyncPassportRepository):
+    def __init__(self, db: AsyncSession | Session,
+                 repo_factory: Callable[[Session], IPassportRepository] = PassportRepository):
+        super().__init__(db, repo_factory)
+
+    async def create_passport(self, passport: Passport) -> Passport:
+        return await self._run("create_passport", passport)
+
+    async def get_passport(self, passport_id: PassportId) -> Passport | None:
+        return await self._run("get_passport", passport_id)
+
+    async def get_passport_version(self, passport_id: PassportId) -> int | None:
+        return await self._run("get_passport_version", passport_id)
+
+    async def get_passport_by_series_and_number(self, series: str, number: str) -> Passport | None:
+        return await self._run("get_passport_by_series_and_number", series, number)
+
+    async def get_passport_by_number(self, number: str) -> Passport | None:
+        return await self._run("get_passport_by_number", number)
+
+    async def get_passport_by_series(self, series: str) -> Passport | None:
+        return await self._run("get_passport_by_series", series)
+
+    async def get_existing_passport_numbers(self, numbers: Iterable[str]) -> set[str]:
+        return await self._run("get_existing_passport_numbers", list(numbers))
+
+    async def update_passport(self, passport: Passport, expected_version: int | None = None) -> Passport | None:
+        return await self._run("update_passport", passport, expected_version)
+
+    async def delete_passport(self, passport_id: PassportId) -> Passport | None:
+        return await self._run("delete_passport", passport_id)
@@ -0,0 +1,80 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import AsyncIterator, Callable, Iterable
+
+from src.domain.users import FULL_USER, User, UserProjection
+from src.domain.identifiers  import UserId
+from src.domain.interfaces.iasync_user_repo import IAsyncUserRepository
+from src.domain.interfaces.iuser_repo import IUserRepository
+from src.infrastructure.repository.async_base import AsyncRepository
+from src.infrastructure.repository.user_repo import UserRepository
+
+class AsyncUserRepository(AsyncRepository, IAsyncUserRepository):
+    def __init__(self, db: AsyncSession | Session,
+                 repo_factory: Callable[[Session], IUserRepository] = UserRepository):
+        super().__init__(db, repo_factory)
+
+    async def create_user(self, user: User) -> User:
+        return await self._run("create_user", user)
+
+    async def create_users(self, users: list[User]) -> list[User]:
+        return await self._run("create_users", users)
+
+    async def get_users(self, user_ids: Iterable[UserId], projection: UserProjection = FULL_USER) -> list[User]:
+        return await self._run("get_users", list(user_ids), projection)
+
+    async def get_user_version(self, user_id: UserId) -> int | None:
+        return await self._run("get_user_version", user_id)
+
+    async def get_user(self, user_id: UserId, projection: UserProjection = FULL_USER) -> User | None:
+        return await self._run("get_user", user_id, projection)
+
+    async def get_user_by_full_name(self, first_name: str | None = None,
+        last_name: str | None = None,
+        patronymic: str | None = None,
+        limit: int | None = None,
+        projection: UserProjection = FULL_USER) -> list[User]:
+        return await self._run("get_user_by_full_name", first_name, last_name, patronymic, limit, projection)
+
+    async def list_users(self, limit: int, after: tuple[str, str, UserId] | None = None,
+                         projection: UserProjection = FULL_USER) -> list[User]:
+        return await self._run("list_users", limit, after, projection)
+
+    async def search_users(self, terms: list[str], limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        return await self._run("search_users", terms, limit, projection)
+
+    async def get_user_by_phone(self, phone_number: str) -> User | None:
+        return await self._run("get_user_by_phone", phone_number)
+
+    async def search_users_by_phone_suffix(self, digits: str, limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        return await self._run("search_users_by_phone_suffix", digits, limit, projection)
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        # A server-side cursor can't be held across awaits of run_sync, so the
+        # table is walked in keyset-paginated batches: each batch is one bounded query
+        after = None
+        try:
+            while True:
+                users = await self.list_users(batch_size, after)
+                for user in users:
+                    yield user
+                if len(users) < batch_size:
+                    return
+                last = users[-1]
+                after = (last.last_name, last.first_name, last.id)
+        finally:
+            # Streaming responses outlive the request-scoped session (FastAPI exits
+            # get_db before the body is sent), so release the connection here
+            await self._close()
+
+    async def get_existing_phone_numbers(self, phone_numbers: Iterable[str]) -> set[str]:
+        return await self._run("get_existing_phone_numbers", list(phone_numbers))
+
+    async def get_existing_full_names(self, full_names: Iterable[tuple[str, str, str | None]]) -> set[tuple[str, str, str | None]]:
+        return await self._run("get_existing_full_names", list(full_names))
+
+    async def update_user(self, user: User, expected_version: int | None = None) -> User:
+        return await self._run("update_user", user, expected_version)
+
+    async def delete_user(self, user_id: UserId) -> bool:
+        return await self._run("delete_user", user_id)
@@ -0,0 +1,109 @@
+from typing import Iterable
+
+from src.domain.passport import Passport
+from src.domain.identifiers  import PassportId
+from src.domain.interfaces.ipassport_repo import IPassportRepository
+from src.infrastructure.cache import LRUCache, MISSING, passport_key, passport_number_key, \
+    passport_series_number_key, user_key
+
+class CachedPassportRepository(IPassportRepository):
+    """
+    Read-through cache in front of another IPassportRepository.
+    Every passport write also invalidates the cached aggregate of its owning user.
+    """
+
+    def __init__(self, repo: IPassportRepository, cache: LRUCache):
+        self.repo = repo
+        self.cache = cache
+
+    def _store(self, passport: Passport) -> None:
+        self.cache.set(passport_key(passport.id), passport)
+        self.cache.set(passport_number_key(passport.passport_number), passport.id)
+        self.cache.set(passport_series_number_key(passport.passport_series, passport.passport_number), passport.id)
+
+    def _invalidate(self, passport: Passport) -> None:
+        self.cache.delete(
+            passport_key(passport.id),
+            passport_number_key(passport.passport_number),
+            passport_series_number_key(passport.passport_series, passport.passport_number),
+            user_key(passport.user_id),
+        )
+
+    def _lookup(self, key: tuple, series: str | None, number: str) -> Passport | None:
+        passport_id = self.cache.get(key)
+        if passport_id is MISSING:
+            return None
+
+        passport = self.cache.get(passport_key(passport_id))
+        # The secondary key may be stale if the passport was renumbered
+        if passport is MISSING or passport.passport_number != number:
+            return None
+        if series is not None and passport.passport_series != series:
+            return None
+        return passport
+
+    def create_passport(self, passport: Passport) -> Passport:
+        created = self.repo.create_passport(passport)
+        self.cache.delete(user_key(created.user_id))
+        return created
+
+    def get_passport(self, passport_id: PassportId) -> Passport | None:
+        passport = self.cache.get(passport_key(passport_id))
+        if passport is not MISSING:
+            return passport
+
+        passport = self.repo.get_passport(passport_id)
+        if passport:
+            self._store(passport)
+        return passport
+
+    def get_passport_version(self, passport_id: PassportId) -> int | None:
+        # Always from the database, as for users
+        return self.repo.get_passport_version(passport_id)
+
+    def get_passport_by_series_and_number(self, series: str, number: str) -> Passport | None:
+        passport = self._lookup(passport_series_number_key(series, number), series, number)
+        if passport:
+            return passport
+
+        passport = self.repo.get_passport_by_series_and_number(series, number)
+        if passport:
+            self._store(passport)
+        return passport
+
+    def get_passport_by_number(self, number: str) -> Passport | None:
+        passport = self._lookup(passport_number_key(number), None, number)
+        if passport:
+            return passport
+
+        passport = self.repo.get_passport_by_number(number)
+        if passport:
+            self._store(passport)
+        return passport
+
+    def get_passport_by_series(self, series: str) -> Passport | None:
+        return self.repo.get_passport_by_series(series)
+
+    def get_existing_passport_numbers(self, numbers: Iterable[str]) -> set[str]:
+        return self.repo.get_existing_passport_numbers(numbers)
+
+    def update_passport(self, passport: Passport, expected_version: int | None = None) -> Passport | None:
+        # Moving the passport to another user leaves the previous owner's aggregate stale too.
+        # Otherwise the updated row names everything to drop; stale number keys are verified on read
+        previous = self.get_passport(passport.id) if passport.user_id is not None else None
+        updated = None
+        try:
+            updated = self.repo.update_passport(passport, expected_version)
+        finally:
+            self.cache.delete(passport_key(passport.id))
+            for stale in (previous, updated):
+                if stale:
+                    self._invalidate(stale)
+        return updated
+
+    def delete_passport(self, passport_id: PassportId) -> Passport | None:
+        # The deleted row names the owner whose aggregate goes with it
+        deleted = self.repo.delete_passport(passport_id)
+        if deleted:
+            self._invalidate(deleted)
+        return deleted
@@ -0,0 +1,124 @@
+from typing import Iterable
+
+from src.domain.users import FULL_USER, User, UserProjection
+from src.domain.identifiers  import UserId
+from src.domain.interfaces.iuser_repo import IUserRepository
+from src.infrastructure.cache import LRUCache, MISSING, passport_key, passport_number_key, \
+    passport_series_number_key, user_key, user_phone_key
+from src.utils.validators import canonical_phone_number
+
+class CachedUserRepository(IUserRepository):
+    """
+    Read-through cache in front of another IUserRepository.
+    Single-user lookups by id and phone are cached, writes invalidate the affected entries.
+    """
+
+    def __init__(self, repo: IUserRepository, cache: LRUCache):
+        self.repo = repo
+        self.cache = cache
+
+    def _store(self, user: User) -> None:
+        self.cache.set(user_key(user.id), user)
+        self.cache.set(user_phone_key(canonical_phone_number(user.phone_number)), user.id)
+
+    def _invalidate(self, user: User) -> None:
+        self.cache.delete(user_key(user.id), user_phone_key(canonical_phone_number(user.phone_number)))
+        for passport in user.passports or []:
+            self.cache.delete(
+                passport_key(passport.id),
+                passport_number_key(passport.passport_number),
+                passport_series_number_key(passport.passport_series, passport.passport_number),
+            )
+
+    def create_user(self, user: User) -> User:
+        return self.repo.create_user(user)
+
+    def create_users(self, users: list[User]) -> list[User]:
+        return self.repo.create_users(users)
+
+    def get_user(self, user_id: UserId, projection: UserProjection = FULL_USER) -> User | None:
+        # A cached aggregate answers any projection; only whole aggregates are stored
+        user = self.cache.get(user_key(user_id))
+        if user is not MISSING:
+            return user
+
+        user = self.repo.get_user(user_id, projection)
+        if user and projection == FULL_USER:
+            self._store(user)
+        return user
+
+    def get_users(self, user_ids: Iterable[UserId], projection: UserProjection = FULL_USER) -> list[User]:
+        users, missing = [], []
+        for user_id in set(user_ids):
+            user = self.cache.get(user_key(user_id))
+            if user is MISSING:
+                missing.append(user_id)
+            else:
+                users.append(user)
+
+        # Only the ids the cache can't answer go to the database, in one batch
+        if missing:
+            for user in self.repo.get_users(missing, projection):
+                if projection == FULL_USER:
+                    self._store(user)
+                users.append(user)
+        return users
+
+    def get_user_version(self, user_id: UserId) -> int | None:
+        # Always from the database: the cache is per process and a read-through can store a stale copy
+        return self.repo.get_user_version(user_id)
+
+    def get_user_by_full_name(self, first_name: str | None = None,
+        last_name: str | None = None,
+        patronymic: str | None = None,
+        limit: int | None = None,
+        projection: UserProjection = FULL_USER) -> list[User]:
+        return self.repo.get_user_by_full_name(first_name, last_name, patronymic, limit, projection)
+
+    def list_users(self, limit: int, after: tuple[str, str, UserId] | None = None,
+                   projection: UserProjection = FULL_USER) -> list[User]:
+        return self.repo.list_users(limit, after, projection)
+
+    def search_users(self, terms: list[str], limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        return self.repo.search_users(terms, limit, projection)
+
+    def get_user_by_phone(self, phone_number: str) -> User | None:
+        # Keyed by the canonical digits, like the lookup itself: any format of a number hits
+        digits = canonical_phone_number(phone_number)
+        user_id = self.cache.get(user_phone_key(digits))
+        if user_id is not MISSING:
+            user = self.cache.get(user_key(user_id))
+            # The phone mapping may be stale if the number moved to another user
+            if user is not MISSING and canonical_phone_number(user.phone_number) == digits:
+                return user
+
+        user = self.repo.get_user_by_phone(phone_number)
+        if user:
+            self._store(user)
+        return user
+
+    def search_users_by_phone_suffix(self, digits: str, limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        return self.repo.search_users_by_phone_suffix(digits, limit, projection)
+
+    def get_existing_phone_numbers(self, phone_numbers: Iterable[str]) -> set[str]:
+        return self.repo.get_existing_phone_numbers(phone_numbers)
+
+    def get_existing_full_names(self, full_names: Iterable[tuple[str, str, str | None]]) -> set[tuple[str, str, str | None]]:
+        return self.repo.get_existing_full_names(full_names)
+
+    def update_user(self, user: User, expected_version: int | None = None) -> User:
+        try:
+            return self.repo.update_user(user, expected_version)
+        finally:
+            # Also after a version conflict, the cached copy lost to another writer.
+            # The old phone mapping is left in place, get_user_by_phone verifies it on read
+            self.cache.delete(user_key(user.id))
+
+    def delete_user(self, user_id: UserId) -> bool:
+        # The passports go with the user (a trigger), their entries have to go as well:
+        # the only reason to look the user up before the single DELETE
+        user = self.get_user(user_id)
+        deleted = self.repo.delete_user(user_id)
+        if user:
+            self._invalidate(user)
+        return deleted
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session
+
+from src.domain.interfaces.ipassport_repo import IPassportRepository
+from src.domain.interfaces.iuser_repo import IUserRepository
+from src.infrastructure.cache import repository_cache
+from src.infrastructure.repository.cached_passport_repo import CachedPassportRepository
+from src.infrastructure.repository.cached_user_repo import CachedUserRepository
+from src.infrastructure.repository.passport_repo import PassportRepository
+from src.infrastructure.repository.user_repo import UserRepository
+
+
+def user_repository_factory(db: Session) -> IUserRepository:
+    """
+    Build the user repository for a session, behind the cache when it is enabled.
+    """
+    repo = UserRepository(db)
+    if repository_cache is None:
+        return repo
+    return CachedUserRepository(repo, repository_cache)
+
+
+def passport_repository_factory(db: Session) -> IPassportRepository:
+    """
+    Build the passport repository for a session, behind the cache when it is enabled.
+    """
+    repo = PassportRepository(db)
+    if repository_cache is None:
+        return repo
+    return CachedPassportRepository(repo, repository_cache)
@@ -0,0 +1,17 @@
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# SQLite caps the number of bound parameters per statement (32766 since 3.32),
+# so set-based IN lookups are split into chunks that stay well below the limit.
+IN_CLAUSE_CHUNK_SIZE = 5000
+
+
+def chunked(items: Iterable[T], size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterator[list[T]]:
+    """
+    Split an iterable into lists of at most `size` elements.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,53 @@
+import re
+from typing import Any, Mapping
+
+from sqlalchemy import Table
+from sqlalchemy.exc import IntegrityError
+
+from src.utils.exceptions import DuplicateError
+
+# Unique constraint name -> (DuplicateError field, columns that make up the reported value)
+DUPLICATE_CONSTRAINTS = {
+    "uq_users_phone_digits": ("phone_number", ("phone_number",)),
+    "uq_users_full_name": ("full_name", ("last_name", "first_name", "patronymic")),
+    "uq_passport_number": ("passport_number", ("passport_number",)),
+    "uq_passport_series_number": ("passport", ("passport_series", "passport_number")),
+}
+
+# SQLite reports the columns of the violated index ("UNIQUE constraint failed: users.phone_number"),
+# or its name for expression indexes ("UNIQUE constraint failed: index 'uq_...'")
+_UNIQUE_COLUMNS_RE = re.compile(r"UNIQUE constraint failed: (?!index )(.+)$")
+_UNIQUE_INDEX_RE = re.compile(r"UNIQUE constraint failed: index '([^']+)'")
+
+
+def _constraint_name(error: IntegrityError, table: Table) -> str | None:
+    message = str(error.orig)
+
+    match = _UNIQUE_INDEX_RE.search(message)
+    if match:
+        return match.group(1)
+
+    match = _UNIQUE_COLUMNS_RE.search(message)
+    if not match:
+        return None
+
+    columns = tuple(part.strip().split(".")[-1] for part in match.group(1).split(","))
+    for index in table.indexes:
+        if index.unique and tuple(column.name for column in index.columns) == columns:
+            return index.name
+    return None
+
+
+def to_duplicate_error(error: IntegrityError, table: Table, values: Mapping[str, Any]) -> DuplicateError | None:
+    """
+    Translate a unique constraint violation on `table` into a DuplicateError,
+    using `values` (the row being written) for the reported value.
+    Returns None if the error is not a known unique violation.
+    """
+    constraint = DUPLICATE_CONSTRAINTS.get(_constraint_name(error, table))
+    if constraint is None:
+        return None
+
+    field, columns = constraint
+    value = " ".join(str(values[column]) for column in columns if values.get(column))
+    return DuplicateError(field, value)
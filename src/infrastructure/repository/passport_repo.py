@@ -1,12 +1,22 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
-from uuid import UUID
+from sqlalchemy import and_, bindparam, select, text, update
+from sqlalchemy.exc import IntegrityError
+from typing import Iterable
 
 from src.domain.passport import Passport
-from src.domain.identifiers  import PassportId
+from src.domain.identifiers  import PassportId, UserId
 from src.infrastructure.models.passport import PassportModel
+from src.infrastructure.models.users import UserModel
 from src.domain.interfaces.ipassport_repo import IPassportRepository
+from src.infrastructure.repository.helpers import chunked
+from src.infrastructure.repository.integrity import to_duplicate_error
 from src.core.logger import get_logger
+from src.utils.exceptions import VersionConflictError
+
+# Fields update_passport writes when given, and the columns its RETURNING clause lists in
+# table order (textual statements are matched to their result columns by position)
+_UPDATABLE_FIELDS = ("birth_date", "passport_number", "passport_series", "receipt_date", "user_id")
+_PASSPORT_COLUMNS = ", ".join(column.name for column in PassportModel.__table__.columns)
 
 class PassportRepository(IPassportRepository):
     def __init__(self, db: Session):
@@ -14,49 +24,65 @@ class PassportRepository(IPassportRepository):
 
     def _to_domain(self, obj: PassportModel) -> Passport:
         return Passport(
-            id=UUID(obj.id),
-            user_id=UUID(obj.user_id),
+            id=obj.id,
+            user_id=obj.user_id,
             birth_date=obj.birth_date,
             passport_number=obj.passport_number,
             passport_series=obj.passport_series,
             receipt_date=obj.receipt_date,
+            version=obj.version,
         )
+
+    def _touch_user(self, user_id: UserId) -> None:
+        # The user's version (and ETag) covers its passports, which GET /users/id/{id} returns.
+        # Updates and deletes leave this to the triggers of models/passport.py
+        users = UserModel.__table__
+        self.db.execute(update(users).where(users.c.id == user_id).values(version=users.c.version + 1))
     
     def create_passport(self, passport: Passport) -> Passport:
         logger = get_logger()
         log_message = str(passport.passport_series) + ", " + str(passport.passport_number)
-        logger.debug(f"[PassportRepository.create_passport] DB: inserting passport {log_message}")
+        logger.debug("[PassportRepository.create_passport] DB: inserting passport %s", log_message)
 
         try:
-            db_obj = {
-                key: str(value) if key in ('id', 'user_id') and isinstance(value, UUID) else value
-                for key, value in passport.__dict__.items()
-                if value is not None
-            }
+            db_obj = {key: value for key, value in passport.__dict__.items() if value is not None and key != "version"}
             db_passport = PassportModel(**db_obj)
             self.db.add(db_passport)
+            self._touch_user(passport.user_id)
             self.db.commit()
             self.db.refresh(db_passport)
             return self._to_domain(db_passport)
+        except IntegrityError as e:
+            self.db.rollback()
+            duplicate = to_duplicate_error(e, PassportModel.__table__, db_obj)
+            if duplicate is None:
+                logger.error("[PassportRepository.create_passport] DB integrity error while creating passport %s: %s", log_message.strip(), e)
+                raise
+            logger.warning("[PassportRepository.create_passport] DB: %s", duplicate)
+            raise duplicate from e
         except Exception as e:
-            logger.error(f"[PassportRepository.create_passport] DB error while creating passport {log_message.strip()}: {e}")
+            logger.error("[PassportRepository.create_passport] DB error while creating passport %s: %s", log_message.strip(), e)
             self.db.rollback()
             raise
     
     def get_passport(self, passport_id: PassportId) -> Passport | None:
-        str_id = str(passport_id)
-
         logger = get_logger()
-        logger.debug(f"[PassportRepository.get_passport] DB: fetching passport with id={str_id}")
+        logger.debug("[PassportRepository.get_passport] DB: fetching passport with id=%s", passport_id)
 
-        db_passport = self.db.query(PassportModel).options(joinedload(PassportModel.user)).filter(PassportModel.id == str(str_id)).first()
+        db_passport = self.db.query(PassportModel).options(joinedload(PassportModel.user)).filter(PassportModel.id == passport_id).first()
         if db_passport:
             return self._to_domain(db_passport)
         return None
     
+    def get_passport_version(self, passport_id: PassportId) -> int | None:
+        logger = get_logger()
+        logger.debug("[PassportRepository.get_passport_version] DB: fetching version of passport id=%s", passport_id)
+
+        return self.db.execute(select(PassportModel.version).where(PassportModel.id == passport_id)).scalar()
+
     def get_passport_by_series_and_number(self, series: str, number: str) -> Passport | None:
         logger = get_logger()
-        logger.debug(f"[PassportRepository.get_passport_by_series_and_number] DB: fetching passport with series={series} and number={number}")
+        logger.debug("[PassportRepository.get_passport_by_series_and_number] DB: fetching passport with series=%s and number=%s", series, number)
 
         db_passport = self.db.query(PassportModel).options(joinedload(PassportModel.user)).filter(
         and_(
@@ -71,7 +97,7 @@ class PassportRepository(IPassportRepository):
     
     def get_passport_by_number(self, number: str) -> Passport | None:
         logger = get_logger()
-        logger.debug(f"[PassportRepository.get_passport_by_number] DB: fetching user with passport={number}")
+        logger.debug("[PassportRepository.get_passport_by_number] DB: fetching user with passport=%s", number)
 
         obj = self.db.query(PassportModel).filter(PassportModel.passport_number == number).first()
         if obj:
@@ -80,48 +106,88 @@ class PassportRepository(IPassportRepository):
     
     def get_passport_by_series(self, series: str) -> Passport | None:
         logger = get_logger()
-        logger.debug(f"[PassportRepository.get_passport_by_series] DB: fetching user with passport={series}")
+        logger.debug("[PassportRepository.get_passport_by_series] DB: fetching user with passport=%s", series)
 
         obj = self.db.query(PassportModel).filter(PassportModel.passport_series == series).first()
         if obj:
             return self._to_domain(obj)
         return None
     
-    def update_passport(self, passport: Passport) -> Passport:
-        str_id = str(passport.id)
+    def get_existing_passport_numbers(self, numbers: Iterable[str]) -> set[str]:
         logger = get_logger()
-        logger.debug(f"[PassportRepository.update_passport] DB: updating passport with id={str_id}")
+        logger.debug("[PassportRepository.get_existing_passport_numbers] DB: set-based passport number lookup")
 
-        db_passport = self.db.query(PassportModel).filter(PassportModel.id == str_id).first()
-        if not db_passport:
-            logger.warning(f"[PassportRepository.update_passport] DB: passport with id={str_id} not found")
-            return None
-        
-        for field in ["birth_date", "passport_number", "passport_series", "receipt_date", "user_id"]:
-            value = getattr(passport, field, None)
-            if value is not None:
-                if field in ("user_id", "id") and isinstance(value, UUID):
-                    value = str(value)
-                setattr(db_passport, field, value)
+        existing = set()
+        for chunk in chunked(set(numbers)):
+            rows = self.db.execute(
+                select(PassportModel.passport_number).where(PassportModel.passport_number.in_(chunk))
+            )
+            existing.update(row.passport_number for row in rows)
+        return existing
+
+    def update_passport(self, passport: Passport, expected_version: int | None = None) -> Passport | None:
+        logger = get_logger()
+        logger.debug("[PassportRepository.update_passport] DB: updating passport with id=%s", passport.id)
 
+        # Same single UPDATE ... RETURNING as UserRepository.update_user. When the version moves,
+        # the passport_update_touch_user trigger bumps the owners (previous and new) as well
+        table = PassportModel.__table__
+        values = {field: getattr(passport, field) for field in _UPDATABLE_FIELDS if getattr(passport, field, None) is not None}
+        changed = " OR ".join(f"{field} IS NOT :{field}" for field in values) or "0"
+        assignments = "".join(f"{field} = :{field}, " for field in values)
+        condition = " AND version = :expected_version" if expected_version is not None else ""
+        statement = text(
+            f"UPDATE passport SET {assignments}version = version + ({changed}) "
+            f"WHERE id = :id{condition} RETURNING {_PASSPORT_COLUMNS}"
+        ).bindparams(
+            bindparam("id", passport.id, type_=table.c.id.type),
+            *(bindparam(field, value, type_=table.c[field].type) for field, value in values.items()),
+        )
+        if expected_version is not None:
+            statement = statement.bindparams(expected_version=expected_version)
 
-        self.db.commit()
-        self.db.refresh(db_passport)
+        try:
+            db_passport = self.db.query(PassportModel).from_statement(statement.columns(*table.columns))\
+                                .populate_existing().first()
+            updated = self._to_domain(db_passport) if db_passport else None
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            # Only the fields given were written; the stored ones complete the reported value
+            current = self.get_passport(passport.id)
+            row = {**(current.__dict__ if current else {}), **values}
+            duplicate = to_duplicate_error(e, table, row)
+            if duplicate is None:
+                raise
+            logger.warning("[PassportRepository.update_passport] DB: %s", duplicate)
+            raise duplicate from e
+
+        if updated is None:
+            version = self.get_passport_version(passport.id) if expected_version is not None else None
+            if version is None:
+                logger.warning("[PassportRepository.update_passport] DB: passport with id=%s not found", passport.id)
+                return None
+            logger.warning("[PassportRepository.update_passport] DB: passport id=%s is at version %s, not %s",
+                           passport.id, version, expected_version)
+            raise VersionConflictError("Passport", passport.id, expected_version)
 
-        logger.info(f"[PassportRepository.update_passport] DB: passport with id={str_id} updated successfully")
-        return self._to_domain(db_passport)
+        logger.info("[PassportRepository.update_passport] DB: passport with id=%s updated successfully", passport.id)
+        return updated
     
-    def delete_passport(self, passport_id: PassportId) -> bool:
-        str_id = str(passport_id)
+    def delete_passport(self, passport_id: PassportId) -> Passport | None:
         logger = get_logger()
-        logger.debug(f"[PassportRepository.delete_passport] DB: deleting passport with id={str_id}")
-
-        db_passport = self.db.query(PassportModel).filter(PassportModel.id == str(passport_id)).first()
-        if not db_passport:
-            logger.warning(f"[PassportRepository.delete_passport] DB: passport with id={str_id} not found for deletion")
-            return False
-        
-        self.db.delete(db_passport)
+        logger.debug("[PassportRepository.delete_passport] DB: deleting passport with id=%s", passport_id)
+
+        # One DELETE ... RETURNING: the deleted row tells callers (the cache) whose passport it was.
+        # The passport_delete_touch_user trigger bumps the owner's version
+        table = PassportModel.__table__
+        statement = text(f"DELETE FROM passport WHERE id = :id RETURNING {_PASSPORT_COLUMNS}")\
+                        .bindparams(bindparam("id", passport_id, type_=table.c.id.type)).columns(*table.columns)
+        row = self.db.execute(statement).first()
         self.db.commit()
-        logger.info(f"[PassportRepository.delete_passport] DB: passport with id={str_id} deleted successfully")
-        return True
+        if row is None:
+            logger.warning("[PassportRepository.delete_passport] DB: passport with id=%s not found for deletion", passport_id)
+            return None
+
+        logger.info("[PassportRepository.delete_passport] DB: passport with id=%s deleted successfully", passport_id)
+        return self._to_domain(row)
@@ -1,131 +1,363 @@
-from sqlalchemy.orm import Session, joinedload
-from uuid import UUID
+from sqlalchemy import bindparam, func, literal, select, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from typing import Iterable
+from uuid import uuid4
 
-from src.domain.users import User
+from src.domain.users import FULL_USER, USER_FIELDS, User, UserProjection
 from src.domain.identifiers  import UserId
-from src.infrastructure.models.users import UserModel
+from src.infrastructure.models.users import USER_SEARCH_TABLE, UserModel, phone_columns
+from src.infrastructure.models.passport import PassportModel
+from src.infrastructure.repository.helpers import chunked
+from src.infrastructure.repository.integrity import to_duplicate_error
 from src.domain.interfaces.iuser_repo import IUserRepository
 from src.domain.passport import Passport
 from src.core.logger import get_logger
+from src.utils.exceptions import VersionConflictError
+from src.utils.validators import canonical_phone_number
+
+# Columns the RETURNING clause of update_user lists, in table order
+# (textual statements are matched to their result columns by position)
+_USER_COLUMNS = ", ".join(column.name for column in UserModel.__table__.columns)
 
 class UserRepository(IUserRepository):
     def __init__(self, db: Session):
         self.db = db
 
-    def _to_domain(self, obj: UserModel) -> User:
+    def _to_domain(self, obj: UserModel, projection: UserProjection = FULL_USER) -> User:
+        # Attributes outside the projection were not loaded: reading them would query once per user
+        fields = {field: getattr(obj, field) if field in projection.fields else None for field in USER_FIELDS}
         return User(
-            id=UUID(obj.id),
-            first_name=obj.first_name,
-            last_name=obj.last_name,
-            patronymic=obj.patronymic,
-            phone_number=obj.phone_number,
+            id=obj.id,
+            **fields,
+            version=obj.version,
             passports=[Passport(
-                id=UUID(p.id),
+                id=p.id,
                 birth_date=p.birth_date,
                 passport_number=p.passport_number,
                 passport_series=p.passport_series,
                 receipt_date=p.receipt_date,
-                user_id=UUID(p.user_id)
-            ) for p in obj.passports]
+                user_id=p.user_id,
+                version=p.version,
+            ) for p in obj.passports] if projection.passports else None
         )
 
+    def _query(self, projection: UserProjection, passport_loader=selectinload):
+        # Only the projected columns (and the version, for the ETags) are selected, and the
+        # passports only when asked for: by selectinload for multi-row reads, so rows aren't
+        # multiplied by a join, and by the given loader (joinedload) for single-row ones
+        query = self.db.query(UserModel)
+        if projection.fields != USER_FIELDS:
+            columns = [getattr(UserModel, field) for field in projection.fields]
+            query = query.options(load_only(*columns, UserModel.version))
+        if projection.passports:
+            query = query.options(passport_loader(UserModel.passports))
+        return query
 
     def create_user(self, user: User) -> User:
         logger = get_logger()
         log_message = str(user.first_name) + ", " + str(user.last_name) + ", " + str(user.patronymic)
-        logger.debug(f"[UserRepository.create_user] DB: inserting user {log_message}")
+        logger.debug("[UserRepository.create_user] DB: inserting user %s", log_message)
 
         try:
             # Convert User domain model to UserModel ORM instance
-            user_dict = {key: value for key, value in user.__dict__.items() if key != 'id' or value is not None}
+            # Passports are created through PassportRepository, not through the user row
+            user_dict = {
+                key: value for key, value in user.__dict__.items()
+                if key not in ('passports', 'version') and (key != 'id' or value is not None)
+            }
             obj = UserModel(**user_dict)
 
             self.db.add(obj)
             self.db.commit()
             self.db.refresh(obj)
-            logger.info(f"[UserRepository.create_user] DB: user created with id={obj.id}")
+            logger.info("[UserRepository.create_user] DB: user created with id=%s", obj.id)
             return self._to_domain(obj)
+        except IntegrityError as e:
+            self.db.rollback()
+            duplicate = to_duplicate_error(e, UserModel.__table__, user_dict)
+            if duplicate is None:
+                logger.error("[UserRepository.create_user] DB integrity error while creating user %s: %s", log_message.strip(), e)
+                raise
+            logger.warning("[UserRepository.create_user] DB: %s", duplicate)
+            raise duplicate from e
         except Exception as e:
-            logger.error(f"[UserRepository.create_user] DB error while creating user {log_message.strip()}: {e}")
+            logger.error("[UserRepository.create_user] DB error while creating user %s: %s", log_message.strip(), e)
             self.db.rollback()
             raise
 
-    def get_user(self, user_id: UserId) -> User | None:
-        str_id = str(user_id)
+    def create_users(self, users: list[User]) -> list[User]:
+        logger = get_logger()
+        logger.debug("[UserRepository.create_users] DB: inserting %s users", len(users))
+
+        user_rows = []
+        passport_rows = []
+        created = []
+        for user in users:
+            user_id = user.id or uuid4()
+            user_rows.append({
+                "id": user_id,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "patronymic": user.patronymic,
+                "phone_number": user.phone_number,
+                **phone_columns(user.phone_number),
+            })
+
+            passports = []
+            for passport in user.passports or []:
+                passport_id = passport.id or uuid4()
+                passport_rows.append({
+                    "id": passport_id,
+                    "birth_date": passport.birth_date,
+                    "passport_series": passport.passport_series,
+                    "passport_number": passport.passport_number,
+                    "receipt_date": passport.receipt_date,
+                    "user_id": user_id,
+                })
+                passports.append(Passport(
+                    id=passport_id,
+                    birth_date=passport.birth_date,
+                    passport_series=passport.passport_series,
+                    passport_number=passport.passport_number,
+                    receipt_date=passport.receipt_date,
+                    user_id=user_id,
+                    version=1,
+                ))
+
+            created.append(User(
+                id=user_id,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                patronymic=user.patronymic,
+                phone_number=user.phone_number,
+                passports=passports,
+                version=1,
+            ))
 
+        try:
+            # executemany inside a single transaction: one fsync for the whole batch
+            if user_rows:
+                self.db.execute(UserModel.__table__.insert(), user_rows)
+            if passport_rows:
+                self.db.execute(PassportModel.__table__.insert(), passport_rows)
+            self.db.commit()
+        except IntegrityError as e:
+            # Only reachable if a concurrent writer inserted one of the rows after the
+            # service's duplicate checks; the statement doesn't tell which row collided
+            self.db.rollback()
+            table = PassportModel.__table__ if "passport." in str(e.orig) else UserModel.__table__
+            duplicate = to_duplicate_error(e, table, {})
+            logger.error("[UserRepository.create_users] DB integrity error while inserting %s users: %s", len(users), e)
+            if duplicate is None:
+                raise
+            raise duplicate from e
+        except Exception as e:
+            logger.error("[UserRepository.create_users] DB error while inserting %s users: %s", len(users), e)
+            self.db.rollback()
+            raise
+
+        logger.info("[UserRepository.create_users] DB: %s users and %s passports created", len(user_rows), len(passport_rows))
+        return created
+
+    def get_user(self, user_id: UserId, projection: UserProjection = FULL_USER) -> User | None:
         logger = get_logger()
-        logger.debug(f"[UserRepository.get_user] DB: fetching user with id={str_id}")
+        logger.debug("[UserRepository.get_user] DB: fetching user with id=%s", user_id)
 
-        obj = self.db.query(UserModel).options(joinedload(UserModel.passports)).filter(UserModel.id == str_id).first()
+        obj = self._query(projection, joinedload).filter(UserModel.id == user_id).first()
 
         if obj:
-            return self._to_domain(obj)
+            return self._to_domain(obj, projection)
         return None
 
+    def get_users(self, user_ids: Iterable[UserId], projection: UserProjection = FULL_USER) -> list[User]:
+        logger = get_logger()
+        logger.debug("[UserRepository.get_users] DB: fetching users by ids")
+
+        # One IN query per chunk of ids, plus one IN query for the passports of each chunk.
+        # Ids that match no user are left out, the order is not the one of user_ids
+        users = []
+        for chunk in chunked(set(user_ids)):
+            objs = self._query(projection).filter(UserModel.id.in_(chunk)).all()
+            users.extend(self._to_domain(obj, projection) for obj in objs)
+        return users
+
+    def get_user_version(self, user_id: UserId) -> int | None:
+        logger = get_logger()
+        logger.debug("[UserRepository.get_user_version] DB: fetching version of user id=%s", user_id)
+
+        # Primary key lookup of one column: conditional GETs skip loading the aggregate
+        return self.db.execute(select(UserModel.version).where(UserModel.id == user_id)).scalar()
+
     def get_user_by_full_name(self, first_name: str | None = None,
         last_name: str | None = None,
-        patronymic: str | None = None)  -> list[User]:
+        patronymic: str | None = None,
+        limit: int | None = None,
+        projection: UserProjection = FULL_USER)  -> list[User]:
 
         logger = get_logger()
         log_message = str(first_name) + ", " + str(last_name) + ", " + str(patronymic)
-        logger.debug(f"[UserRepository.get_user_by_name] DB: fetching user with name={log_message.strip()}")
+        logger.debug("[UserRepository.get_user_by_name] DB: fetching user with name=%s", log_message.strip())
 
-        query = self.db.query(UserModel)
+        # Eager-load passports (when projected) whatever the filters, _to_domain would lazy-load them per user otherwise
+        query = self._query(projection)
 
         if first_name:
-            query = query.options(joinedload(UserModel.passports)).filter(UserModel.first_name == first_name)
+            query = query.filter(UserModel.first_name == first_name)
         if last_name:
-            query = query.options(joinedload(UserModel.passports)).filter(UserModel.last_name == last_name)
+            query = query.filter(UserModel.last_name == last_name)
         if patronymic:
-            query = query.options(joinedload(UserModel.passports)).filter(UserModel.patronymic == patronymic)
+            query = query.filter(UserModel.patronymic == patronymic)
+        if limit is not None:
+            query = query.limit(limit)
 
         objs = query.all()
-        return [self._to_domain(obj) for obj in objs]
+        return [self._to_domain(obj, projection) for obj in objs]
+
+    def list_users(self, limit: int, after: tuple[str, str, UserId] | None = None,
+                   projection: UserProjection = FULL_USER) -> list[User]:
+        logger = get_logger()
+        logger.debug("[UserRepository.list_users] DB: fetching %s users after=%s", limit, after)
+
+        sort_key = (UserModel.last_name, UserModel.first_name, UserModel.id)
+        query = self._query(projection)
+
+        # Keyset (seek) pagination: continue right after the last row of the previous
+        # page using the (last_name, first_name, id) index, so deep pages cost the same as the first one
+        if after is not None:
+            # tuple_ doesn't carry the column types over to plain values, bind them explicitly
+            bound = (literal(value, column.type) for column, value in zip(sort_key, after))
+            query = query.filter(tuple_(*sort_key) > tuple_(*bound))
+
+        objs = query.order_by(*sort_key).limit(limit).all()
+        return [self._to_domain(obj, projection) for obj in objs]
     
+    def search_users(self, terms: list[str], limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        logger = get_logger()
+        logger.debug("[UserRepository.search_users] DB: full-text search terms=%s, limit=%s", terms, limit)
+
+        # Every term is a quoted prefix query and all of them must match: "iv pet" finds Ivan Petrov
+        match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        # load_only doesn't apply to a textual statement: it selects the projected columns itself
+        columns = ", ".join(f"users.{column}" for column in ("id", "version", *projection.fields))
+        statement = text(
+            f"SELECT {columns} FROM {USER_SEARCH_TABLE} JOIN users ON users.rowid = {USER_SEARCH_TABLE}.rowid "
+            f"WHERE {USER_SEARCH_TABLE} MATCH :match ORDER BY {USER_SEARCH_TABLE}.rank LIMIT :limit"
+        ).bindparams(match=match, limit=limit)
+
+        query = self.db.query(UserModel).from_statement(statement)
+        if projection.passports:
+            query = query.options(selectinload(UserModel.passports))
+        return [self._to_domain(obj, projection) for obj in query.all()]
+
     def get_user_by_phone(self, phone_number: str) -> User | None:
         logger = get_logger()
-        logger.debug(f"[UserRepository.get_user_by_phone] DB: fetching user with phone_number={phone_number}")
+        logger.debug("[UserRepository.get_user_by_phone] DB: fetching user with phone_number=%s", phone_number)
 
-        obj = self.db.query(UserModel).options(joinedload(UserModel.passports)).filter(UserModel.phone_number == phone_number).first()
+        # Any format of the number finds it: the lookup goes through the canonical digits
+        digits = canonical_phone_number(phone_number)
+        obj = self.db.query(UserModel).options(joinedload(UserModel.passports)).filter(UserModel.phone_digits == digits).first()
         if obj:
             return self._to_domain(obj)
         return None
 
-    def update_user(self, user: User) -> User:
-        str_id = str(user.id)
+    def search_users_by_phone_suffix(self, digits: str, limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        logger = get_logger()
+        logger.debug("[UserRepository.search_users_by_phone_suffix] DB: fetching users with phone suffix=%s, limit=%s", digits, limit)
+
+        # The suffix is a prefix of the reversed digits: a range scan of ix_users_phone_digits_reversed.
+        # ":" sorts right after "9", so the range ends after the last reversed number starting with the prefix
+        prefix = digits[::-1]
+        objs = self._query(projection)\
+                    .filter(UserModel.phone_digits_reversed >= prefix, UserModel.phone_digits_reversed < prefix + ":")\
+                    .order_by(UserModel.phone_digits_reversed).limit(limit).all()
+        return [self._to_domain(obj, projection) for obj in objs]
 
+    def get_existing_phone_numbers(self, phone_numbers: Iterable[str]) -> set[str]:
         logger = get_logger()
-        logger.debug(f"[UserRepository.update] DB: updating user id={str_id}")
-        
-        obj = self.db.query(UserModel).options(joinedload(UserModel.passports))\
-                    .filter(UserModel.id == str_id).first()
-        if not obj:
-            logger.warning(f"[UserRepository.update] DB: user with id={str_id} not found for update")
-            return None
+        logger.debug("[UserRepository.get_existing_phone_numbers] DB: set-based phone lookup")
 
-        # Update user fields if provided
-        for field in ["first_name", "last_name", "patronymic", "phone_number"]:
-            # From domain model, only update if value is not None
-            value = getattr(user, field, None)
-            if value is not None:
-                setattr(obj, field, value)
+        # Compared as canonical digits, which is also what is returned
+        existing = set()
+        for chunk in chunked({canonical_phone_number(phone_number) for phone_number in phone_numbers}):
+            rows = self.db.execute(
+                select(UserModel.phone_digits).where(UserModel.phone_digits.in_(chunk))
+            )
+            existing.update(row.phone_digits for row in rows)
+        return existing
 
-        self.db.commit()
-        self.db.refresh(obj)
-        logger.info(f"[UserRepository.update] DB: user id={str(obj.id)}, updated")
-        return self._to_domain(obj)
+    def get_existing_full_names(self, full_names: Iterable[tuple[str, str, str | None]]) -> set[tuple[str, str, str | None]]:
+        logger = get_logger()
+        logger.debug("[UserRepository.get_existing_full_names] DB: set-based full name lookup")
+
+        # Compared as uq_users_full_name does, a missing patronymic as an empty one: NULL = NULL is not true
+        patronymic = func.coalesce(UserModel.patronymic, "")
+        columns = (UserModel.first_name, UserModel.last_name, patronymic)
+        existing = set()
+        for chunk in chunked({(first_name, last_name, patronymic or "") for first_name, last_name, patronymic in full_names}):
+            rows = self.db.execute(select(*columns).where(tuple_(*columns).in_(chunk)))
+            existing.update((first_name, last_name, patronymic or None) for first_name, last_name, patronymic in rows)
+        return existing
+
+    def update_user(self, user: User, expected_version: int | None = None) -> User | None:
+        logger = get_logger()
+        logger.debug("[UserRepository.update] DB: updating user id=%s", user.id)
+
+        # Only the fields given are written, in one UPDATE ... RETURNING: no row back means
+        # the user is gone, or (with expected_version) it is at another version
+        values = {field: getattr(user, field) for field in USER_FIELDS if getattr(user, field, None) is not None}
+        # The version only moves when a value actually changes (SET expressions see the old row)
+        changed = " OR ".join(f"{field} IS NOT :{field}" for field in values) or "0"
+        if "phone_number" in values:
+            values.update(phone_columns(values["phone_number"]))
+        assignments = "".join(f"{field} = :{field}, " for field in values)
+        condition = " AND version = :expected_version" if expected_version is not None else ""
+        statement = text(
+            f"UPDATE users SET {assignments}version = version + ({changed}) "
+            f"WHERE id = :id{condition} RETURNING {_USER_COLUMNS}"
+        ).bindparams(bindparam("id", user.id, type_=UserModel.id.type), **values)
+        if expected_version is not None:
+            statement = statement.bindparams(expected_version=expected_version)
+
+        try:
+            obj = self.db.query(UserModel).from_statement(statement.columns(*UserModel.__table__.columns))\
+                        .options(selectinload(UserModel.passports)).populate_existing().first()
+            updated = self._to_domain(obj) if obj else None
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            # Only the fields given were written; the stored ones complete the reported value
+            current = self.get_user(user.id)
+            row = {**(current.__dict__ if current else {}), **values}
+            duplicate = to_duplicate_error(e, UserModel.__table__, row)
+            if duplicate is None:
+                raise
+            logger.warning("[UserRepository.update] DB: %s", duplicate)
+            raise duplicate from e
+
+        if updated is None:
+            version = self.get_user_version(user.id) if expected_version is not None else None
+            if version is None:
+                logger.warning("[UserRepository.update] DB: user with id=%s not found for update", user.id)
+                return None
+            logger.warning("[UserRepository.update] DB: user id=%s is at version %s, not %s", user.id, version, expected_version)
+            raise VersionConflictError("User", user.id, expected_version)
+
+        logger.info("[UserRepository.update] DB: user id=%s, updated", updated.id)
+        return updated
 
     def delete_user(self, user_id: UserId) -> bool | None:
-        str_id = str(user_id)
         logger = get_logger()
-        logger.debug(f"[UserRepository.delete_user] DB: deleting user id={str_id}")
+        logger.debug("[UserRepository.delete_user] DB: deleting user id=%s", user_id)
 
-        obj = self.db.query(UserModel).filter(UserModel.id == str_id).first()
-        if not obj:
-            logger.warning(f"[UserRepository.delete_user] DB: user with id={str_id} not found for delete")
-            return None
-        
-        self.db.delete(obj)
+        # One DELETE ... RETURNING; the users_delete_passports trigger removes the passports
+        statement = text("DELETE FROM users WHERE id = :id RETURNING id")\
+                        .bindparams(bindparam("id", user_id, type_=UserModel.id.type))
+        deleted = self.db.execute(statement).first()
         self.db.commit()
-        logger.info(f"[UserRepository.delete_user] DB: user with id={str_id} deleted")
-        return True
\ No newline at end of file
+        if deleted is None:
+            logger.warning("[UserRepository.delete_user] DB: user with id=%s not found for delete", user_id)
+            return None
+
+        logger.info("[UserRepository.delete_user] DB: user with id=%s deleted", user_id)
+        return True
@@ -0,0 +1,245 @@
+"""
+Synthetic users and passports generated column-wise with NumPy and written
+with bulk inserts, for production-sized local databases.
+
+Unique columns (full name, phone number, passport number) are derived from
+the row position through fixed permutations, so seeding again into the same
+database continues after the existing rows instead of colliding with them.
+"""
+import itertools
+from dataclasses import dataclass
+from datetime import date
+from time import perf_counter, time
+
+import numpy as np
+from sqlalchemy.engine import Connection, Engine
+
+from src.core.logger import get_logger
+from src.infrastructure.models.passport import PassportModel
+from src.infrastructure.models.users import USER_SEARCH_TABLE, UserModel, phone_columns
+
+logger = get_logger()
+
+# Only letters of validate_first_name's alphabet: [a-zA-Zа-яА-Я], without ё
+_LATIN_SYLLABLES = ["ka", "le", "mi", "no", "ru", "sa", "ti", "va", "zo", "be",
+                    "da", "go", "ly", "pe", "xo", "an", "el", "ir", "os", "um"]
+_CYRILLIC_SYLLABLES = ["ка", "ле", "ми", "но", "ру", "са", "ти", "ва", "зо", "бе",
+                       "да", "го", "лы", "пе", "хо", "ан", "ел", "ир", "ос", "ум"]
+
+
+def _vocabulary(syllables: list[str], length: int, suffix: str = "") -> np.ndarray:
+    return np.array(["".join(parts).title() + suffix for parts in itertools.product(syllables, repeat=length)],
+                    dtype=object)
+
+
+# One vocabulary per script, so a full name never mixes alphabets
+_FIRST_NAMES = (_vocabulary(_LATIN_SYLLABLES, 2), _vocabulary(_CYRILLIC_SYLLABLES, 2))  # 400 each
+_LAST_NAMES = (_vocabulary(_LATIN_SYLLABLES[:12], 3, "ov"), _vocabulary(_CYRILLIC_SYLLABLES[:12], 3, "ов"))  # 1728
+_PATRONYMICS = (_vocabulary(_LATIN_SYLLABLES, 2, "ovich"), _vocabulary(_CYRILLIC_SYLLABLES, 2, "ович"))
+
+_NAME_SPACE = 2 * len(_FIRST_NAMES[0]) * len(_LAST_NAMES[0]) * len(_PATRONYMICS[0])
+_PHONE_SPACE = 1_000_000_000  # +79XXXXXXXXX
+_PASSPORT_NUMBER_SPACE = 1_000_000  # passport_number is unique on its own
+
+# Passports are issued from the age of 14
+_ISSUE_AGE_DAYS = 14 * 365 + 4
+_MAX_AGE_DAYS = 90 * 365
+
+# Connection settings for the duration of a seed, restored afterwards
+_LOAD_PRAGMAS = {"synchronous": "OFF", "cache_size": -512 * 1024, "temp_store": "MEMORY"}
+
+
+@dataclass(frozen=True)
+class SeedResult:
+    users: int
+    passports: int
+    seconds: float
+
+
+def _permute(positions: np.ndarray, space: int, multiplier: int, offset: int) -> np.ndarray:
+    """
+    Map positions onto distinct values below `space`: an affine map with a
+    multiplier coprime to the space is a permutation of it.
+    """
+    return (positions * multiplier + offset) % space
+
+
+def _multiplier(space: int, candidate: int) -> int:
+    while np.gcd(candidate, space) != 1:
+        candidate += 1
+    return candidate
+
+
+_NAME_MULTIPLIER = _multiplier(_NAME_SPACE, 1_103_515_245 % _NAME_SPACE)
+_PHONE_MULTIPLIER = _multiplier(_PHONE_SPACE, 747_796_405)
+_PASSPORT_MULTIPLIER = _multiplier(_PASSPORT_NUMBER_SPACE, 7919)
+
+
+def _uuid7_bytes(rng: np.random.Generator, base_ms: int, sequence: np.ndarray) -> list[bytes]:
+    """
+    Time-ordered UUIDs (version 7 layout, with a 12-bit counter under the
+    millisecond): increasing ids make primary key inserts append to the B-tree
+    instead of touching random pages.
+    """
+    raw = rng.integers(0, 256, size=(len(sequence), 16), dtype=np.uint8)
+    timestamps = (base_ms + (sequence >> 12)).astype(">u8")
+    raw[:, :6] = timestamps.view(np.uint8).reshape(-1, 8)[:, 2:]
+    raw[:, 6] = 0x70 | ((sequence >> 8) & 0x0F)  # version 7 and the counter's high bits
+    raw[:, 7] = sequence & 0xFF
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    buffer = raw.tobytes()
+    return [buffer[i:i + 16] for i in range(0, len(buffer), 16)]
+
+
+def _full_names(positions: np.ndarray) -> tuple[list[str], list[str], list[str]]:
+    keys = _permute(positions, _NAME_SPACE, _NAME_MULTIPLIER, 0)
+    script, keys = keys % 2, keys // 2
+    first, keys = keys % len(_FIRST_NAMES[0]), keys // len(_FIRST_NAMES[0])
+    last, patronymic = keys % len(_LAST_NAMES[0]), keys // len(_LAST_NAMES[0])
+
+    columns = []
+    for vocabularies, indexes in ((_FIRST_NAMES, first), (_LAST_NAMES, last), (_PATRONYMICS, patronymic)):
+        column = np.where(script == 0, vocabularies[0][indexes % len(vocabularies[0])],
+                          vocabularies[1][indexes % len(vocabularies[1])])
+        columns.append(column.tolist())
+    return columns[0], columns[1], columns[2]
+
+
+def _phone_numbers(positions: np.ndarray) -> list[str]:
+    subscribers = _permute(positions, _PHONE_SPACE, _PHONE_MULTIPLIER, 0) + 9_000_000_000
+    return ["+7" + str(number) for number in subscribers.tolist()]
+
+
+def _dates(rng: np.random.Generator, count: int, today: date) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Birth dates between 14 and 90 years ago, and a receipt date between the
+    14th birthday and today.
+    """
+    today = np.datetime64(today, "D")
+    age = rng.integers(_ISSUE_AGE_DAYS, _MAX_AGE_DAYS, size=count)
+    birth = today - age
+    since_issue_age = age - _ISSUE_AGE_DAYS
+    receipt = birth + _ISSUE_AGE_DAYS + (rng.random(count) * (since_issue_age + 1)).astype(np.int64)
+    return np.datetime_as_string(birth, unit="D"), np.datetime_as_string(receipt, unit="D")
+
+
+def _insert(connection: Connection, table, columns: dict[str, list]) -> None:
+    # Compiled core INSERT run as one executemany. Values are already in their
+    # stored form (16-byte ids, ISO dates), so the per-value type processing is skipped.
+    # Columns left out with a scalar default (the row versions) are still bound by the statement.
+    compiled = table.insert().compile(dialect=connection.dialect, column_keys=list(columns))
+    defaults = {column.key: column.default.arg for column in table.columns
+                if column.default is not None and column.default.is_scalar}
+    values = (columns[key] if key in columns else itertools.repeat(defaults[key]) for key in compiled.positiontup)
+    connection.exec_driver_sql(str(compiled), list(zip(*values)))
+
+
+def _schema_objects(connection: Connection, kind: str, tables: tuple[str, ...]) -> list[tuple[str, str]]:
+    # Implicit indexes of PRIMARY KEY constraints have no SQL and cannot be dropped
+    placeholders = ", ".join("?" for _ in tables)
+    return connection.exec_driver_sql(
+        f"SELECT name, sql FROM sqlite_master WHERE type = ? AND sql IS NOT NULL AND tbl_name IN ({placeholders})",
+        (kind, *tables),
+    ).fetchall()
+
+
+def _has_table(connection: Connection, name: str) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).first() is not None
+
+
+def seed_database(engine: Engine, users: int, passport_ratio: float = 0.9, batch_size: int = 200_000,
+                  drop_indexes: bool = False, seed: int | None = None, today: date | None = None) -> SeedResult:
+    """
+    Insert `users` generated users, `passport_ratio` of them with a passport.
+    Each batch is one transaction; with `drop_indexes` the secondary indexes and
+    the triggers keeping the name search index current are dropped for the load,
+    and everything is rebuilt at the end.
+    """
+    if not 0 <= passport_ratio <= 1:
+        raise ValueError("passport_ratio must be between 0 and 1")
+    rng = np.random.default_rng(seed)
+    today = today or date.today()
+    users_table, passports_table = UserModel.__table__, PassportModel.__table__
+
+    started = perf_counter()
+    base_ms = int(time() * 1000)
+    inserted_passports = 0
+    with engine.connect() as connection:
+        existing_users = connection.exec_driver_sql(f"SELECT count(*) FROM {users_table.name}").scalar()
+        existing_passports = connection.exec_driver_sql(f"SELECT count(*) FROM {passports_table.name}").scalar()
+        if existing_users + users > min(_NAME_SPACE, _PHONE_SPACE):
+            raise ValueError("Too many users for the generated name and phone number space")
+
+        # A failed seed is rerun from scratch, so durability of each batch does not matter.
+        # Ids append to the primary key, but names and phone digits land all over the secondary
+        # indexes and the full-text index (or their rebuild): keep those pages in a large cache.
+        pragmas = {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in _LOAD_PRAGMAS}
+        for name, value in _LOAD_PRAGMAS.items():
+            connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+
+        dropped, dropped_triggers = [], []
+        if drop_indexes:
+            dropped = _schema_objects(connection, "index", (users_table.name, passports_table.name))
+            dropped_triggers = _schema_objects(connection, "trigger", (users_table.name,))
+            with connection.begin():
+                for name, _ in dropped:
+                    connection.exec_driver_sql(f"DROP INDEX {name}")
+                for name, _ in dropped_triggers:
+                    connection.exec_driver_sql(f"DROP TRIGGER {name}")
+            logger.info("[seed_database] Dropped %d indexes and %d triggers", len(dropped), len(dropped_triggers))
+
+        try:
+            for start in range(0, users, batch_size):
+                count = min(batch_size, users - start)
+                positions = np.arange(existing_users + start, existing_users + start + count, dtype=np.int64)
+                user_ids = _uuid7_bytes(rng, base_ms, start + np.arange(count, dtype=np.int64))
+                first_names, last_names, patronymics = _full_names(positions)
+                phone_numbers = _phone_numbers(positions)
+                derived = [phone_columns(phone_number) for phone_number in phone_numbers]
+                user_columns = {"id": user_ids, "first_name": first_names, "last_name": last_names,
+                                "patronymic": patronymics, "phone_number": phone_numbers,
+                                "phone_digits": [row["phone_digits"] for row in derived],
+                                "phone_digits_reversed": [row["phone_digits_reversed"] for row in derived]}
+
+                owners = np.flatnonzero(rng.random(count) < passport_ratio)
+                passport_positions = np.arange(len(owners), dtype=np.int64) + existing_passports + inserted_passports
+                if len(owners) and passport_positions[-1] >= _PASSPORT_NUMBER_SPACE:
+                    raise ValueError("No unique passport numbers left for the requested passports")
+                numbers = _permute(passport_positions, _PASSPORT_NUMBER_SPACE, _PASSPORT_MULTIPLIER, 0)
+                series = rng.integers(1000, 10_000, size=len(owners))
+                birth_dates, receipt_dates = _dates(rng, len(owners), today)
+                passport_columns = {
+                    "id": _uuid7_bytes(rng, base_ms, inserted_passports + np.arange(len(owners), dtype=np.int64)),
+                    "birth_date": birth_dates.tolist(),
+                    "passport_series": [str(s) for s in series.tolist()],
+                    "passport_number": [f"{n:06d}" for n in numbers.tolist()],
+                    "receipt_date": receipt_dates.tolist(),
+                    "user_id": [user_ids[i] for i in owners.tolist()],
+                }
+
+                with connection.begin():
+                    _insert(connection, users_table, user_columns)
+                    if len(owners):
+                        _insert(connection, passports_table, passport_columns)
+                inserted_passports += len(owners)
+                logger.info("[seed_database] Inserted %d of %d users", start + count, users)
+        finally:
+            if dropped or dropped_triggers:
+                with connection.begin():
+                    for _, ddl in dropped + dropped_triggers:
+                        connection.exec_driver_sql(ddl)
+                    # the triggers missed the seeded rows: index the names from scratch
+                    if dropped_triggers and _has_table(connection, USER_SEARCH_TABLE):
+                        connection.exec_driver_sql(f"INSERT INTO {USER_SEARCH_TABLE}({USER_SEARCH_TABLE}) VALUES ('rebuild')")
+                logger.info("[seed_database] Rebuilt %d indexes and %d triggers", len(dropped), len(dropped_triggers))
+            for name, value in pragmas.items():
+                connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+
+        with connection.begin():
+            connection.exec_driver_sql("ANALYZE")
+
+    result = SeedResult(users=users, passports=inserted_passports, seconds=perf_counter() - started)
+    logger.info("[seed_database] Seeded %d users and %d passports in %.1fs", result.users, result.passports, result.seconds)
+    return result
@@ -0,0 +1,129 @@
+from collections import deque
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.logger import get_logger
+from src.schemas.db_config import SlowQueryConfig
+
+logger = get_logger()
+
+# EXPLAIN plans are cached per statement text; SQL is generated, so the set stays small
+_PLAN_CACHE_SIZE = 256
+
+
+def redact(value: Any) -> Any:
+    """
+    Replace a bound parameter with its type (and length for strings and bytes),
+    so the slow-query log never holds personal data such as names or phone numbers.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _redact_parameters(parameters: Any, executemany: bool) -> Any:
+    if executemany:
+        # report the size of the batch and the shape of its first row
+        parameters = list(parameters)
+        return {"rows": len(parameters), "first": _redact_parameters(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    return [redact(value) for value in parameters or ()]
+
+
+def _is_full_scan(detail: str) -> bool:
+    # "SCAN users" reads the whole table; "SCAN users USING INDEX ..." walks an index, and
+    # "SCAN users_fts VIRTUAL TABLE INDEX ..." is a lookup in the full-text index
+    return detail.startswith("SCAN ") and " USING " not in detail and "CONSTANT ROW" not in detail \
+        and " VIRTUAL TABLE " not in detail
+
+
+class SlowQueryRecorder:
+    """
+    Engine-level recorder of statements slower than a threshold.
+    Keeps the most recent ones in a bounded ring buffer.
+    """
+
+    def __init__(self, threshold_ms: float, buffer_size: int, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        # deque.append with maxlen is atomic, so recording needs no lock
+        self._entries: deque[dict] = deque(maxlen=buffer_size)
+        self._plans: dict[str, list[str]] = {}
+
+    @classmethod
+    def from_config(cls, config: SlowQueryConfig) -> "SlowQueryRecorder | None":
+        if not config.enabled:
+            return None
+        return cls(config.threshold_ms, config.buffer_size, config.explain)
+
+    def install(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_started = perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def check_duration(conn, cursor, statement, parameters, context, executemany):
+            duration_ms = (perf_counter() - context._slow_query_started) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.record(conn, statement, parameters, executemany, duration_ms)
+
+    def record(self, conn, statement: str, parameters: Any, executemany: bool, duration_ms: float) -> dict:
+        plan = None
+        if self.explain and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            plan = self._explain(conn, statement, parameters)
+
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "sql": statement,
+            "parameters": _redact_parameters(parameters, executemany),
+            "plan": plan,
+            "full_scan": any(_is_full_scan(detail) for detail in plan or ()),
+        }
+        self._entries.append(entry)
+        logger.warning(
+            "[SlowQueryRecorder] DB: slow statement %.1f ms%s: %s params=%s",
+            duration_ms, " (full table scan)" if entry["full_scan"] else "", statement, entry["parameters"],
+        )
+        return entry
+
+    def _explain(self, conn, statement: str, parameters: Any) -> list[str] | None:
+        plan = self._plans.get(statement)
+        if plan is not None:
+            return plan
+
+        try:
+            # A separate DBAPI cursor: the statement's own cursor still holds its unread rows,
+            # and the Connection itself must not be re-entered from a cursor event
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plan = [row[3] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.warning("[SlowQueryRecorder] DB: EXPLAIN QUERY PLAN failed: %s", e)
+            return None
+
+        if len(self._plans) >= _PLAN_CACHE_SIZE:
+            self._plans.clear()
+        self._plans[statement] = plan
+        return plan
+
+    def entries(self, limit: int | None = None) -> list[dict]:
+        """
+        Recorded slow statements, newest first.
+        """
+        entries = list(self._entries)
+        entries.reverse()
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> None:
+        self._entries.clear()
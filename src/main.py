@@ -1,18 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from src.infrastructure.database import Base, engine
 from src.core.logger import setup_logging
-from src.api.routers import users, passport  
-from src.infrastructure.models.users import UserModel
-from src.infrastructure.models.passport import PassportModel
+from src.infrastructure import database
+from src.api.middleware import MetricsMiddleware
+from src.api.routers import admin, metrics, users, passport
 
-# create the database tables
-Base.metadata.create_all(bind=engine)
+# the schema is managed by migrations: `python -m src.cli migrate`
 
 setup_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # aiosqlite runs every pooled connection on a non-daemon thread: without closing
+    # them the process would not exit after the server stops
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+    database.engine.dispose()
+
 # initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # including all router
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(passport.router, prefix="/passports", tags=["passports"])
+app.include_router(admin.router)
+app.include_router(metrics.router)
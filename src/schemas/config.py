@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from pathlib import Path
+from typing import Literal
 from src.schemas.db_config import DatabaseConfig
 
 class PathsConfig(BaseModel):
@@ -11,10 +12,25 @@ class LoggingConfig(BaseModel):
     console_level: str
     format: str
 
+class CacheConfig(BaseModel):
+    enabled_envs: list[str] = []
+    max_size: int = 10000
+    ttl_seconds: float = 30.0
+
+    def is_enabled(self, env: str) -> bool:
+        return env in self.enabled_envs
+
+class QueryBudgetConfig(BaseModel):
+    # what an exceeded budget does: nothing, a warning in the log, or QueryBudgetExceededError
+    mode: Literal["off", "warn", "raise"] = "warn"
+    n_plus_one_threshold: int = 3
+
 class AppConfig(BaseModel):
     env: str
     project_name: str
     paths: PathsConfig
     database: DatabaseConfig
     logging: LoggingConfig
+    cache: CacheConfig = CacheConfig()
+    query_budget: QueryBudgetConfig = QueryBudgetConfig()
 
@@ -1,14 +1,47 @@
 from pydantic import BaseModel
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Literal
 
 class TableConfig(BaseModel):
     primary_key: str = "id"
 
+class PerformanceConfig(BaseModel):
+    # PRAGMAs applied to every new SQLite connection
+    journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    cache_size: int = -64000  # negative values are KiB, positive values are pages
+    mmap_size: int = 268435456
+    temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    busy_timeout: int = 5000  # milliseconds
+
+    # Connection pool
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_recycle: int = 3600  # seconds
+
+    def pragmas(self) -> Dict[str, str | int]:
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "cache_size": self.cache_size,
+            "mmap_size": self.mmap_size,
+            "temp_store": self.temp_store,
+            "busy_timeout": self.busy_timeout,
+        }
+
+class SlowQueryConfig(BaseModel):
+    enabled: bool = True
+    threshold_ms: float = 100.0  # statements at or above this duration are recorded
+    explain: bool = True  # capture EXPLAIN QUERY PLAN for slow SELECTs
+    buffer_size: int = 200  # most recent slow statements kept for /admin/slow-queries
+
 class DatabaseConfig(BaseModel):
     engine: str
     name: str
+    mode: Literal["sync", "async"] = "sync"
     tables: Dict[str, TableConfig]
+    performance: PerformanceConfig = PerformanceConfig()
+    slow_query: SlowQueryConfig = SlowQueryConfig()
 
     @property
     def path(self) -> Path:
@@ -20,4 +53,4 @@ class DatabaseConfig(BaseModel):
             raise ValueError(f"Table {table_name} not found in config")
         
         # Construct the full path to the database file
-        return base_dir / self.name
\ No newline at end of file
+        return base_dir / self.name
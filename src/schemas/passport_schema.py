@@ -15,14 +15,25 @@ class PassportBase(BaseModel):
     receipt_date: date
     user_id: UserId
 
-    _validate_birth_date = field_validator("birth_date", mode="before")(parse_date)
-    _validate_receipt_date = field_validator("receipt_date", mode="before")(parse_date)
     _validate_passport_series = field_validator("passport_series", mode="before")(validate_passport_series)
     _validate_passport_number = field_validator("passport_number", mode="before")(validate_passport_number)
     _validate_user_id = field_validator("user_id", mode="before")(validate_user_id)
     
 class PassportCreate(PassportBase):
-    pass
+    _validate_birth_date = field_validator("birth_date", mode="before")(parse_date)
+    _validate_receipt_date = field_validator("receipt_date", mode="before")(parse_date)
+
+class PassportBulkCreate(BaseModel):
+    """Passport nested in a bulk user import row; user_id is assigned on insert."""
+    birth_date: date
+    passport_series: str
+    passport_number: str
+    receipt_date: date
+
+    _validate_birth_date = field_validator("birth_date", mode="before")(parse_date)
+    _validate_receipt_date = field_validator("receipt_date", mode="before")(parse_date)
+    _validate_passport_series = field_validator("passport_series", mode="before")(validate_passport_series)
+    _validate_passport_number = field_validator("passport_number", mode="before")(validate_passport_number)
 
 class PassportUpdate(BaseModel):
     birth_date: Optional[date] = None
@@ -40,5 +51,5 @@ class PassportUpdate(BaseModel):
 class PassportOut(PassportBase):
     id: UUID
 
-    _validate_birth_date = model_validator(mode="before")(convert_dates)
-    _validate_receipt_date = model_validator(mode="before")(convert_dates)
\ No newline at end of file
+    # Dates come from the database already parsed; convert_dates only checks them
+    _convert_dates = model_validator(mode="before")(convert_dates)
\ No newline at end of file
@@ -2,10 +2,10 @@ from pydantic import BaseModel, ConfigDict, field_validator
 from src.utils.validators import validate_first_name, validate_last_name, validate_patronymic, validate_phone_number
 from typing import Optional
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
-from src.schemas.passport_schema import PassportOut
+from src.schemas.passport_schema import PassportBulkCreate, PassportOut
 
 class UsersBase(BaseModel):
     model_config = ConfigDict(from_attributes=True) # to read data from ORM models
@@ -23,6 +23,15 @@ class UsersBase(BaseModel):
 class UsersCreate(UsersBase):
     pass
 
+class UsersBulkCreate(UsersCreate):
+    passports: list[PassportBulkCreate] = []
+
+class UsersBulkResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    id: UUID | None = None
+    detail: str | None = None
+
 class UsersUpdate(UsersBase):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -41,4 +50,11 @@ class UsersOut(UsersBase):
     last_name: str
     patronymic: str | None
     phone_number: str
-    passports: list[PassportOut] = []
\ No newline at end of file
+    passports: list[PassportOut] = []
+
+class UsersPage(BaseModel):
+    items: list[UsersOut]
+    next_cursor: str | None = None
+
+class UsersBatchGet(BaseModel):
+    ids: list[UUID]
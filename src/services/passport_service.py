@@ -2,14 +2,14 @@ from datetime import date
 
 from src.domain.passport import Passport
 from src.domain.identifiers  import PassportId
-from src.utils.exceptions import DuplicateError, NotFoundError
-from src.domain.interfaces.ipassport_repo import IPassportRepository
+from src.utils.exceptions import NotFoundError
+from src.domain.interfaces.iasync_passport_repo import IAsyncPassportRepository
 
 class PassportService:
-    def __init__(self, repo: IPassportRepository):
+    def __init__(self, repo: IAsyncPassportRepository):
         self.repo = repo
 
-    def create_passport(self, passport: Passport):
+    async def create_passport(self, passport: Passport):
         # Business logic
         if passport.birth_date > date.today():
             raise ValueError("Birth date cannot be in the future.")
@@ -17,58 +17,57 @@ class PassportService:
         if passport.receipt_date and passport.receipt_date < passport.birth_date:
             raise ValueError("Receipt date cannot be before birth date.")
         
-        if self.repo.get_passport_by_number(passport.passport_number):
-            raise DuplicateError("passport_number", passport.passport_number)
-        
-        if self.repo.get_passport_by_series_and_number(passport.passport_series, passport.passport_number):
-            raise DuplicateError("passport", f"{passport.passport_series} {passport.passport_number}")
-
-        return self.repo.create_passport(passport)
+        # Duplicates are rejected by the unique constraints (DuplicateError)
+        return await self.repo.create_passport(passport)
 
-    def get_passport(self, passport_id: PassportId):
-        passport = self.repo.get_passport(passport_id)
+    async def get_passport(self, passport_id: PassportId):
+        passport = await self.repo.get_passport(passport_id)
         if not passport:
             raise NotFoundError("Passport", passport_id)
         return passport
         
-    def get_passport_by_series_and_number(self,series: str, number: str):
-        passport = self.repo.get_passport_by_series_and_number(series, number)
+    async def get_passport_version(self, passport_id: PassportId) -> int:
+        version = await self.repo.get_passport_version(passport_id)
+        if version is None:
+            raise NotFoundError("Passport", passport_id)
+        return version
+
+    async def get_passport_by_series_and_number(self,series: str, number: str):
+        passport = await self.repo.get_passport_by_series_and_number(series, number)
         if not passport:
             log_message = str(series) + ' ' + str(number)
             raise NotFoundError("Passport", log_message.strip())
         return passport
     
-    def update_passport(self, passport: Passport):
-        existing_passport = self.repo.get_passport(passport.id)
-        if not existing_passport:
-            raise NotFoundError("Passport", passport.id)
-        
+    async def update_passport(self, passport: Passport, expected_version: int | None = None):
+        """
+        Only the fields given in `passport` (the non-None ones) change.
+        """
         if passport.birth_date and passport.birth_date > date.today():
             raise ValueError("Birth date cannot be in the future.")
         
         # Check if the receipt date is valid
-        if passport.receipt_date:
-            if passport.birth_date and passport.receipt_date < passport.birth_date:
+        if passport.birth_date and passport.receipt_date:
+            if passport.receipt_date < passport.birth_date:
                 raise ValueError("Receipt date cannot be before birth date.")
-            elif (
-                passport.birth_date is None
-                and existing_passport.birth_date is not None
-                and passport.receipt_date < existing_passport.birth_date
-            ):
+        elif passport.birth_date or passport.receipt_date:
+            # One of the dates is checked against the stored other one,
+            # the only case that needs the passport before the update
+            existing_passport = await self.get_passport(passport.id)
+            birth_date = passport.birth_date or existing_passport.birth_date
+            receipt_date = passport.receipt_date or existing_passport.receipt_date
+            if birth_date and receipt_date and receipt_date < birth_date:
                 raise ValueError("Receipt date cannot be before birth date.")
         
-        if passport.passport_number and passport.passport_number != existing_passport.passport_number:
-            if self.repo.get_passport_by_number(passport.passport_number):
-                raise DuplicateError("passport_number", passport.passport_number)
-            
-        if passport.passport_series and passport.passport_series != existing_passport.passport_series:
-            if self.repo.get_passport_by_series(passport.passport_series):
-                raise DuplicateError("passport_series", passport.passport_series)
-        
-        return self.repo.update_passport(passport)
+        # Duplicates are rejected by the unique constraints (DuplicateError),
+        # a missing passport or a version mismatch by the single UPDATE
+        updated = await self.repo.update_passport(passport, expected_version)
+        if not updated:
+            raise NotFoundError("Passport", passport.id)
+        return updated
     
-    def delete_passport(self, passport_id: PassportId):
-        user = self.repo.get_passport(passport_id)
-        if not user:
+    async def delete_passport(self, passport_id: PassportId):
+        deleted = await self.repo.delete_passport(passport_id)
+        if not deleted:
             raise NotFoundError("Passport", passport_id)
-        return self.repo.delete_passport(passport_id)
\ No newline at end of file
+        return deleted
\ No newline at end of file
@@ -1,94 +1,240 @@
-from src.domain.users import User
+import re
+from datetime import date
+from typing import AsyncIterator
+from uuid import UUID
+
+from src.domain.users import FULL_USER, User, UserProjection
 from src.domain.passport import Passport
 from src.domain.identifiers import UserId
 from src.schemas.user_schema import UsersUpdate
 from src.schemas.passport_schema import PassportUpdate
-from src.utils.exceptions import DuplicateError, NotFoundError
-from src.domain.interfaces.ipassport_repo import IPassportRepository
-from src.domain.interfaces.iuser_repo import IUserRepository
+from src.utils.exceptions import DomainError, DomainValidationError, DuplicateError, NotFoundError
+from src.utils.dataloader import DataLoader
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.validators import canonical_phone_number
+from src.domain.interfaces.iasync_passport_repo import IAsyncPassportRepository
+from src.domain.interfaces.iasync_user_repo import IAsyncUserRepository
+
+# Letters of any script; everything else separates search terms
+_SEARCH_TERM = re.compile(r"[^\W\d_]+")
+_MAX_SEARCH_TERMS = 8
+# Fewer trailing digits match too large a share of the numbers to be useful
+_MIN_PHONE_SUFFIX_DIGITS = 4
+_MAX_PHONE_SUFFIX_DIGITS = 11
+# Ids per batch lookup: the passports of up to 500 users come in one selectinload query
+_MAX_BATCH_IDS = 500
+
+
+async def load_users_by_id(user_repo: IAsyncUserRepository, user_ids: list[UserId]) -> dict[UserId, User]:
+    """
+    Batch function of the user loader: the whole users of `user_ids` by id.
+    """
+    # A batch of one keeps the single joined query of get_user
+    if len(user_ids) == 1:
+        user = await user_repo.get_user(user_ids[0])
+        return {user.id: user} if user else {}
+    return {user.id: user for user in await user_repo.get_users(user_ids)}
+
+
+def _full_name(user: User) -> tuple[str, str, str | None]:
+    # As uq_users_full_name compares names: an empty patronymic is a missing one
+    return user.first_name, user.last_name, user.patronymic or None
+
 
 class UserService:
-    def __init__(self, user_repo: IUserRepository, passport_repo: IPassportRepository):
+    def __init__(self, user_repo: IAsyncUserRepository, passport_repo: IAsyncPassportRepository,
+        user_loader: DataLoader[UserId, User] | None = None):
         self.user_repo = user_repo
         self.passport_repo = passport_repo
+        # Process-wide loader of whole users (see load_users_by_id); without it they are read directly
+        self.user_loader = user_loader
+
+    async def create_user(self, user: User, passport: Passport | None = None) -> User:
+        # Create user object, duplicates are rejected by the unique constraints (DuplicateError)
+        created_user = await self.user_repo.create_user(user)
+
+        # Create him passport if exist
+        if passport:
+            passport.user_id = created_user.id
+            await self.passport_repo.create_passport(passport)
+
+        return created_user
+    
+    async def create_users(self, users: list[User]) -> list[User | DomainError]:
+        """
+        Create a batch of users (with their passports) in a single transaction.
+        Returns one entry per input row, in order: the created user, or the
+        DomainError explaining why the row was skipped.
+        """
+        results: list[User | DomainError | None] = [None] * len(users)
+
+        # Set-based duplicate checks for the whole batch, phone numbers as canonical digits
+        existing_phones = await self.user_repo.get_existing_phone_numbers(u.phone_number for u in users)
+        existing_names = await self.user_repo.get_existing_full_names(_full_name(u) for u in users)
+        existing_numbers = await self.passport_repo.get_existing_passport_numbers(
+            p.passport_number for u in users for p in (u.passports or [])
+        )
+
+        to_create: list[tuple[int, User]] = []
+        for index, user in enumerate(users):
+            try:
+                self._check_bulk_row(user, existing_phones, existing_names, existing_numbers)
+            except DomainError as e:
+                results[index] = e
+                continue
+
+            # Later rows in the same batch must not collide with this one
+            existing_phones.add(canonical_phone_number(user.phone_number))
+            existing_names.add(_full_name(user))
+            existing_numbers.update(p.passport_number for p in (user.passports or []))
+            to_create.append((index, user))
+
+        created_users = await self.user_repo.create_users([user for _, user in to_create])
+        for (index, _), created_user in zip(to_create, created_users):
+            results[index] = created_user
+
+        return results
+
+    @staticmethod
+    def _check_bulk_row(user: User, existing_phones: set[str],
+                        existing_names: set[tuple[str, str, str | None]],
+                        existing_numbers: set[str]) -> None:
+        for passport in user.passports or []:
+            if passport.birth_date > date.today():
+                raise DomainValidationError("Birth date cannot be in the future.")
+            if passport.receipt_date and passport.receipt_date < passport.birth_date:
+                raise DomainValidationError("Receipt date cannot be before birth date.")
 
-    def create_user(self, user: User, passport: Passport | None = None) -> User:
-        # Check for duplicates
-        if self.user_repo.get_user_by_full_name(
-            user.first_name, user.last_name, user.patronymic
-        ):
+        if _full_name(user) in existing_names:
             raise DuplicateError(
                 "full_name",
                 f"{user.last_name} {user.first_name} {user.patronymic or ''}".strip()
             )
 
-        if self.user_repo.get_user_by_phone(user.phone_number):
+        if canonical_phone_number(user.phone_number) in existing_phones:
             raise DuplicateError("phone_number", user.phone_number)
 
-        # Create user object
-        created_user = self.user_repo.create_user(user)
+        numbers = [p.passport_number for p in user.passports or []]
+        for number in numbers:
+            if number in existing_numbers or numbers.count(number) > 1:
+                raise DuplicateError("passport_number", number)
 
-        # Create him passport if exist
-        if passport:
-            passport.user_id = created_user.id
-            self.passport_repo.create_passport(passport)
-
-        return created_user
-    
-    def get_user(self, user_id: UserId) -> User:
-        user = self.user_repo.get_user(user_id)
+    async def get_user(self, user_id: UserId, projection: UserProjection = FULL_USER) -> User:
+        # Lookups of the whole aggregate are coalesced; a projection is read on its own
+        if projection == FULL_USER and self.user_loader is not None:
+            user = await self.user_loader.load(user_id)
+        else:
+            user = await self.user_repo.get_user(user_id, projection)
         if not user:
             raise NotFoundError("User", user_id)
         return user
     
-    def get_user_by_full_name(self, first_name: str | None = None,
+    async def get_users(self, user_ids: list[UserId], projection: UserProjection = FULL_USER) -> list[User]:
+        """
+        The users of `user_ids` in the order asked for, once each; ids that match
+        no user are left out.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if len(user_ids) > _MAX_BATCH_IDS:
+            raise DomainValidationError(f"At most {_MAX_BATCH_IDS} ids can be fetched at once")
+        if not user_ids:
+            return []
+
+        found = {user.id: user for user in await self.user_repo.get_users(user_ids, projection)}
+        return [found[user_id] for user_id in user_ids if user_id in found]
+
+    async def get_user_version(self, user_id: UserId) -> int:
+        version = await self.user_repo.get_user_version(user_id)
+        if version is None:
+            raise NotFoundError("User", user_id)
+        return version
+
+    async def get_user_by_full_name(self, first_name: str | None = None,
         last_name: str | None = None,
-        patronymic: str | None = None):
-        user = self.user_repo.get_user_by_full_name(first_name, last_name, patronymic)
+        patronymic: str | None = None,
+        limit: int | None = None,
+        projection: UserProjection = FULL_USER):
+        user = await self.user_repo.get_user_by_full_name(first_name, last_name, patronymic, limit, projection)
         if not user:
             log_message = str(first_name) + ", " + str(last_name) + ", " + str(patronymic)
             raise NotFoundError("User", log_message.strip())
         return user
-    
-    def update_user(self, user_id: UserId, user_data: UsersUpdate, passport_data: PassportUpdate | None = None) -> User:
 
-        # Get existing user
-        existing_user = self.user_repo.get_user(user_id)
-        if not existing_user:
-            raise NotFoundError("User", user_id)
+    async def search_users(self, query: str, limit: int, projection: UserProjection = FULL_USER) -> list[User]:
+        """
+        Users whose names start with every word of `query`, best matches first.
+        """
+        terms = _SEARCH_TERM.findall(query)[:_MAX_SEARCH_TERMS]
+        if not terms:
+            raise DomainValidationError("Search query must contain at least one letter")
+        return await self.user_repo.search_users(terms, limit, projection)
+
+    async def search_users_by_phone_suffix(self, suffix: str, limit: int,
+                                           projection: UserProjection = FULL_USER) -> list[User]:
+        """
+        Users whose phone number ends with the digits of `suffix`.
+        """
+        digits = "".join(character for character in suffix if "0" <= character <= "9")
+        if not _MIN_PHONE_SUFFIX_DIGITS <= len(digits) <= _MAX_PHONE_SUFFIX_DIGITS:
+            raise DomainValidationError(
+                f"Phone suffix must contain {_MIN_PHONE_SUFFIX_DIGITS} to {_MAX_PHONE_SUFFIX_DIGITS} digits"
+            )
+        return await self.user_repo.search_users_by_phone_suffix(digits, limit, projection)
+
+    async def list_users(self, limit: int, cursor: str | None = None,
+                         projection: UserProjection = FULL_USER) -> tuple[list[User], str | None]:
+        """
+        Return one page of users ordered by (last_name, first_name, id)
+        and the cursor of the next page, or None on the last page.
+        """
+        after = None
+        if cursor:
+            last_name, first_name, user_id = decode_cursor(cursor, 3)
+            try:
+                after = (last_name, first_name, UserId(UUID(user_id)))
+            except (TypeError, ValueError):
+                raise DomainValidationError("Invalid pagination cursor")
+
+        # Fetch one extra row to know whether another page follows
+        # The cursor is built from the sort key, whatever the projection
+        users = await self.user_repo.list_users(limit + 1, after, projection.with_fields("last_name", "first_name"))
+        if len(users) <= limit:
+            return users, None
 
-        # Check for duplicates
-        first_name = user_data.first_name or existing_user.first_name
-        last_name = user_data.last_name or existing_user.last_name
-        patronymic = user_data.patronymic or existing_user.patronymic
-        if (first_name != existing_user.first_name 
-            or last_name != existing_user.last_name 
-            or patronymic != existing_user.patronymic):
-            if self.user_repo.get_user_by_full_name(first_name, last_name, patronymic):
-                raise DuplicateError(
-                    "full_name",
-                    f"{last_name} {first_name} {patronymic or ''}".strip()
-                )
-
-        phone_number = user_data.phone_number or existing_user.phone_number
-        if phone_number != existing_user.phone_number:
-            if self.user_repo.get_user_by_phone(phone_number):
-                raise DuplicateError("phone_number", phone_number)
-
-        # Update user
-        updated_user = self.user_repo.update_user(
+        users = users[:limit]
+        last = users[-1]
+        return users, encode_cursor((last.last_name, last.first_name, last.id))
+    
+    def export_users(self) -> AsyncIterator[User]:
+        """
+        Lazily iterate over all users with their passports.
+        """
+        return self.user_repo.iter_users()
+
+    async def update_user(self, user_id: UserId, user_data: UsersUpdate, passport_data: PassportUpdate | None = None,
+                          expected_version: int | None = None) -> User:
+        """
+        Only the fields given in `user_data` change. With `expected_version`, the update
+        only applies to the user at that version and raises VersionConflictError otherwise.
+        """
+        # No read first: the repository's single UPDATE reports a missing user or version mismatch.
+        # Duplicates are rejected by the unique constraints (DuplicateError)
+        updated_user = await self.user_repo.update_user(
             User(
                 id=user_id,
-                first_name=user_data.first_name or existing_user.first_name,
-                last_name=user_data.last_name or existing_user.last_name,
-                patronymic=user_data.patronymic or existing_user.patronymic,
-                phone_number=phone_number
-            )
+                first_name=user_data.first_name or None,
+                last_name=user_data.last_name or None,
+                patronymic=user_data.patronymic or None,
+                phone_number=user_data.phone_number or None,
+            ),
+            expected_version,
         )
+        if not updated_user:
+            raise NotFoundError("User", user_id)
 
         # Update or create passport if exist
         if passport_data:
-            existing_passport = self.passport_repo.get_passport_by_series_and_number(
+            existing_passport = await self.passport_repo.get_passport_by_series_and_number(
                 passport_data.passport_series,
                 passport_data.passport_number
             )
@@ -103,17 +249,16 @@ class UserService:
             )
 
             if existing_passport:
-                self.passport_repo.update_passport(passport_domain)
+                await self.passport_repo.update_passport(passport_domain)
             else:
-                self.passport_repo.create_passport(passport_domain)
+                await self.passport_repo.create_passport(passport_domain)
 
         return updated_user
 
     
-    def delete_user(self, user_id: UserId) -> bool:
-        existing_user = self.repo.get_user(user_id)
-        if not existing_user:
+    async def delete_user(self, user_id: UserId) -> bool:
+        # Deletion users and hit data in passport (by trigger), a missing user deletes nothing
+        deleted = await self.user_repo.delete_user(user_id)
+        if not deleted:
             raise NotFoundError("User", user_id)
-
-        # Deletion users and hit data in passport (using cascade)
-        return self.repo.delete_user(user_id)
\ No newline at end of file
+        return deleted
\ No newline at end of file
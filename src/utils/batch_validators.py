@@ -0,0 +1,243 @@
+"""
+Columnar counterparts of the validators in src.utils.validators.
+
+Strings are first checked a block at a time: the block is joined into one
+string and matched against a pattern that only accepts clean values, which
+is one regex pass in C for the common all-valid case. Blocks that fail are
+checked value by value with vectorized pandas string operations using the
+same patterns and messages as the scalar validator. Values that are not
+strings take the scalar validator itself, so odd inputs fail exactly as
+they do one at a time.
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils import validators
+
+# Columns validate_batch understands, in the order their errors are reported
+FIELDS = (
+    "first_name", "last_name", "patronymic", "phone_number",
+    "passport_series", "passport_number", "birth_date", "receipt_date",
+)
+
+# Values per joined block; a failing block costs this many per-value checks
+_BLOCK_SIZE = 256
+_SEPARATOR = "\x00"
+
+
+@dataclass
+class BatchValidationResult:
+    """
+    Normalized values and error messages per column; both are object arrays
+    aligned with the input rows, with None for the missing side.
+    """
+    values: dict[str, np.ndarray]
+    errors: dict[str, np.ndarray]
+
+    @property
+    def invalid(self) -> np.ndarray:
+        """Boolean mask of the rows with at least one error."""
+        size = len(next(iter(self.errors.values()), ()))
+        mask = np.zeros(size, dtype=bool)
+        for messages in self.errors.values():
+            mask |= messages != None  # noqa: E711 - element-wise comparison
+        return mask
+
+    def invalid_rows(self) -> list[int]:
+        """Positions of the rows with at least one error."""
+        return np.flatnonzero(self.invalid).tolist()
+
+    def row_errors(self, index: int) -> dict[str, str]:
+        return {name: messages[index] for name, messages in self.errors.items() if messages[index] is not None}
+
+
+def _object_array(values: Sequence) -> np.ndarray:
+    # np.asarray would turn nested sequences into extra dimensions
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def _clean_blocks(strings: np.ndarray, clean: re.Pattern, normalize: Callable[[str], str] | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mask of the strings in blocks whose every value matches `clean`, and their
+    normalized values. `normalize` maps a joined block and keeps the separators.
+    """
+    ok = np.zeros(len(strings), dtype=bool)
+    normalized = strings.copy()
+    for start in range(0, len(strings), _BLOCK_SIZE):
+        block = strings[start:start + _BLOCK_SIZE]
+        joined = _SEPARATOR.join(block)
+        # a separator inside a value would split it into two clean-looking ones
+        if joined.count(_SEPARATOR) == len(block) - 1 and clean.fullmatch(joined):
+            ok[start:start + len(block)] = True
+            if normalize:
+                normalized[start:start + len(block)] = normalize(joined).split(_SEPARATOR)
+    return ok, normalized
+
+
+def _column(values: Sequence, column: "_Column") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Check the string values block-wise and then one by one where needed,
+    and run the scalar validator over everything else.
+    """
+    array = _object_array(values)
+    results = array.copy()
+    errors = np.full(len(array), None, dtype=object)
+
+    is_str = np.fromiter((type(value) is str for value in array), dtype=bool, count=len(array))
+    positions = np.flatnonzero(is_str)
+    if column.clean is not None and len(positions):
+        ok, normalized = _clean_blocks(array[positions], column.clean, column.normalize)
+        results[positions[ok]] = normalized[ok]
+        positions = positions[~ok]
+    if len(positions):
+        strings = pd.Series(array[positions], dtype=object)
+        normalized, messages = column.vectorized(strings)
+        results[positions] = normalized.to_numpy(dtype=object)
+        errors[positions] = messages.to_numpy(dtype=object)
+
+    for position in np.flatnonzero(~is_str):
+        try:
+            results[position] = column.scalar(array[position])
+        except Exception as e:
+            errors[position] = str(e)
+    results[errors != None] = None  # noqa: E711
+    return results, errors
+
+
+def _checks(strings: pd.Series, checks: list[tuple[pd.Series, str]]) -> pd.Series:
+    """
+    Message of the first failing check per value, None where all pass.
+    """
+    messages = np.full(len(strings), None, dtype=object)
+    for failed, message in reversed(checks):
+        messages[failed.to_numpy(dtype=bool)] = message
+    return pd.Series(messages, index=strings.index)
+
+
+def _names(field_name: str, blank_message: str | None, blank_allowed: bool):
+    def vectorized(strings: pd.Series) -> tuple[pd.Series, pd.Series]:
+        checks = []
+        blank = strings.str.strip().str.len() == 0
+        if blank_message:
+            checks.append((blank, blank_message))
+        not_alphabetic = ~strings.str.match(validators.NAME_PATTERN)
+        if blank_allowed:
+            # blank values are returned untouched, before the alphabet check
+            not_alphabetic &= ~blank
+        checks.append((not_alphabetic, f"{field_name} must contain only alphabetic characters"))
+        normalized = strings.str.title()
+        if blank_allowed:
+            normalized = normalized.mask(blank, strings)
+        return normalized, _checks(strings, checks)
+    return vectorized
+
+
+def _phone_numbers(strings: pd.Series) -> tuple[pd.Series, pd.Series]:
+    return strings, _checks(strings, [
+        (strings.str.strip().str.len() == 0, "Phone number cannot be empty or None"),
+        (strings.str.count(r"[0-9]") != 11, "Phone number must contain exactly 11 digits"),
+        (~strings.str.match(validators.PHONE_PATTERN), 'Phone number can only contain digits, "+", and "-"'),
+    ])
+
+
+def _passport_field(length: int, length_message: str, pattern: str, digits_message: str, upper: bool):
+    def vectorized(strings: pd.Series) -> tuple[pd.Series, pd.Series]:
+        stripped = strings.str.strip()
+        messages = _checks(stripped, [
+            (stripped.str.len() != length, length_message),
+            (~stripped.str.match(pattern), digits_message),
+        ])
+        return (stripped.str.upper() if upper else stripped), messages
+    return vectorized
+
+
+def _dates(field_name: str):
+    def vectorized(strings: pd.Series) -> tuple[pd.Series, pd.Series]:
+        # imports repeat dates a lot: parse each distinct string once
+        codes, uniques = pd.factorize(strings)
+        parsed = np.full(len(uniques), None, dtype=object)
+        messages = np.full(len(uniques), None, dtype=object)
+        for i, value in enumerate(uniques):
+            try:
+                parsed[i] = validators.parse_date(value, field_name)
+            except ValueError as e:
+                messages[i] = str(e)
+        return pd.Series(parsed[codes], index=strings.index), pd.Series(messages[codes], index=strings.index)
+    return vectorized
+
+
+@dataclass(frozen=True)
+class _Column:
+    scalar: Callable
+    vectorized: Callable[[pd.Series], tuple[pd.Series, pd.Series]]
+    # pattern of a valid value that needs no stripping, for the block check
+    clean: re.Pattern | None = None
+    normalize: Callable[[str], str] | None = None
+
+
+def _blocks_of(value_pattern: str) -> re.Pattern:
+    return re.compile(f"(?:{value_pattern}{_SEPARATOR})*{value_pattern}")
+
+
+_NAME = _blocks_of(r"[a-zA-Zа-яА-Я]+")
+
+_COLUMNS: dict[str, _Column] = {
+    "first_name": _Column(validators.validate_first_name, _names("first_name", None, blank_allowed=True), _NAME, str.title),
+    "last_name": _Column(validators.validate_last_name, _names("last_name", "last_name cannot be empty or None", blank_allowed=False), _NAME, str.title),
+    "patronymic": _Column(validators.validate_patronymic, _names("patronymic", None, blank_allowed=False), _NAME, str.title),
+    "phone_number": _Column(validators.validate_phone_number, _phone_numbers, _blocks_of(r"[+\-]*(?:[0-9][+\-]*){11}")),
+    "passport_series": _Column(validators.validate_passport_series, _passport_field(
+        4, "passport_series must be exactly 4 characters long with whitespace",
+        validators.PASSPORT_SERIES_PATTERN, "passport_series must contain only digits and cannot start with zero", upper=True,
+    ), _blocks_of(r"[1-9][0-9]{3}")),
+    "passport_number": _Column(validators.validate_passport_number, _passport_field(
+        6, "passport_number must be exactly 6 characters long",
+        validators.PASSPORT_NUMBER_PATTERN, "passport_number must contain only digits", upper=False,
+    ), _blocks_of(r"[0-9]{6}")),
+    "birth_date": _Column(lambda value: validators.parse_date(value, "birth_date"), _dates("birth_date")),
+    "receipt_date": _Column(lambda value: validators.parse_date(value, "receipt_date"), _dates("receipt_date")),
+}
+
+
+def _validate_chunk(columns: Mapping[str, Sequence]) -> BatchValidationResult:
+    values, errors = {}, {}
+    for name in FIELDS:
+        if name in columns:
+            values[name], errors[name] = _column(columns[name], _COLUMNS[name])
+    return BatchValidationResult(values, errors)
+
+
+def validate_batch(columns: Mapping[str, Sequence], processes: int | None = None,
+                   chunk_size: int = 100_000) -> BatchValidationResult:
+    """
+    Validate equally long columns named after FIELDS; unknown names are rejected.
+    With `processes`, batches longer than `chunk_size` are split across a process pool.
+    """
+    unknown = set(columns) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length")
+    size = lengths.pop() if lengths else 0
+
+    if not processes or size <= chunk_size:
+        return _validate_chunk(columns)
+
+    chunks = [
+        {name: list(column[start:start + chunk_size]) for name, column in columns.items()}
+        for start in range(0, size, chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        parts = list(executor.map(_validate_chunk, chunks))
+    return BatchValidationResult(
+        values={name: np.concatenate([part.values[name] for part in parts]) for name in parts[0].values},
+        errors={name: np.concatenate([part.errors[name] for part in parts]) for name in parts[0].errors},
+    )
@@ -0,0 +1,66 @@
+"""
+Dataloader-style request coalescing: the lookups made during one event-loop
+tick are collected and answered by a single batched call.
+"""
+import asyncio
+import contextvars
+from typing import Awaitable, Callable, Generic, Hashable, Mapping, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces concurrent load() calls into one `batch_load(keys)` call per
+    event-loop tick, or per `window` seconds when given. `batch_load` returns the
+    found values by key; keys it leaves out load as None. The same key requested
+    twice in a batch is fetched once.
+
+    A loader is shared by the requests of the process, so a batch serves several
+    of them: `batch_load` must open its own session, and runs in a fresh context
+    so that no caller's query budget or log context applies to it.
+    """
+
+    def __init__(self, batch_load: Callable[[list[K]], Awaitable[Mapping[K, V]]], window: float = 0):
+        self.batch_load = batch_load
+        self.window = window
+        # The keys waiting for the next dispatch, by event loop
+        self._batches: dict[asyncio.AbstractEventLoop, dict[K, asyncio.Future]] = {}
+        # The loop only keeps weak references to tasks: hold the running batches until they finish
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = {}
+            # Runs once the tasks already woken in this iteration (or within the window) had their turn to join
+            if self.window:
+                loop.call_later(self.window, self._dispatch, loop, context=contextvars.Context())
+            else:
+                loop.call_soon(self._dispatch, loop, context=contextvars.Context())
+
+        future = batch.get(key)
+        if future is None:
+            future = batch[key] = loop.create_future()
+        # Shared with the other callers of the key: one of them being cancelled must not cancel it
+        return await asyncio.shield(future)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self._run(self._batches.pop(loop)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future]) -> None:
+        try:
+            values = await self.batch_load(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
@@ -18,4 +18,12 @@ class NotFoundError(DomainError):
     def __init__(self, entity: str, entity_id: int):
         self.entity = entity
         self.entity_id = entity_id
-        super().__init__(f"{entity} with id={entity_id} not found")
\ No newline at end of file
+        super().__init__(f"{entity} with id={entity_id} not found")
+
+
+class VersionConflictError(DomainError):
+    def __init__(self, entity: str, entity_id: int, expected_version: int):
+        self.entity = entity
+        self.entity_id = entity_id
+        self.expected_version = expected_version
+        super().__init__(f"{entity} with id={entity_id} is no longer at version {expected_version}")
\ No newline at end of file
@@ -0,0 +1,29 @@
+import base64
+import json
+from typing import Any
+
+from src.utils.exceptions import DomainValidationError
+
+
+def encode_cursor(values: tuple[Any, ...]) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor token.
+    """
+    raw = json.dumps([str(value) if value is not None else None for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> tuple[Any, ...]:
+    """
+    Decode a cursor token produced by encode_cursor.
+    Raises DomainValidationError if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise DomainValidationError("Invalid pagination cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise DomainValidationError("Invalid pagination cursor")
+    return tuple(values)
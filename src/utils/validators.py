@@ -1,5 +1,6 @@
 import re
-from datetime import date, datetime
+from datetime import date
+from functools import lru_cache
 from uuid import UUID
 from typing import Any
 
@@ -9,6 +10,12 @@ DATE_FORMATS = [
     '%d-%m-%Y', '%Y.%m.%d', '%Y/%m/%d',
 ]
 
+# Shared with the columnar validators in src.utils.batch_validators
+NAME_PATTERN = r'^[a-zA-Zа-яА-Я]*$'
+PHONE_PATTERN = r'^[0-9\+\-]*$'
+PASSPORT_SERIES_PATTERN = r'^[1-9][0-9]{3}$'
+PASSPORT_NUMBER_PATTERN = r'^[0-9]{6}$'
+
 def validate_first_name(value):
     if value is None or not value.strip():
         return value  # Skip it if the field is not provided.
@@ -16,7 +23,7 @@ def validate_first_name(value):
     if not isinstance(value, str):
         raise ValueError('first_name must be a string')
         
-    if not re.match(r'^[a-zA-Zа-яА-Я]*$', value):
+    if not re.match(NAME_PATTERN, value):
         raise ValueError('first_name must contain only alphabetic characters')
         
     return value.title()
@@ -28,7 +35,7 @@ def validate_last_name(value):
     if not isinstance(value, str):
         raise ValueError('last_name must be a string')
         
-    if not re.match(r'^[a-zA-Zа-яА-Я]*$', value):
+    if not re.match(NAME_PATTERN, value):
         raise ValueError('last_name must contain only alphabetic characters')
         
     return value.title()
@@ -37,7 +44,7 @@ def validate_patronymic(value):
     if not isinstance(value, str):
         raise ValueError('patronymic must be a string')
         
-    if not re.match(r'^[a-zA-Zа-яА-Я]*$', value):
+    if not re.match(NAME_PATTERN, value):
         raise ValueError('patronymic must contain only alphabetic characters')
         
     return value.title()
@@ -54,11 +61,23 @@ def validate_phone_number(value):
     if len(digits) != 11:
         raise ValueError('Phone number must contain exactly 11 digits')
         
-    if not re.match(r'^[0-9\+\-]*$', value):
+    if not re.match(PHONE_PATTERN, value):
         raise ValueError('Phone number can only contain digits, "+", and "-"')
         
     return value
 
+def canonical_phone_number(value: str | None) -> str | None:
+    """
+    Digits of a phone number as they are indexed: "+7-900-...", "8900..." and
+    "7900..." are the same number, the domestic 8 prefix becomes the country code 7.
+    """
+    if value is None:
+        return None
+    digits = re.sub(r'[^0-9]', '', value)
+    if len(digits) == 11 and digits.startswith('8'):
+        digits = '7' + digits[1:]
+    return digits
+
 def validate_passport_series(value):
     if value is None:
         raise ValueError('passport_series cannot be empty or None')
@@ -72,7 +91,7 @@ def validate_passport_series(value):
     if len(value) != 4:
         raise ValueError('passport_series must be exactly 4 characters long with whitespace')
         
-    if not re.match(r'^[1-9][0-9]{3}$', value):
+    if not re.match(PASSPORT_SERIES_PATTERN, value):
         raise ValueError('passport_series must contain only digits and cannot start with zero')
         
     return value.upper()
@@ -90,41 +109,74 @@ def validate_passport_number(value):
     if len(value) != 6:
         raise ValueError('passport_number must be exactly 6 characters long')
         
-    if not re.match(r'^[0-9]{6}$', value):
+    if not re.match(PASSPORT_NUMBER_PATTERN, value):
         raise ValueError('passport_number must contain only digits')
         
     return value
 
+# strptime's own field patterns for %d, %m and %Y, so both paths accept the same strings
+_DAY = r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])'
+_MONTH = r'(1[0-2]|0[1-9]|[1-9])'
+_YEAR = r'(\d\d\d\d)'
+# Every DATE_FORMATS entry is year-first or day-first with one separator used twice.
+# The first field's length tells the two apart, so at most one format can match.
+_YEAR_FIRST = re.compile(_YEAR + r'([.\-/])' + _MONTH + r'\2' + _DAY)
+_DAY_FIRST = re.compile(_DAY + r'([.\-/])' + _MONTH + r'\2' + _YEAR)
+_DATE_CHARACTERS = re.compile(r'[\d.\-\/ ]+')
+
+_INVALID_CHARACTERS = object()
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_string(value: str):
+    """
+    Parse a stripped, non-empty date string in one of DATE_FORMATS.
+    Returns the date, None when no format matches, or _INVALID_CHARACTERS.
+    """
+    if len(value) == 10 and value[4] == '-' and value[7] == '-' and value.isascii():
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+
+    if not _DATE_CHARACTERS.fullmatch(value):
+        return _INVALID_CHARACTERS
+
+    # a year-first string has its separator right after the four-digit year
+    match = _YEAR_FIRST.fullmatch(value) if value[4:5] in ('.', '-', '/') else None
+    if match:
+        year, _, month, day = match.groups()
+    else:
+        match = _DAY_FIRST.fullmatch(value)
+        if not match:
+            return None
+        day, _, month, year = match.groups()
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
 def parse_date(value: Any, field_name: str, future_allowed: bool = True) -> date:
     if value is None:
         raise ValueError(f"{field_name} cannot be None")
 
+    # datetime is a date too and is returned as it is
     if isinstance(value, date):
         if not future_allowed and value > date.today():
             raise ValueError(f"{field_name} cannot be in the future")
         return value
 
-    if isinstance(value, datetime):
-        value = value.date()
-        if not future_allowed and value > date.today():
-            raise ValueError(f"{field_name} cannot be in the future")
-        return value
-
     if isinstance(value, str):
         value = value.strip()
         if not value:
             raise ValueError(f"{field_name} cannot be empty")
-        if not re.fullmatch(r'[\d.\-\/ ]+', value):
-            raise ValueError(f"{field_name} contains invalid characters")
 
-        for fmt in DATE_FORMATS:
-            try:
-                parsed = datetime.strptime(value, fmt).date()
-                if not future_allowed and parsed > date.today():
-                    raise ValueError(f"{field_name} cannot be in the future")
-                return parsed
-            except ValueError:
-                continue
+        parsed = _parse_date_string(value)
+        if parsed is _INVALID_CHARACTERS:
+            raise ValueError(f"{field_name} contains invalid characters")
+        # A future date string has always been reported with the format error
+        if parsed is not None and (future_allowed or parsed <= date.today()):
+            return parsed
 
         raise ValueError(
             f"{field_name} must be in one of the formats: "
@@ -137,7 +189,10 @@ def convert_dates(obj):
     for field, future_allowed in (("birth_date", False), ("receipt_date", True)):
         value = getattr(obj, field, None)
         if value is not None:
-            setattr(obj, field, parse_date(value, field, future_allowed))
+            parsed = parse_date(value, field, future_allowed)
+            # dates loaded from the database come back as they are: nothing to write back
+            if parsed is not value:
+                setattr(obj, field, parsed)
     return obj
 
 def validate_user_id(value):
@@ -0,0 +1,44 @@
+import asyncio
+import httpx
+import uuid
+from unittest.mock import patch
+
+from src.api.routers.users import get_user_loader
+from src.infrastructure.repository.user_repo import UserRepository
+from src.main import app
+
+
+def test_batch_get_keeps_the_requested_order(client, user_ids, query_budget):
+    missing = str(uuid.uuid4())
+    with query_budget(2):
+        response = client.post("/users/users/batch-get", json={"ids": [user_ids[2], missing, user_ids[0], user_ids[2]]})
+
+    assert response.status_code == 200
+    assert [user["first_name"] for user in response.json()] == ["Oleg", "Ivan"]
+
+def test_get_users_by_ids_query(client, user_ids):
+    response = client.get(f"/users/users/?ids={user_ids[1]},{user_ids[0]}&ids={user_ids[2]}")
+
+    assert response.status_code == 200
+    assert [user["first_name"] for user in response.json()["items"]] == ["Petr", "Ivan", "Oleg"]
+    assert response.json()["next_cursor"] is None
+
+def test_get_users_rejects_bad_ids(client):
+    assert client.get("/users/users/?ids=not-a-uuid").status_code == 400
+    too_many = [str(uuid.uuid4()) for _ in range(501)]
+    assert client.post("/users/users/batch-get", json={"ids": too_many}).status_code == 400
+
+def test_concurrent_user_lookups_share_one_query(client, user_ids):
+    # room for a slow test machine to resolve both requests' dependencies
+    app.dependency_overrides[get_user_loader]().window = 0.05
+
+    async def lookup():
+        # both requests on one event loop, as in the server
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            return await asyncio.gather(*(http.get(f"/users/users/id/{user_id}") for user_id in user_ids[:2]))
+
+    with patch.object(UserRepository, "get_users", autospec=True, side_effect=UserRepository.get_users) as get_users:
+        responses = asyncio.run(lookup())
+
+    assert [response.json()["id"] for response in responses] == user_ids[:2]
+    get_users.assert_called_once()
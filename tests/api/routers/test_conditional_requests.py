@@ -0,0 +1,52 @@
+import pytest
+
+
+@pytest.fixture
+def user_id(client):
+    response = client.post("/users/users/", json={"first_name": "Ivan", "last_name": "Ivanov", "patronymic": "Petrovich",
+                                                  "phone_number": "+79990000001"})
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_get_user_answers_304_while_the_etag_is_current(client, user_id, query_budget):
+    response = client.get(f"/users/users/id/{user_id}")
+    tag = response.headers["ETag"]
+    assert tag == '"1"'
+
+    with query_budget(1):
+        not_modified = client.get(f"/users/users/id/{user_id}", headers={"If-None-Match": f'"0", W/{tag}'})
+    assert (not_modified.status_code, not_modified.content, not_modified.headers["ETag"]) == (304, b"", tag)
+
+    client.put(f"/users/users/{user_id}", json={"first_name": "Petr"})
+    changed = client.get(f"/users/users/id/{user_id}", headers={"If-None-Match": tag})
+    assert (changed.status_code, changed.json()["first_name"], changed.headers["ETag"]) == (200, "Petr", '"2"')
+
+    assert client.get(f"/users/users/id/{user_id}", headers={"If-None-Match": '"2"'}).status_code == 304
+    assert client.get("/users/users/id/00000000-0000-0000-0000-000000000000", headers={"If-None-Match": "*"}).status_code == 404
+
+def test_passport_writes_change_the_etag_of_their_user(client, user_id):
+    created = client.post("/passports/passports/", json={"birth_date": "1990-01-01", "passport_series": "1234",
+                                                         "passport_number": "123456", "receipt_date": "2010-01-01",
+                                                         "user_id": user_id})
+    passport_id = created.json()["id"]
+    assert client.get(f"/users/users/id/{user_id}").headers["ETag"] == '"2"'
+
+    passport_tag = client.get(f"/passports/passports/{passport_id}").headers["ETag"]
+    assert client.get(f"/passports/passports/{passport_id}", headers={"If-None-Match": passport_tag}).status_code == 304
+
+    updated = client.put(f"/passports/passports/{passport_id}", json={"passport_number": "654321"})
+    assert updated.headers["ETag"] == '"2"'
+    assert client.get(f"/users/users/id/{user_id}").headers["ETag"] == '"3"'
+
+    client.delete(f"/passports/passports/{passport_id}")
+    assert client.get(f"/users/users/id/{user_id}").headers["ETag"] == '"4"'
+
+def test_put_with_a_stale_if_match_fails_the_precondition(client, user_id):
+    assert client.put(f"/users/users/{user_id}", json={"first_name": "Petr"}, headers={"If-Match": '"2"'}).status_code == 412
+    assert client.put(f"/users/users/{user_id}", json={"first_name": "Petr"}, headers={"If-Match": 'W/"1"'}).status_code == 412
+
+    updated = client.put(f"/users/users/{user_id}", json={"first_name": "Petr"}, headers={"If-Match": '"1"'})
+    assert (updated.status_code, updated.headers["ETag"]) == (200, '"2"')
+    assert client.put(f"/users/users/{user_id}", json={"first_name": "Oleg"}, headers={"If-Match": '"1"'}).status_code == 412
+    assert client.get(f"/users/users/id/{user_id}").json()["first_name"] == "Petr"
@@ -0,0 +1,35 @@
+def test_fields_select_only_the_requested_columns(client, user_ids, query_budget):
+    with query_budget(1) as budget:
+        response = client.get(f"/users/users/id/{user_ids[0]}?fields=phone_number,first_name")
+
+    assert response.json() == {"first_name": "Ivan", "phone_number": "+79990000000", "id": user_ids[0]}
+    assert response.headers["ETag"] == '"1"'
+    statement = budget.statements[0][0]
+    assert "users.phone_number" in statement and "users.last_name" not in statement and "passport" not in statement
+
+def test_include_adds_the_passports(client, user_ids, query_budget):
+    with query_budget(2):
+        response = client.post("/users/users/batch-get?fields=last_name&include=passports", json={"ids": user_ids[:2]})
+
+    assert [list(user) for user in response.json()] == [["last_name", "id", "passports"]] * 2
+    assert [user["passports"][0]["passport_number"] for user in response.json()] == ["123450", "123451"]
+
+def test_without_fields_or_include_users_come_whole(client, user_ids):
+    user = client.get(f"/users/users/id/{user_ids[0]}").json()
+    assert list(user) == ["first_name", "last_name", "patronymic", "phone_number", "id", "passports"]
+
+    assert list(client.get(f"/users/users/id/{user_ids[0]}?include=").json()) == \
+        ["first_name", "last_name", "patronymic", "phone_number", "id"]
+
+def test_projected_pages_keep_their_cursor(client, user_ids):
+    first = client.get("/users/users/?limit=2&fields=phone_number").json()
+    second = client.get(f"/users/users/?limit=2&fields=phone_number&cursor={first['next_cursor']}").json()
+
+    names = [user["phone_number"] for user in first["items"] + second["items"]]
+    assert sorted(names) == ["+79990000000", "+79990000001", "+79990000002"]
+    assert all(list(user) == ["phone_number", "id"] for user in first["items"] + second["items"])
+    assert [list(user) for user in client.get("/users/users/find?last_name=Ivanov&fields=").json()] == [["id"]] * 3
+
+def test_unknown_fields_and_includes_are_rejected(client, user_ids):
+    assert client.get(f"/users/users/id/{user_ids[0]}?fields=password").status_code == 400
+    assert client.get("/users/users/search?q=iva&include=friends").status_code == 400
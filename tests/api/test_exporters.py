@@ -0,0 +1,50 @@
+import asyncio
+import json
+import uuid
+from datetime import date
+
+from src.api.exporters import users_to_csv, users_to_ndjson
+from src.domain.passport import Passport
+from src.domain.users import User
+
+user_id = uuid.uuid4()
+passport_id = uuid.uuid4()
+
+async def collect(chunks):
+    return "".join([chunk async for chunk in chunks])
+
+async def iterate(items):
+    for item in items:
+        yield item
+
+users = [
+    User(id=user_id, first_name="Ivan", last_name="Ivanov", patronymic="Petrovich", phone_number="+79995553322",
+         passports=[Passport(id=passport_id, birth_date=date(1990, 1, 1), passport_series="1234",
+                             passport_number="123456", receipt_date=date(2010, 1, 1), user_id=user_id)]),
+    User(id=uuid.uuid4(), first_name="Petr", last_name="Petrov", patronymic="Ivanovich", phone_number="+79995553323",
+         passports=[]),
+]
+
+def test_users_to_ndjson():
+    lines = asyncio.run(collect(users_to_ndjson(iterate(users)))).splitlines()
+
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert first["id"] == str(user_id)
+    assert first["passports"][0]["birth_date"] == "1990-01-01"
+    assert json.loads(lines[1])["passports"] == []
+
+def test_users_to_csv():
+    rows = asyncio.run(collect(users_to_csv(iterate(users)))).splitlines()
+
+    assert rows[0].startswith("id,first_name,last_name")
+    assert rows[1] == f"{user_id},Ivan,Ivanov,Petrovich,+79995553322,{passport_id},1234,123456,1990-01-01,2010-01-01"
+    assert rows[2].endswith("+79995553323,,,,,")
+
+def test_export_is_lazy():
+    async def endless():
+        while True:
+            yield users[1]
+
+    first_chunk = asyncio.run(anext(users_to_ndjson(endless())))
+    assert first_chunk.startswith('{"first_name":"Petr"')
@@ -0,0 +1,32 @@
+import threading
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import configs
+from src.infrastructure import database
+from src.infrastructure.database import Base, create_async_sqlite_engine
+from src.main import app
+
+
+def aiosqlite_threads():
+    return [thread for thread in threading.enumerate() if "_connection_worker_thread" in thread.name]
+
+def test_shutdown_closes_the_async_connections(tmp_path, monkeypatch):
+    path = tmp_path / "app.db"
+    Base.metadata.create_all(bind=create_engine(f"sqlite:///{path}"))
+    async_engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{path}", configs.database.performance)
+    monkeypatch.setattr(database, "async_engine", async_engine)
+    monkeypatch.setattr(database, "AsyncSessionLocal", sessionmaker(bind=async_engine, class_=AsyncSession))
+
+    with TestClient(app) as client:
+        assert client.get(f"/users/users/id/{uuid.uuid4()}").status_code == 404
+        # the pool keeps the connection, and with it its worker thread
+        assert aiosqlite_threads()
+
+    for thread in aiosqlite_threads():
+        thread.join(timeout=5)
+    assert aiosqlite_threads() == []
@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.middleware import MetricsMiddleware
+from src.core.metrics import http_request_duration
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/items/{item_id}")
+async def get_item(item_id: int):
+    return {"id": item_id}
+
+client = TestClient(app)
+
+
+def observed(labels):
+    # bucket counts without the trailing sum
+    return sum(http_request_duration.values().get(labels, [0])[:-1])
+
+def test_metrics_middleware_labels_by_route_template():
+    before = observed(("GET", "/items/{item_id}", "200"))
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    assert observed(("GET", "/items/{item_id}", "200")) - before == 2
+    assert observed(("GET", "unmatched", "404")) >= 1
@@ -0,0 +1,82 @@
+import uuid
+from datetime import date
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.exporters import users_to_ndjson
+from src.api.responses import DomainJSONResponse
+from src.domain.passport import Passport
+from src.domain.users import User
+from src.schemas.user_schema import UsersOut, UsersPage
+
+
+def make_users():
+    ivan_id, oleg_id = uuid.uuid4(), uuid.uuid4()
+    return [
+        User(id=ivan_id, first_name="Ivan", last_name="Ivanov", patronymic="Petrovich", phone_number="+7-999-555-33-22",
+             passports=[Passport(id=uuid.uuid4(), birth_date=date(1990, 1, 31), passport_series="1234",
+                                 passport_number="012345", receipt_date=date(2010, 2, 1), user_id=ivan_id)]),
+        User(id=oleg_id, first_name="Олег", last_name="Смирнов", patronymic="Иванович", phone_number="89995553323",
+             passports=[]),
+        User(id=uuid.uuid4(), first_name="Petr", last_name="Petrov", patronymic="", phone_number="79995553324",
+             passports=[]),
+    ]
+
+users = make_users()
+
+# The same data through response_model validation and the default JSONResponse,
+# as the routes served it before
+app = FastAPI()
+
+@app.get("/validated", response_model=List[UsersOut])
+def validated():
+    return users
+
+@app.get("/validated/page", response_model=UsersPage)
+def validated_page():
+    return UsersPage(items=users, next_cursor="abc")
+
+@app.get("/validated/one", response_model=UsersOut)
+def validated_one():
+    return users[0]
+
+@app.get("/fast", response_model=List[UsersOut], response_class=DomainJSONResponse)
+def fast():
+    return DomainJSONResponse(users)
+
+@app.get("/fast/page", response_model=UsersPage, response_class=DomainJSONResponse)
+def fast_page():
+    return DomainJSONResponse({"items": users, "next_cursor": "abc"})
+
+@app.get("/fast/one", response_model=UsersOut, response_class=DomainJSONResponse)
+def fast_one():
+    return DomainJSONResponse(users[0])
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("suffix", ["", "/page", "/one"])
+def test_domain_response_is_byte_compatible(suffix):
+    expected = client.get("/validated" + suffix)
+    response = client.get("/fast" + suffix)
+
+    assert response.content == expected.content
+    assert response.headers["content-type"] == expected.headers["content-type"]
+
+def test_ndjson_export_matches_model_dump():
+    async def collect():
+        async def iterate():
+            for user in users:
+                yield user
+        return "".join([chunk async for chunk in users_to_ndjson(iterate())])
+
+    import asyncio
+    lines = asyncio.run(collect()).splitlines()
+    assert lines == [UsersOut.model_validate(user).model_dump_json() for user in users]
+
+def test_openapi_keeps_the_response_schema():
+    schema = app.openapi()["paths"]["/fast"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["items"]["$ref"].endswith("/UsersOut")
@@ -0,0 +1,29 @@
+import json
+import pytest
+
+from benchmarks.compare import compare
+from benchmarks.harness import percentile
+
+
+def write_results(path, p50, memory):
+    path.write_text(json.dumps({"results": [
+        {"name": "UserRepository.get_user", "size": 10000, "p50_us": p50, "p95_us": 100.0, "p99_us": 120.0,
+         "peak_memory_kib": memory},
+    ]}))
+    return path
+
+def test_percentile_interpolates_between_ranks():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0.5) == 2.5
+    assert percentile(values, 0.99) == pytest.approx(3.97)
+    assert percentile(values, 1.0) == 4.0
+
+def test_compare_flags_regressions_above_threshold(tmp_path):
+    baseline = write_results(tmp_path / "baseline.json", 50.0, 10.0)
+    slower = write_results(tmp_path / "slower.json", 60.0, 11.0)
+
+    _, regressions = compare(baseline, slower, latency_threshold=0.1, memory_threshold=0.2)
+    assert len(regressions) == 1 and "p50_us" in regressions[0]
+
+    _, regressions = compare(baseline, slower, latency_threshold=0.25, memory_threshold=0.2)
+    assert regressions == []
@@ -1,6 +1,8 @@
 import pytest
+from datetime import date
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 # add parent directory to sys.path to allow imports
@@ -8,7 +10,12 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.api.routers.users import get_user_loader, make_user_loader
+from src.domain.passport import Passport
+from src.domain.users import User
 from src.infrastructure.database import Base, get_db
+from src.infrastructure.query_budget import QueryBudget
+from src.infrastructure.repository.user_repo import UserRepository
 from src.main import app
 
 # creating a separate database for tests
@@ -34,12 +41,57 @@ def db_session():
         session.close()
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def memory_session():
+    """
+    Session bound to a fresh in-memory database with the current schema.
+    """
+    memory_engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=memory_engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        memory_engine.dispose()
+
+@pytest.fixture(scope="function")
+def query_budget():
+    """
+    Factory of statement budgets that fail the test when exceeded,
+    e.g. `with query_budget(1): repo.get_user(user_id)`.
+    """
+    def make(max_queries, **kwargs):
+        return QueryBudget(max_queries, mode="raise", **kwargs)
+    return make
+
+@pytest.fixture(scope="function")
+def client(memory_session):
     """
     The tests use the client to send API requests without affecting the real database.
     """
     # Override get_db для FastAPI
     def override_get_db():
-        yield db_session
+        yield memory_session
     app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
\ No newline at end of file
+    # the user loader opens its sessions itself, on the same database
+    async def loader_session():
+        yield memory_session
+    user_loader = make_user_loader(loader_session)
+    app.dependency_overrides[get_user_loader] = lambda: user_loader
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+def user_ids(memory_session):
+    """
+    Ids of three users (Ivan, Petr, Oleg Ivanov), each with one passport.
+    """
+    created = UserRepository(memory_session).create_users([
+        User(id=None, first_name=name, last_name="Ivanov", patronymic="Petrovich", phone_number=f"+7999000000{i}",
+             passports=[Passport(id=None, user_id=None, birth_date=date(1990, 1, 1), passport_series="1234",
+                                 passport_number=f"12345{i}", receipt_date=date(2010, 1, 1))])
+        for i, name in enumerate(["Ivan", "Petr", "Oleg"])
+    ])
+    return [str(user.id) for user in created]
\ No newline at end of file
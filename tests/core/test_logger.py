@@ -0,0 +1,46 @@
+import asyncio
+import logging
+import queue
+
+from src.core.logger import ContextFormatter, ContextQueueHandler, bind_log_context, log_context
+
+
+def make_logger(log_queue):
+    logger = logging.getLogger("test_logger")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(ContextQueueHandler(log_queue))
+    return logger
+
+def test_queue_handler_defers_formatting_and_keeps_context():
+    log_queue = queue.SimpleQueue()
+    logger = make_logger(log_queue)
+
+    with log_context(user_id="42"):
+        logger.info("fetched user %s", "Ivan")
+    logger.info("no context")
+
+    first, second = log_queue.get_nowait(), log_queue.get_nowait()
+    # the message is not rendered on the calling thread
+    assert (first.msg, first.args) == ("fetched user %s", ("Ivan",))
+
+    formatter = ContextFormatter("[%(context)s] %(message)s")
+    assert formatter.format(first) == "[user_id=42] fetched user Ivan"
+    assert formatter.format(second) == "[] no context"
+
+def test_context_is_isolated_between_tasks():
+    log_queue = queue.SimpleQueue()
+    logger = make_logger(log_queue)
+
+    async def handle(user_id):
+        bind_log_context(user_id=user_id)
+        await asyncio.sleep(0)
+        logger.info("request")
+
+    async def main():
+        await asyncio.gather(handle("1"), handle(None))
+
+    asyncio.run(main())
+    contexts = sorted(dict(log_queue.get_nowait().log_context)["user_id"] for _ in range(2))
+    assert contexts == ["1", "anon"]
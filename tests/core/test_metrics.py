@@ -0,0 +1,34 @@
+import threading
+
+from src.core.metrics import MetricsRegistry
+
+
+def test_counter_sums_per_thread_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("route",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("/users",))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.values() == {("/users",): 4000}
+    assert 'requests_total{route="/users"} 4000' in registry.render()
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(("/users",), value)
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/users",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/users",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/users",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/users"} 4' in lines
+    assert 'latency_seconds_sum{route="/users"} 3.65' in lines
@@ -0,0 +1,78 @@
+import pytest
+from datetime import date
+from unittest.mock import Mock
+
+from src.domain.passport import Passport
+from src.domain.users import User
+from src.infrastructure.cache import LRUCache
+from src.infrastructure.repository.cached_passport_repo import CachedPassportRepository
+from src.infrastructure.repository.cached_user_repo import CachedUserRepository
+from src.infrastructure.repository.passport_repo import PassportRepository
+from src.infrastructure.repository.user_repo import UserRepository
+
+
+@pytest.fixture
+def cache():
+    return LRUCache(max_size=100, ttl_seconds=60)
+
+@pytest.fixture
+def user_repo(memory_session, cache):
+    return CachedUserRepository(Mock(wraps=UserRepository(memory_session)), cache)
+
+@pytest.fixture
+def passport_repo(memory_session, cache):
+    return CachedPassportRepository(Mock(wraps=PassportRepository(memory_session)), cache)
+
+@pytest.fixture
+def user(user_repo):
+    return user_repo.create_users([
+        User(id=None, first_name="Ivan", last_name="Ivanov", patronymic="Petrovich", phone_number="+79990000001",
+             passports=[Passport(id=None, user_id=None, birth_date=date(1990, 1, 1), passport_series="1234",
+                                 passport_number="123456", receipt_date=date(2010, 1, 1))])
+    ])[0]
+
+def test_get_user_is_cached_by_id_and_phone(user_repo, user):
+    user_repo.get_user(user.id)
+    user_repo.get_user(user.id)
+    user_repo.get_user_by_phone(user.phone_number)
+
+    user_repo.repo.get_user.assert_called_once()
+    user_repo.repo.get_user_by_phone.assert_not_called()
+
+def test_update_user_invalidates(user_repo, user):
+    user_repo.get_user(user.id)
+    user_repo.update_user(User(id=user.id, first_name="Petr", last_name=None, patronymic=None, phone_number="+79990000002"))
+
+    assert user_repo.get_user(user.id).first_name == "Petr"
+    # the stale phone mapping is detected and the lookup falls through to the database
+    assert user_repo.get_user_by_phone("+79990000001") is None
+
+def test_passport_write_invalidates_owner(user_repo, passport_repo, user):
+    passport = user.passports[0]
+    assert user_repo.get_user(user.id).passports[0].passport_number == "123456"
+
+    passport_repo.update_passport(Passport(id=passport.id, birth_date=None, passport_series=None,
+                                           passport_number="654321", receipt_date=None, user_id=user.id))
+
+    assert user_repo.get_user(user.id).passports[0].passport_number == "654321"
+    assert passport_repo.get_passport_by_number("123456") is None
+
+def test_delete_passport_invalidates_owner(user_repo, passport_repo, user):
+    user_repo.get_user(user.id)
+    passport_repo.delete_passport(user.passports[0].id)
+
+    assert user_repo.get_user(user.id).passports == []
+    assert passport_repo.get_passport(user.passports[0].id) is None
+
+def test_versions_are_read_from_the_database(user_repo, passport_repo, user):
+    passport = user.passports[0]
+    user_repo.get_user(user.id)
+    passport_repo.get_passport(passport.id)
+
+    # a write of another process leaves this process' cache untouched
+    user_repo.repo.update_user(User(id=user.id, first_name="Petr", last_name=None, patronymic=None, phone_number=None))
+    passport_repo.repo.update_passport(Passport(id=passport.id, birth_date=None, passport_series=None,
+                                                passport_number="654321", receipt_date=None, user_id=user.id))
+
+    assert user_repo.get_user_version(user.id) > user.version
+    assert passport_repo.get_passport_version(passport.id) == passport.version + 1
@@ -0,0 +1,67 @@
+import pytest
+from datetime import date
+
+from src.domain.passport import Passport
+from src.domain.users import User
+from src.infrastructure.repository.passport_repo import PassportRepository
+from src.infrastructure.repository.user_repo import UserRepository
+from src.utils.exceptions import DuplicateError, VersionConflictError
+
+
+@pytest.fixture
+def owner(memory_session):
+    return UserRepository(memory_session).create_user(
+        User(id=None, first_name="Ivan", last_name="Ivanov", patronymic="Petrovich", phone_number="+79990000001")
+    )
+
+def make_passport(owner, series="1234", number="123456"):
+    return Passport(id=None, birth_date=date(1990, 1, 1), passport_series=series, passport_number=number,
+                    receipt_date=date(2010, 1, 1), user_id=owner.id)
+
+def test_create_passport_duplicate_number_from_constraint(memory_session, owner):
+    repo = PassportRepository(memory_session)
+    repo.create_passport(make_passport(owner))
+
+    with pytest.raises(DuplicateError) as error:
+        repo.create_passport(make_passport(owner, series="4321"))
+    assert (error.value.field, error.value.value) == ("passport_number", "123456")
+
+def test_update_passport_duplicate_number_from_constraint(memory_session, owner):
+    repo = PassportRepository(memory_session)
+    repo.create_passport(make_passport(owner))
+    other = repo.create_passport(make_passport(owner, series="4321", number="654321"))
+
+    with pytest.raises(DuplicateError) as error:
+        repo.update_passport(Passport(id=other.id, birth_date=None, passport_series=None, passport_number="123456",
+                                      receipt_date=None, user_id=None))
+    assert (error.value.field, error.value.value) == ("passport_number", "123456")
+
+def test_update_passport_is_one_statement_and_bumps_the_owner(memory_session, owner, query_budget):
+    repo = PassportRepository(memory_session)
+    passport = repo.create_passport(make_passport(owner))
+    users = UserRepository(memory_session)
+    owner_version = users.get_user_version(owner.id)
+    change = Passport(id=passport.id, birth_date=None, passport_series=None, passport_number="654321",
+                      receipt_date=None, user_id=None)
+
+    with query_budget(1):
+        updated = repo.update_passport(change, expected_version=1)
+    assert (updated.passport_number, updated.passport_series, updated.version) == ("654321", "1234", 2)
+    assert users.get_user_version(owner.id) == owner_version + 1
+
+    # writing the stored values again changes no version
+    assert repo.update_passport(change).version == 2
+    assert users.get_user_version(owner.id) == owner_version + 1
+    with pytest.raises(VersionConflictError):
+        repo.update_passport(change, expected_version=1)
+
+def test_delete_passport_returns_the_deleted_row(memory_session, owner, query_budget):
+    repo = PassportRepository(memory_session)
+    passport = repo.create_passport(make_passport(owner))
+    owner_version = UserRepository(memory_session).get_user_version(owner.id)
+
+    with query_budget(1):
+        deleted = repo.delete_passport(passport.id)
+    assert (deleted.id, deleted.user_id, deleted.birth_date) == (passport.id, owner.id, date(1990, 1, 1))
+    assert UserRepository(memory_session).get_user_version(owner.id) == owner_version + 1
+    assert repo.delete_passport(passport.id) is None
@@ -5,6 +5,7 @@ import uuid
 from datetime import date
 
 from src.domain.users import User
+from src.infrastructure.models.passport import PassportModel
 from src.infrastructure.models.users import UserModel
 from src.infrastructure.repository.user_repo import UserRepository
 
@@ -173,20 +174,138 @@ def test_update_user_not_found(user_repository, mock_db_session):
     assert result is None
 
 def test_delete_user_success(user_repository, mock_db_session):
-    user_model = UserModel(id=test_uuid, first_name="John", last_name="Doe", patronymic="Smith", phone_number="1234567890",
-                          birth_date="1990-01-01", passport_number="1234", passport_series="AB")
-    mock_db_session.query().filter().first.return_value = user_model
-    mock_db_session.commit.return_value = None
+    mock_db_session.execute().first.return_value = (test_uuid,)
 
     result = user_repository.delete_user(test_uuid)
 
     assert result is True
-    mock_db_session.delete.assert_called_once()
+    mock_db_session.delete.assert_not_called()
     mock_db_session.commit.assert_called_once()
 
 def test_delete_user_not_found(user_repository, mock_db_session):
-    mock_db_session.query().filter().first.return_value = None
+    mock_db_session.execute().first.return_value = None
     not_found_uuid = str(uuid.uuid4())
     result = user_repository.delete_user(not_found_uuid)
 
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+from src.domain.passport import Passport
+from src.utils.exceptions import DuplicateError, VersionConflictError
+
+
+def make_user(**overrides):
+    fields = dict(id=None, first_name="Ivan", last_name="Ivanov", patronymic="Petrovich", phone_number="+79990000001")
+    fields.update(overrides)
+    return User(**fields)
+
+def test_create_user_duplicate_phone_from_constraint(memory_session):
+    repo = UserRepository(memory_session)
+    repo.create_user(make_user())
+
+    with pytest.raises(DuplicateError) as error:
+        repo.create_user(make_user(first_name="Petr"))
+    assert (error.value.field, error.value.value) == ("phone_number", "+79990000001")
+
+def test_create_user_duplicate_full_name_from_constraint(memory_session):
+    repo = UserRepository(memory_session)
+    repo.create_user(make_user())
+
+    with pytest.raises(DuplicateError) as error:
+        repo.create_user(make_user(phone_number="+79990000002"))
+    assert (error.value.field, error.value.value) == ("full_name", "Ivanov Ivan Petrovich")
+
+def test_create_user_duplicate_full_name_without_patronymic(memory_session):
+    repo = UserRepository(memory_session)
+    repo.create_user(make_user(patronymic=None))
+
+    with pytest.raises(DuplicateError) as error:
+        repo.create_user(make_user(patronymic=None, phone_number="+79990000002"))
+    assert (error.value.field, error.value.value) == ("full_name", "Ivanov Ivan")
+
+def test_update_user_duplicate_phone_from_constraint(memory_session):
+    repo = UserRepository(memory_session)
+    repo.create_user(make_user())
+    other = repo.create_user(make_user(first_name="Petr", phone_number="+79990000002"))
+
+    with pytest.raises(DuplicateError, match="phone_number"):
+        repo.update_user(make_user(id=other.id, first_name=None, last_name=None, patronymic=None,
+                                   phone_number="+79990000001"))
+    assert repo.get_user(other.id).phone_number == "+79990000002"
+
+def test_search_users_by_name_prefixes(memory_session, query_budget):
+    repo = UserRepository(memory_session)
+    ivanov = repo.create_user(make_user())
+    petrov = repo.create_user(make_user(first_name="Ivanna", last_name="Petrova", phone_number="+79990000002"))
+    repo.create_user(make_user(first_name="Олег", last_name="Смирнов", patronymic="Иванович", phone_number="+79990000003"))
+
+    with query_budget(2):
+        found = repo.search_users(["iva"], limit=10)
+    # a last name match outranks a first name one
+    assert [user.id for user in found] == [ivanov.id, petrov.id]
+    assert {user.id for user in repo.search_users(["iva", "pet"], limit=10)} == {ivanov.id, petrov.id}
+    assert [user.last_name for user in repo.search_users(["смир", "олег"], limit=10)] == ["Смирнов"]
+    assert len(repo.search_users(["iv"], limit=1)) == 1
+
+def test_search_index_follows_updates_and_deletes(memory_session):
+    repo = UserRepository(memory_session)
+    user = repo.create_user(make_user())
+
+    repo.update_user(make_user(id=user.id, last_name="Sidorov", first_name=None, patronymic=None, phone_number=None))
+    assert repo.search_users(["ivanov"], limit=10) == []
+    assert [found.id for found in repo.search_users(["sido"], limit=10)] == [user.id]
+
+    repo.delete_user(user.id)
+    assert repo.search_users(["sido"], limit=10) == []
+
+def test_phone_lookups_ignore_the_number_format(memory_session):
+    repo = UserRepository(memory_session)
+    user = repo.create_user(make_user(phone_number="+7-999-000-00-01"))
+
+    assert repo.get_user_by_phone("89990000001").id == user.id
+    assert repo.get_existing_phone_numbers(["8-999-000-00-01", "+79990000002"]) == {"79990000001"}
+    with pytest.raises(DuplicateError) as error:
+        repo.create_users([make_user(first_name="Petr", phone_number="89990000001")])
+    assert error.value.field == "phone_number"
+
+def test_search_users_by_phone_suffix(memory_session, query_budget):
+    repo = UserRepository(memory_session)
+    first = repo.create_user(make_user(phone_number="+79990001234"))
+    second = repo.create_users([make_user(first_name="Petr", phone_number="8-999-555-12-34")])[0]
+    repo.create_user(make_user(first_name="Oleg", phone_number="+79990004321"))
+
+    with query_budget(2):
+        found = repo.search_users_by_phone_suffix("1234", limit=10)
+    assert {user.id for user in found} == {first.id, second.id}
+    assert [user.id for user in repo.search_users_by_phone_suffix("51234", limit=10)] == [second.id]
+    assert len(repo.search_users_by_phone_suffix("34", limit=1)) == 1
+
+    repo.update_user(make_user(id=first.id, first_name=None, last_name=None, patronymic=None, phone_number="+79990009999"))
+    assert [user.id for user in repo.search_users_by_phone_suffix("1234", limit=10)] == [second.id]
+
+def test_update_user_is_one_statement(memory_session, query_budget):
+    repo = UserRepository(memory_session)
+    user = repo.create_users([make_user(passports=[Passport(id=None, user_id=None, birth_date=date(1990, 1, 1),
+        passport_series="1234", passport_number="123456", receipt_date=date(2010, 1, 1))])])[0]
+    rename = make_user(id=user.id, first_name="Petr", last_name=None, patronymic=None, phone_number=None)
+
+    # the UPDATE ... RETURNING, then the passports of the result
+    with query_budget(2):
+        updated = repo.update_user(rename, expected_version=1)
+    assert (updated.first_name, updated.last_name, updated.version) == ("Petr", "Ivanov", 2)
+    assert [passport.id for passport in updated.passports] == [user.passports[0].id]
+
+    # writing the stored values again leaves the version alone
+    assert repo.update_user(rename).version == 2
+    with pytest.raises(VersionConflictError):
+        repo.update_user(rename, expected_version=1)
+    assert repo.update_user(make_user(id=uuid.uuid4()), expected_version=1) is None
+
+def test_delete_user_takes_the_passports_along(memory_session, query_budget):
+    repo = UserRepository(memory_session)
+    user = repo.create_users([make_user(passports=[Passport(id=None, user_id=None, birth_date=date(1990, 1, 1),
+        passport_series="1234", passport_number="123456", receipt_date=date(2010, 1, 1))])])[0]
+
+    with query_budget(1):
+        assert repo.delete_user(user.id) is True
+    assert memory_session.query(PassportModel).count() == 0
+    assert repo.delete_user(user.id) is None
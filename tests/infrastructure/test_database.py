@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from sqlalchemy import text
+
+from src.infrastructure.database import create_async_sqlite_engine, create_sqlite_engine
+from src.schemas.db_config import PerformanceConfig
+
+
+def test_pragmas_applied_per_connection(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path}/perf.db", PerformanceConfig(busy_timeout=1234))
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    engine.dispose()
+
+def test_pragmas_applied_on_async_engine(tmp_path):
+    async def journal_mode():
+        async_engine = create_async_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path}/perf.db", PerformanceConfig())
+        async with async_engine.connect() as conn:
+            mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        await async_engine.dispose()
+        return mode
+
+    assert asyncio.run(journal_mode()) == "wal"
+
+def test_readers_not_blocked_by_open_write(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path}/perf.db", PerformanceConfig(busy_timeout=100))
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    writer = engine.connect()
+    transaction = writer.begin()
+    writer.execute(text("INSERT INTO t VALUES (2)"))
+
+    # With WAL a reader in another thread sees the last committed state instead of waiting for the writer
+    result = []
+
+    def read():
+        with engine.connect() as conn:
+            result.append(conn.execute(text("SELECT count(*) FROM t")).scalar())
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    reader.join()
+
+    transaction.commit()
+    writer.close()
+    engine.dispose()
+    assert result == [1]
@@ -0,0 +1,146 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from uuid import uuid4
+
+from src.infrastructure.database import Base
+from src.infrastructure.migrations import MIGRATIONS, Migration, current_version, migrate
+from src.infrastructure.migrations.runner import sql
+from src.infrastructure.repository.user_repo import UserRepository
+
+
+@pytest.fixture
+def memory_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+def triggers(engine, table):
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,))
+        return {row.name for row in rows}
+
+def indexes(engine, table):
+    # From the stored DDL: reflection skips expression indexes
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))
+        return {" ".join(row.sql.replace(" IF NOT EXISTS", "").split()) for row in rows}
+
+def schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            indexes(engine, table),
+            triggers(engine, table),
+        )
+        for table in ("users", "passport")
+    }
+
+def test_migrations_match_models(memory_engine):
+    migrate(memory_engine, MIGRATIONS)
+
+    models_engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=models_engine)
+    assert schema(memory_engine) == schema(models_engine)
+    assert current_version(memory_engine) == MIGRATIONS[-1].version
+
+def test_migrate_is_idempotent(memory_engine):
+    migrate(memory_engine, MIGRATIONS, target=3)
+    assert current_version(memory_engine) == 3
+
+    applied = migrate(memory_engine, MIGRATIONS)
+    assert [migration.version for migration in applied] == [m.version for m in MIGRATIONS if m.version > 3]
+    assert migrate(memory_engine, MIGRATIONS) == []
+
+def test_failed_migration_rolls_back(memory_engine):
+    broken = MIGRATIONS + [Migration(99, "broken", sql(
+        "CREATE INDEX ix_users_broken ON users (first_name)",
+        "CREATE INDEX ix_missing ON missing_table (id)",
+    ))]
+
+    with pytest.raises(Exception):
+        migrate(memory_engine, broken)
+
+    assert current_version(memory_engine) == MIGRATIONS[-1].version
+    assert not any("ix_users_broken" in index for index in indexes(memory_engine, "users"))
+
+def test_binary_uuid_migration_converts_string_keys(memory_engine):
+    migrate(memory_engine, MIGRATIONS, target=7)
+    user_id, passport_id = uuid4(), uuid4()
+    with memory_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, first_name, last_name, patronymic, phone_number) VALUES (?, 'Ivan', 'Ivanov', NULL, '+79990000001')",
+            (str(user_id),),
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO passport (id, passport_series, passport_number, user_id) VALUES (?, '1234', '123456', ?)",
+            (str(passport_id), str(user_id)),
+        )
+
+    migrate(memory_engine, MIGRATIONS)
+
+    session = sessionmaker(bind=memory_engine)()
+    user = UserRepository(session).get_user(user_id)
+    session.close()
+    assert user.id == user_id
+    assert [(passport.id, passport.user_id) for passport in user.passports] == [(passport_id, user_id)]
+    with memory_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT length(id), typeof(id) FROM users").one() == (16, "blob")
+
+def test_full_name_migration_rejects_duplicates(memory_engine):
+    migrate(memory_engine, MIGRATIONS, target=2)
+    with memory_engine.begin() as connection:
+        for phone_number in ("+79990000001", "+79990000002"):
+            connection.exec_driver_sql(
+                "INSERT INTO users (id, first_name, last_name, patronymic, phone_number) VALUES (?, 'Ivan', 'Ivanov', 'Petrovich', ?)",
+                (str(uuid4()), phone_number),
+            )
+
+    with pytest.raises(ValueError, match="share a full name, resolve them first: Ivanov Ivan Petrovich"):
+        migrate(memory_engine, MIGRATIONS)
+    assert current_version(memory_engine) == 2
+
+    with memory_engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM users WHERE phone_number = '+79990000002'")
+    migrate(memory_engine, MIGRATIONS)
+    assert current_version(memory_engine) == MIGRATIONS[-1].version
+
+def test_phone_digits_migration_backfills_and_rejects_format_duplicates(memory_engine):
+    migrate(memory_engine, MIGRATIONS, target=9)
+    with memory_engine.begin() as connection:
+        for phone_number in ("+7-999-000-00-01", "89990000001"):
+            connection.exec_driver_sql(
+                "INSERT INTO users (id, first_name, last_name, phone_number) VALUES (?, 'Ivan', ?, ?)",
+                (uuid4().bytes, f"Ivanov{phone_number[-1]}{len(phone_number)}", phone_number),
+            )
+
+    with pytest.raises(ValueError, match=r"\+7-999-000-00-01"):
+        migrate(memory_engine, MIGRATIONS)
+    assert current_version(memory_engine) == 10
+
+    with memory_engine.begin() as connection:
+        assert connection.exec_driver_sql("SELECT DISTINCT phone_digits, phone_digits_reversed FROM users").all() == \
+            [("79990000001", "10000009997")]
+        connection.exec_driver_sql("DELETE FROM users WHERE phone_number = '89990000001'")
+    migrate(memory_engine, MIGRATIONS)
+    assert current_version(memory_engine) == MIGRATIONS[-1].version
+
+def test_full_name_migration_rejects_duplicates_without_patronymic(memory_engine):
+    migrate(memory_engine, MIGRATIONS, target=14)
+    with memory_engine.begin() as connection:
+        for phone_digits in ("79990000001", "79990000002"):
+            connection.exec_driver_sql(
+                "INSERT INTO users (id, first_name, last_name, phone_digits) VALUES (?, 'Ivan', 'Ivanov', ?)",
+                (uuid4().bytes, phone_digits),
+            )
+
+    with pytest.raises(ValueError, match="Ivanov Ivan"):
+        migrate(memory_engine, MIGRATIONS)
+    assert current_version(memory_engine) == 14
+
+    with memory_engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE users SET patronymic = 'Petrovich' WHERE phone_digits = '79990000002'")
+    migrate(memory_engine, MIGRATIONS)
+    assert current_version(memory_engine) == MIGRATIONS[-1].version
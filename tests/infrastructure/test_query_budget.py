@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+
+from src.domain.users import User
+from src.infrastructure.models.users import UserModel
+from src.infrastructure.query_budget import QueryBudgetExceededError
+from src.infrastructure.repository.user_repo import UserRepository
+
+
+def create_users(session, count):
+    repo = UserRepository(session)
+    return [
+        repo.create_user(User(id=None, first_name="Ivan", last_name=f"Ivanov{'a' * i}", patronymic="Petrovich",
+                              phone_number=f"+7999000000{i}"))
+        for i in range(count)
+    ]
+
+def test_budget_counts_repository_statements(memory_session, query_budget):
+    user = create_users(memory_session, 1)[0]
+    repo = UserRepository(memory_session)
+
+    with query_budget(1) as budget:
+        repo.get_user(user.id)
+    assert budget.count == 1
+
+    with pytest.raises(QueryBudgetExceededError, match="2 statements, budget is 1"):
+        with query_budget(1):
+            repo.get_user(user.id)
+            repo.get_user(user.id)
+
+def test_budget_detects_lazy_loads_per_row(memory_session, query_budget):
+    create_users(memory_session, 3)
+    memory_session.expire_all()
+
+    with pytest.raises(QueryBudgetExceededError, match="N\\+1: 3 executions"):
+        with query_budget(10):
+            for obj in memory_session.query(UserModel).all():
+                obj.passports
+
+def test_find_by_name_without_filters_loads_passports_eagerly(memory_session, query_budget):
+    create_users(memory_session, 3)
+    memory_session.expire_all()
+
+    with query_budget(2):
+        users = UserRepository(memory_session).get_user_by_full_name()
+    assert len(users) == 3
+
+def test_budget_decorates_coroutines(memory_session, query_budget):
+    user = create_users(memory_session, 1)[0]
+    repo = UserRepository(memory_session)
+
+    @query_budget(1)
+    async def handler():
+        repo.get_user(user.id)
+        repo.get_user(user.id)
+
+    with pytest.raises(QueryBudgetExceededError):
+        asyncio.run(handler())
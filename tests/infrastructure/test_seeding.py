@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.migrations import MIGRATIONS, migrate
+from src.infrastructure.models.passport import PassportModel
+from src.infrastructure.models.users import UserModel
+from src.infrastructure.seeding import seed_database
+from src.utils import validators
+
+
+@pytest.fixture
+def memory_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    migrate(engine, MIGRATIONS)
+    yield engine
+    engine.dispose()
+
+def test_seeded_rows_pass_validation(memory_engine):
+    today = date(2025, 6, 1)
+    result = seed_database(memory_engine, 3000, passport_ratio=0.5, batch_size=1000, seed=7, today=today)
+
+    session = sessionmaker(bind=memory_engine)()
+    users = session.query(UserModel).all()
+    passports = session.query(PassportModel).all()
+    session.close()
+    assert len(users) == result.users == 3000
+    assert len(passports) == result.passports
+    assert 1200 < result.passports < 1800
+
+    for user in users:
+        assert validators.validate_first_name(user.first_name) == user.first_name
+        assert validators.validate_last_name(user.last_name) == user.last_name
+        assert validators.validate_patronymic(user.patronymic) == user.patronymic
+        assert validators.validate_phone_number(user.phone_number) == user.phone_number
+    user_ids = {user.id for user in users}
+    for passport in passports:
+        validators.validate_passport_series(passport.passport_series)
+        validators.validate_passport_number(passport.passport_number)
+        assert passport.birth_date < passport.receipt_date <= today
+        assert passport.user_id in user_ids
+
+def test_seeding_again_continues_after_existing_rows(memory_engine):
+    indexes = {index["name"] for index in inspect(memory_engine).get_indexes("users")}
+    triggers_sql = "SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+    with memory_engine.connect() as connection:
+        triggers = connection.exec_driver_sql(triggers_sql).scalars().all()
+
+    seed_database(memory_engine, 500, seed=1)
+    # same seed: unique columns still differ, since they follow the row position
+    seed_database(memory_engine, 500, seed=1, drop_indexes=True)
+
+    with memory_engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM users").scalar() == 1000
+        assert connection.exec_driver_sql(triggers_sql).scalars().all() == triggers
+        # rows loaded while the triggers were dropped are still searchable
+        assert connection.exec_driver_sql("SELECT count(*) FROM users_fts WHERE users_fts MATCH 'a* OR к*'").scalar() > 0
+        connection.exec_driver_sql("INSERT INTO users_fts(users_fts, rank) VALUES ('integrity-check', 1)")
+    assert {index["name"] for index in inspect(memory_engine).get_indexes("users")} == indexes
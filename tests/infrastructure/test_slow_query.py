@@ -0,0 +1,55 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.database import Base
+from src.infrastructure.repository.user_repo import UserRepository
+from src.infrastructure.slow_query import SlowQueryRecorder
+
+
+def make_engine(recorder):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    recorder.install(engine)
+    return engine
+
+def test_slow_select_records_plan_and_redacted_parameters():
+    recorder = SlowQueryRecorder(threshold_ms=0, buffer_size=10)
+    engine = make_engine(recorder)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT id FROM users WHERE first_name = :name"), {"name": "Ivan"}).all()
+        connection.execute(text("SELECT id FROM users WHERE phone_digits = :phone"), {"phone": "79990000001"}).all()
+
+    scan, lookup = recorder.entries(2)[::-1]
+    assert scan["parameters"] == ["<str:4>"]
+    assert "Ivan" not in str(scan)
+    assert scan["full_scan"] is False  # ix_users_first_name
+    assert lookup["full_scan"] is False
+    assert any("uq_users_phone_digits" in detail for detail in lookup["plan"])
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT id FROM passport WHERE birth_date = :d"), {"d": "1990-01-01"}).all()
+    assert recorder.entries(1)[0]["full_scan"] is True
+
+def test_full_text_search_is_not_a_full_scan():
+    recorder = SlowQueryRecorder(threshold_ms=0, buffer_size=10)
+    session = sessionmaker(bind=make_engine(recorder))()
+
+    UserRepository(session).search_users(["iva"], 20)
+    session.close()
+
+    search = next(entry for entry in recorder.entries() if "MATCH" in entry["sql"])
+    assert any("VIRTUAL TABLE" in detail for detail in search["plan"])
+    assert search["full_scan"] is False
+
+def test_ring_buffer_keeps_most_recent_entries():
+    recorder = SlowQueryRecorder(threshold_ms=0, buffer_size=2, explain=False)
+    engine = make_engine(recorder)
+
+    with engine.connect() as connection:
+        for value in range(5):
+            connection.execute(text(f"SELECT {value}"))
+
+    assert [entry["sql"] for entry in recorder.entries()] == ["SELECT 4", "SELECT 3"]
+    assert recorder.entries()[0]["plan"] is None
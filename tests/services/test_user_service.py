@@ -1,9 +1,18 @@
+import asyncio
 import pytest
 import uuid
+from datetime import date
 from unittest.mock import Mock
 
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.domain.passport import Passport
 from src.domain.users import User
-from src.utils.exceptions import DuplicateError, NotFoundError
+from src.infrastructure.database import Base
+from src.infrastructure.repository.async_user_repo import AsyncUserRepository
+from src.infrastructure.repository.async_passport_repo import AsyncPassportRepository
+from src.utils.exceptions import DomainValidationError, DuplicateError, NotFoundError
 from src.services.user_service import UserService
 
 test_uuid = str(uuid.uuid4())
@@ -110,4 +119,101 @@ def test_delete_user_success(user_service, mock_repo):
 def test_delete_user_not_found(user_service, mock_repo):
     mock_repo.get_user.return_value = None
     with pytest.raises(NotFoundError, match=f"User with id={test_uuid} not found"):
-        user_service.delete_user(test_uuid)
\ No newline at end of file
+        user_service.delete_user(test_uuid)
+
+def make_bulk_user(phone_number, first_name="Ivan", passport_number=None):
+    passports = []
+    if passport_number:
+        passports.append(Passport(id=None, user_id=None, birth_date=date(1990, 1, 1), passport_series="1234",
+                                  passport_number=passport_number, receipt_date=date(2010, 1, 1)))
+    return User(id=None, first_name=first_name, last_name="Ivanov", patronymic="Petrovich",
+                phone_number=phone_number, passports=passports)
+
+@pytest.fixture
+def bulk_service(memory_session):
+    return UserService(AsyncUserRepository(memory_session), AsyncPassportRepository(memory_session))
+
+def test_create_users_bulk(bulk_service):
+    results = asyncio.run(bulk_service.create_users([
+        make_bulk_user("+79990000001", "Ivan", "000001"),
+        make_bulk_user("+79990000002", "Petr"),
+    ]))
+
+    assert all(isinstance(result, User) for result in results)
+    assert results[0].passports[0].user_id == results[0].id
+    assert asyncio.run(bulk_service.get_user(results[0].id)).passports[0].passport_number == "000001"
+
+def test_create_users_bulk_reports_duplicates(bulk_service):
+    asyncio.run(bulk_service.create_users([make_bulk_user("+79990000001", "Ivan", "000001")]))
+
+    results = asyncio.run(bulk_service.create_users([
+        make_bulk_user("+79990000001", "Petr"),             # phone already stored
+        make_bulk_user("+79990000003", "Ivan"),             # full name already stored
+        make_bulk_user("+79990000004", "Oleg", "000001"),   # passport already stored
+        make_bulk_user("+79990000005", "Anna"),
+        make_bulk_user("+79990000005", "Olga"),             # phone repeated within the batch
+    ]))
+
+    assert [getattr(result, "field", None) for result in results] == [
+        "phone_number", "full_name", "passport_number", None, "phone_number"
+    ]
+    assert isinstance(results[3], User)
+
+def test_create_users_bulk_reports_duplicates_without_patronymic(bulk_service):
+    stored = make_bulk_user("+79990000001", "Ivan")
+    stored.patronymic = None
+    asyncio.run(bulk_service.create_users([stored]))
+
+    again = make_bulk_user("+79990000002", "Ivan")
+    again.patronymic = None
+    results = asyncio.run(bulk_service.create_users([again]))
+
+    assert (results[0].field, results[0].value) == ("full_name", "Ivanov Ivan")
+
+def test_create_users_bulk_invalid_passport_dates(bulk_service):
+    user = make_bulk_user("+79990000001", "Ivan", "000001")
+    user.passports[0].receipt_date = date(1980, 1, 1)
+
+    results = asyncio.run(bulk_service.create_users([user]))
+
+    assert isinstance(results[0], DomainValidationError)
+
+def test_list_users_keyset_pagination(bulk_service):
+    names = ["Anna", "Boris", "Vera", "Gleb", "Dina"]
+    asyncio.run(bulk_service.create_users([make_bulk_user(f"+7999000000{i}", name) for i, name in enumerate(names)]))
+
+    pages = []
+    users, cursor = asyncio.run(bulk_service.list_users(2))
+    pages.append(users)
+    while cursor:
+        users, cursor = asyncio.run(bulk_service.list_users(2, cursor))
+        pages.append(users)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [user.first_name for page in pages for user in page] == sorted(names)
+
+def test_list_users_invalid_cursor(bulk_service):
+    with pytest.raises(DomainValidationError):
+        asyncio.run(bulk_service.list_users(2, "not-a-cursor"))
+
+
+def test_user_service_on_async_session():
+    async def scenario():
+        async_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with AsyncSession(async_engine) as db:
+            service = UserService(AsyncUserRepository(db), AsyncPassportRepository(db))
+            created = await service.create_users([make_bulk_user("+79990000001", "Ivan", "000001")])
+            fetched = await service.get_user(created[0].id)
+            exported = [user async for user in service.export_users()]
+
+        await async_engine.dispose()
+        return created[0], fetched, exported
+
+    created, fetched, exported = asyncio.run(scenario())
+
+    assert fetched.id == created.id
+    assert fetched.passports[0].passport_number == "000001"
+    assert [user.id for user in exported] == [created.id]
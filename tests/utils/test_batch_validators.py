@@ -0,0 +1,85 @@
+import os
+import pytest
+import subprocess
+import sys
+
+from src.api.routers.users import _validate_bulk_rows
+from src.utils import validators
+from src.utils.batch_validators import FIELDS, validate_batch
+
+SCALAR = {
+    "first_name": validators.validate_first_name,
+    "last_name": validators.validate_last_name,
+    "patronymic": validators.validate_patronymic,
+    "phone_number": validators.validate_phone_number,
+    "passport_series": validators.validate_passport_series,
+    "passport_number": validators.validate_passport_number,
+    "birth_date": lambda value: validators.parse_date(value, "birth_date"),
+    "receipt_date": lambda value: validators.parse_date(value, "receipt_date"),
+}
+
+VALUES = [
+    "Ivan", "ivan", "IVAN", "Иван", "иван", "ёж", "", "  ", " Ivan", "Iv an", "Ivan1", "Ivan\n", "a\x00b",
+    "+79991234567", "8-999-123-45-67", "+7 999 123 45 67", "7999123456", "+79991234567\n",
+    "1234", " 1234 ", "0123", "12345", "123456", "12345a", "000000",
+    "2020-01-31", "31.01.2020", "2020/1/2", "32.01.2020", "01.13.2020",
+    None, 1234, 123456, 1.5,
+]
+
+
+def scalar_outcome(field, value):
+    try:
+        return SCALAR[field](value), None
+    except Exception as e:
+        return None, str(e)
+
+
+@pytest.mark.parametrize("field", FIELDS)
+@pytest.mark.parametrize("repeat", [1, 300])
+def test_batch_matches_scalar_validators(field, repeat):
+    # repeated values span several blocks, so clean blocks and per-value checks both run
+    values = VALUES * repeat
+    result = validate_batch({field: values})
+
+    for index, value in enumerate(values):
+        assert (result.values[field][index], result.errors[field][index]) == scalar_outcome(field, value), repr(value)
+
+
+def test_process_pool_gives_the_same_result():
+    columns = {"last_name": ["Petrov", "", "Ivanov1"] * 100, "passport_number": ["123456", "12", "abcdef"] * 100}
+    local = validate_batch(columns)
+    pooled = validate_batch(columns, processes=2, chunk_size=70)
+
+    assert local.invalid.tolist() == pooled.invalid.tolist()
+    assert pooled.invalid_rows() == [index for index in range(300) if index % 3]
+    for field in columns:
+        assert local.values[field].tolist() == pooled.values[field].tolist()
+        assert local.errors[field].tolist() == pooled.errors[field].tolist()
+    assert pooled.row_errors(1) == {
+        "last_name": "last_name cannot be empty or None",
+        "passport_number": "passport_number must be exactly 6 characters long",
+    }
+
+
+def test_bulk_rows_fall_back_to_pydantic_details():
+    passport = {"birth_date": "01.02.1990", "receipt_date": "2010-01-01", "passport_series": "1234", "passport_number": "123456"}
+    payload = [
+        {"first_name": "ivan", "last_name": "petrov", "patronymic": "ivanovich", "phone_number": "+79991234567",
+         "passports": [passport]},
+        {"first_name": "ivan", "last_name": "petrov1", "patronymic": "ivanovich", "phone_number": "+79991234568"},
+        {"first_name": "ivan", "last_name": "petrov", "phone_number": "+79991234569"},
+    ]
+
+    results, users, positions = _validate_bulk_rows(payload)
+
+    assert positions == [0]
+    assert (users[0].first_name, users[0].passports[0].passport_number) == ("Ivan", "123456")
+    assert results[1].detail == "last_name: Value error, last_name must contain only alphabetic characters"
+    assert results[2].detail == "patronymic: Field required"
+
+def test_router_imports_without_numpy_and_pandas():
+    # only a bulk import loads them, see _validate_bulk_rows
+    code = "import sys, src.api.routers.users; print('numpy' in sys.modules, 'pandas' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout == "False False\n"
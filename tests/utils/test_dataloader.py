@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+
+from src.utils.dataloader import DataLoader
+
+
+def make_loader(calls):
+    async def batch_load(keys):
+        calls.append(sorted(keys))
+        if "broken" in keys:
+            raise RuntimeError("batch failed")
+        return {key: key.upper() for key in keys if key != "missing"}
+    return DataLoader(batch_load)
+
+def test_loads_of_one_tick_share_a_batch():
+    calls = []
+    loader = make_loader(calls)
+
+    async def run():
+        return await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"), loader.load("missing"))
+
+    assert asyncio.run(run()) == ["A", "B", "A", None]
+    # each key is fetched once
+    assert calls == [["a", "b", "missing"]]
+
+def test_later_ticks_start_a_new_batch():
+    calls = []
+    loader = make_loader(calls)
+
+    async def run():
+        return await loader.load("a"), await loader.load("b")
+
+    assert asyncio.run(run()) == ("A", "B")
+    assert calls == [["a"], ["b"]]
+
+def test_loads_within_the_window_share_a_batch():
+    calls = []
+    loader = make_loader(calls)
+    loader.window = 0.05
+
+    async def late(key):
+        await asyncio.sleep(0.01)
+        return await loader.load(key)
+
+    async def run():
+        return await asyncio.gather(loader.load("a"), late("b"))
+
+    assert asyncio.run(run()) == ["A", "B"]
+    assert calls == [["a", "b"]]
+
+def test_batch_errors_reach_every_caller():
+    loader = make_loader([])
+
+    async def run():
+        return await asyncio.gather(loader.load("broken"), loader.load("a"), return_exceptions=True)
+
+    assert [str(result) for result in asyncio.run(run())] == ["batch failed", "batch failed"]
+
+def test_running_batches_are_held_until_done():
+    loader = make_loader([])
+
+    async def run():
+        load = asyncio.ensure_future(loader.load("a"))
+        # one iteration for the load to schedule the dispatch, one for the dispatch
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        running = len(loader._tasks)
+        return running, await load, len(loader._tasks)
+
+    assert asyncio.run(run()) == (1, "A", 0)
+
+def test_batches_run_outside_the_callers_context():
+    request = contextvars.ContextVar("request", default=None)
+    seen = []
+
+    async def batch_load(keys):
+        seen.append(request.get())
+        return {key: key for key in keys}
+    loader = DataLoader(batch_load)
+
+    async def lookup(key):
+        request.set(key)
+        return await loader.load(key)
+
+    async def run():
+        return await asyncio.gather(lookup("a"), lookup("b"))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert seen == [None]
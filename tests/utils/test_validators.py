@@ -0,0 +1,88 @@
+import itertools
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.schemas.passport_schema import PassportOut
+from src.utils.validators import DATE_FORMATS, parse_date
+
+
+def legacy_parse_date(value, field_name, future_allowed=True):
+    """parse_date before the single-pass parser, kept as the reference."""
+    if value is None:
+        raise ValueError(f"{field_name} cannot be None")
+
+    if isinstance(value, date):
+        if not future_allowed and value > date.today():
+            raise ValueError(f"{field_name} cannot be in the future")
+        return value
+
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            raise ValueError(f"{field_name} cannot be empty")
+        if not re.fullmatch(r'[\d.\-\/ ]+', value):
+            raise ValueError(f"{field_name} contains invalid characters")
+
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt).date()
+                if not future_allowed and parsed > date.today():
+                    raise ValueError(f"{field_name} cannot be in the future")
+                return parsed
+            except ValueError:
+                continue
+
+        raise ValueError(
+            f"{field_name} must be in one of the formats: "
+            "YYYY-MM-DD, DD.MM.YYYY, DD/MM/YYYY, DD-MM-YYYY, YYYY.MM.DD, YYYY/MM/DD"
+        )
+
+    raise TypeError(f"{field_name} must be a date, datetime, or string, got {type(value)}")
+
+
+def outcome(function, *args):
+    try:
+        return ("ok", function(*args))
+    except Exception as e:
+        return (type(e).__name__, str(e))
+
+
+def date_strings():
+    years = ["2020", "1999", "0000", "0001", "9999", "202", "20201", "٢٠٢٠"]
+    months = ["1", "01", "12", "13", "00", "0", " 1", "001"]
+    days = ["1", "01", "29", "30", "31", "32", " 5", "00", "٣"]
+    for separator in [".", "-", "/", " ", ""]:
+        for year, month, day in itertools.product(years, months, days):
+            yield separator.join((year, month, day))
+            yield separator.join((day, month, year))
+    yield from ["2020-01-02", "2020.01/02", "2020--01-02", "  2020-01-02  ", "", "   ", "2020-01-02x",
+                "+020-01-02", "2020-W01-1", "20200102", "2020-1-2", "1.2.2020", "29.02.2021", "29.02.2020"]
+    future = date.today() + timedelta(days=30)
+    yield from [future.isoformat(), future.strftime("%d.%m.%Y"), date.today().isoformat()]
+
+
+@pytest.mark.parametrize("future_allowed", [True, False])
+def test_parse_date_matches_legacy_implementation(future_allowed):
+    values = list(date_strings()) + [None, 20200102, date(2020, 1, 2), datetime(2020, 1, 2, 3, 4),
+                                     date.today() + timedelta(days=1)]
+    for value in values:
+        assert outcome(parse_date, value, "birth_date", future_allowed) == \
+            outcome(legacy_parse_date, value, "birth_date", future_allowed), repr(value)
+
+
+def test_passport_out_keeps_dates_of_orm_objects():
+    class Row:
+        id = "7f0b7d0e-0b9a-4b1e-9d5e-2f3c4a5b6c7d"
+        birth_date = date(1990, 5, 17)
+        receipt_date = date(2010, 6, 1)
+        passport_series = "1234"
+        passport_number = "123456"
+        user_id = "0c3e1f2a-8b7d-4c6e-9f1a-2b3c4d5e6f70"
+
+    row = Row()
+    passport = PassportOut.model_validate(row)
+    assert (passport.birth_date, passport.receipt_date) == (date(1990, 5, 17), date(2010, 6, 1))
+    # nothing is written back to the source object
+    assert "birth_date" not in vars(row)